@@ -14,6 +14,7 @@ CREATE TABLE IF NOT EXISTS cargo (
   cargo_nome VARCHAR(45) NOT NULL,
   pode_gerenciar_estoque TINYINT(1) NOT NULL DEFAULT 0,
   pode_fazer_vendas TINYINT(1) NOT NULL DEFAULT 0,
+  versao INT NOT NULL DEFAULT 0,				#incrementada a cada UPDATE (controle de concorrência)
   PRIMARY KEY (cargo_id),
   UNIQUE KEY uk_cargo_nome (cargo_nome)
 ) ENGINE=InnoDB;
@@ -25,6 +26,7 @@ CREATE TABLE IF NOT EXISTS funcionario (
   funcionario_id INT NOT NULL AUTO_INCREMENT,
   cargo_id INT NOT NULL,
   nome VARCHAR(100) NOT NULL,
+  nome_busca VARCHAR(100) NOT NULL DEFAULT '',		#nome minúsculo e sem acentos, mantido pela aplicação
   email VARCHAR(100) NOT NULL,
   cpf VARCHAR(20) NOT NULL,
   telefone VARCHAR(20) NULL,
@@ -32,16 +34,36 @@ CREATE TABLE IF NOT EXISTS funcionario (
   data_termino DATE NULL,
   salario DECIMAL(10,2) NULL,
   ativo TINYINT(1) NOT NULL DEFAULT 1,
+  versao INT NOT NULL DEFAULT 0,				#incrementada a cada UPDATE (controle de concorrência)
   PRIMARY KEY (funcionario_id),
   UNIQUE KEY uk_funcionario_cpf (cpf),
   UNIQUE KEY uk_funcionario_email (email),
   INDEX idx_funcionario_cargo (cargo_id),
+  INDEX idx_funcionario_ativo (ativo),				#listagem paginada filtrada por ativo
+  INDEX idx_funcionario_cargo_ativo (cargo_id, ativo),
+  INDEX idx_funcionario_nome_busca (nome_busca),		#busca por prefixo do nome
   CONSTRAINT fk_funcionario_cargo FOREIGN KEY (cargo_id)
     REFERENCES cargo (cargo_id)
     ON UPDATE RESTRICT
     ON DELETE RESTRICT
 ) ENGINE=InnoDB;
 
+-- -------------------------------
+-- Table: resumo_cargo (headcount/payroll per role, kept up to date by the app)
+-- -------------------------------
+CREATE TABLE IF NOT EXISTS resumo_cargo (
+  cargo_id INT NOT NULL,
+  quantidade INT NOT NULL DEFAULT 0,
+  quantidade_ativos INT NOT NULL DEFAULT 0,
+  soma_salarios DECIMAL(14,2) NOT NULL DEFAULT 0,
+  quantidade_com_salario INT NOT NULL DEFAULT 0,		#divisor da média (salario pode ser NULL)
+  PRIMARY KEY (cargo_id),
+  CONSTRAINT fk_resumo_cargo_cargo FOREIGN KEY (cargo_id)
+    REFERENCES cargo (cargo_id)
+    ON UPDATE RESTRICT
+    ON DELETE CASCADE
+) ENGINE=InnoDB;
+
 -- -------------------------------
 -- Table: usuario (authentication / app users)
 -- -------------------------------
@@ -120,9 +142,11 @@ CREATE TABLE IF NOT EXISTS produto (
   custo_medio DECIMAL(10,2) NULL,
   peso DECIMAL(10,3) NULL,
   ativo TINYINT(1) NOT NULL DEFAULT 1,
+  atualizado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,	#o catálogo em memória busca as alterações por aqui
   PRIMARY KEY (produto_id),
   UNIQUE KEY uk_produto_sku (sku),
   INDEX idx_produto_categoria (categoria_id),
+  INDEX idx_produto_atualizado (atualizado_em),
   CONSTRAINT fk_produto_categoria FOREIGN KEY (categoria_id)
     REFERENCES categoria (categoria_id)
     ON UPDATE RESTRICT
@@ -138,8 +162,10 @@ CREATE TABLE IF NOT EXISTS especificacao (
   nome_atributo VARCHAR(100) NULL,				#Cor, volume, diâmetro, material, etc
   valor_atributo VARCHAR(100) NULL,				#Branco, 18, 50, etc
   unidade_medida VARCHAR(45) NULL,				#L, mm, m, etc
+  atualizado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (especificacao_id),
   INDEX idx_espec_produto (produto_id),
+  INDEX idx_espec_atualizado (atualizado_em),
   CONSTRAINT fk_especificacao_produto FOREIGN KEY (produto_id)
     REFERENCES produto (produto_id)
     ON UPDATE RESTRICT
@@ -196,8 +222,8 @@ CREATE TABLE IF NOT EXISTS lote (
   quantidade_atual INT NOT NULL,
   observacoes VARCHAR(255) NULL,
   PRIMARY KEY (lote_id),
-  INDEX idx_lote_estoque (estoque_id),
-  INDEX idx_lote_produto (produto_id),
+  INDEX idx_lote_estoque_produto (estoque_id, produto_id),		#saldo por estoque e produto (reconstrução do saldo_estoque)
+  INDEX idx_lote_produto_fifo (produto_id, data_aquisicao, lote_id),	#alocação FIFO na venda (e trava das linhas nessa ordem)
   CONSTRAINT fk_lote_estoque FOREIGN KEY (estoque_id)
     REFERENCES estoque (estoque_id)
     ON UPDATE RESTRICT
@@ -232,6 +258,35 @@ CREATE TABLE IF NOT EXISTS movimentacao_estoque (
     ON DELETE SET NULL
 ) ENGINE=InnoDB;
 
+-- -------------------------------
+-- Table: saldo_estoque (on-hand snapshot per warehouse/product, kept by the app)
+-- -------------------------------
+CREATE TABLE IF NOT EXISTS saldo_estoque (
+  estoque_id INT NOT NULL,
+  produto_id INT NOT NULL,
+  quantidade INT NOT NULL DEFAULT 0,				#saldo até saldo_estoque_marca.ate_movimentacao_id
+  PRIMARY KEY (estoque_id, produto_id),
+  INDEX idx_saldo_estoque_produto (produto_id),
+  CONSTRAINT fk_saldo_estoque_estoque FOREIGN KEY (estoque_id)
+    REFERENCES estoque (estoque_id)
+    ON UPDATE RESTRICT
+    ON DELETE CASCADE,
+  CONSTRAINT fk_saldo_estoque_produto FOREIGN KEY (produto_id)
+    REFERENCES produto (produto_id)
+    ON UPDATE RESTRICT
+    ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- -------------------------------
+-- Table: saldo_estoque_marca (watermark of the saldo_estoque snapshot, a single row)
+-- -------------------------------
+CREATE TABLE IF NOT EXISTS saldo_estoque_marca (
+  marca_id INT NOT NULL,						#sempre 1
+  ate_movimentacao_id INT NOT NULL DEFAULT 0,	#movimentações até este ID já estão no saldo
+  consolidado_em DATETIME NULL,
+  PRIMARY KEY (marca_id)
+) ENGINE=InnoDB;
+
 -- =====================================================
 -- TABELA PRINCIPAL DE VENDAS
 -- =====================================================
@@ -256,6 +311,7 @@ CREATE TABLE venda_item (										#Os produtos que o funcionário adiciona à v
   produto_id INT NOT NULL,
   quantidade INT NOT NULL,
   preco_unitario DECIMAL(10,2) NOT NULL,
+  INDEX idx_venda_item_venda (venda_id),
   CONSTRAINT fk_venda_item_venda FOREIGN KEY (venda_id)
     REFERENCES venda(venda_id)
     ON DELETE CASCADE ON UPDATE CASCADE,
@@ -276,6 +332,7 @@ CREATE TABLE historico_venda (									#Uma CÓPIA da venda quando ela é conclu
   data_venda DATETIME NOT NULL,
   data_registro DATETIME DEFAULT CURRENT_TIMESTAMP,
   status ENUM('CONCLUIDA','CANCELADA') NOT NULL,
+  UNIQUE KEY uk_historico_venda_venda (venda_id),				#cada venda é arquivada uma única vez
   CONSTRAINT fk_historico_venda_funcionario FOREIGN KEY (funcionario_id)
     REFERENCES funcionario(funcionario_id)
     ON UPDATE CASCADE ON DELETE RESTRICT
@@ -291,6 +348,7 @@ CREATE TABLE historico_venda_item (
   quantidade INT NOT NULL,
   preco_unitario DECIMAL(10,2) NOT NULL,
   subtotal DECIMAL(10,2) NOT NULL,
+  INDEX idx_hist_item_hist_venda (historico_venda_id),
   CONSTRAINT fk_hist_item_hist_venda FOREIGN KEY (historico_venda_id)
     REFERENCES historico_venda(historico_id)
     ON DELETE CASCADE ON UPDATE CASCADE,
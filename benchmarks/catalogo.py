@@ -0,0 +1,140 @@
+"""
+Catálogo de produtos em memória: tempo de carga e latência das consultas.
+
+Gera N produtos com nomes e especificações variados num banco sintético,
+carrega o catálogo e mede por_sku, a busca por nome (prefixo curto e
+trechos), o filtro por especificação e a reindexação depois de alterações.
+
+    python -m benchmarks.catalogo --produtos 100000
+    python -m benchmarks.catalogo --backend mysql --consultas 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from config.config_bd import usar_backend, backend_atual, conectar_bd
+from benchmarks.dados_sinteticos import _inserir_em_blocos
+from benchmarks.executar import medir
+
+TIPOS = ("Parafuso", "Porca", "Arruela", "Tinta", "Cabo", "Lâmpada", "Torneira", "Chave", "Broca", "Fita",
+         "Tubo", "Conexão", "Registro", "Disjuntor", "Tomada", "Pincel", "Rolo", "Massa", "Cola", "Serra")
+QUALIFICADORES = ("Sextavado", "Acrílica", "Flexível", "Inox", "Galvanizado", "Elétrico", "Isolante",
+                  "Esmalte", "Látex", "Soldável", "Roscável", "Led", "Fosca", "Brilhante", "Reforçado")
+CORES = ("Branco", "Preto", "Cinza", "Azul", "Vermelho", "Amarelo", "Verde", "Marrom")
+MATERIAIS = ("Aço", "Latão", "PVC", "Cobre", "Alumínio", "Nylon")
+
+
+def _produto(rnd, indice):
+    medida = f"{rnd.choice((2, 4, 6, 8, 10, 12, 16, 18, 20, 25, 32, 50))}{rnd.choice(('mm', 'L', 'm', 'W'))}"
+    nome = f"{rnd.choice(TIPOS)} {rnd.choice(QUALIFICADORES)} {medida} {rnd.choice(MATERIAIS)} {indice}"
+    return f"CAT-{indice:07d}", nome, round(rnd.uniform(1, 500), 2)
+
+
+def popular_catalogo(quantidade, semente):
+    rnd = random.Random(semente)
+    conexao = conectar_bd()
+    try:
+        _inserir_em_blocos(
+            conexao, "INSERT INTO produto (sku, nome, preco_venda) VALUES (%s, %s, %s)",
+            (_produto(rnd, i) for i in range(quantidade)),
+        )
+        cursor = conexao.cursor()
+        cursor.execute("SELECT produto_id FROM produto ORDER BY produto_id")
+        produtos = [linha[0] for linha in cursor.fetchall()]
+        cursor.close()
+        _inserir_em_blocos(
+            conexao,
+            "INSERT INTO especificacao (produto_id, nome_atributo, valor_atributo, unidade_medida) "
+            "VALUES (%s, %s, %s, %s)",
+            (
+                especificacao
+                for produto_id in produtos
+                for especificacao in (
+                    (produto_id, "Cor", rnd.choice(CORES), None),
+                    (produto_id, "Material", rnd.choice(MATERIAIS), None),
+                    (produto_id, "Volume", str(rnd.choice((1, 3.6, 18))), "L"),
+                )
+            ),
+        )
+    finally:
+        conexao.close()
+    return produtos
+
+
+def executar(quantidade, consultas, semente=42, backend="sqlite", pasta=None):
+    from index.catalogo import CatalogoProdutos
+
+    if pasta is None:
+        with tempfile.TemporaryDirectory(prefix="gestorpro_catalogo_") as temporaria:
+            return executar(quantidade, consultas, semente, backend, temporaria)
+
+    if backend == "sqlite":
+        usar_backend("sqlite", caminho=os.path.join(pasta, "catalogo.db"))
+    else:
+        usar_backend("mysql")
+
+    produtos = popular_catalogo(quantidade, semente)
+    rnd = random.Random(semente)
+    catalogo = CatalogoProdutos()
+
+    inicio = time.perf_counter()
+    catalogo.carregar()
+    segundos_carga = time.perf_counter() - inicio
+
+    skus = [(f"cat-{rnd.randrange(quantidade):07d}",) for _ in range(consultas)]
+    prefixos = [(rnd.choice(TIPOS)[:2],) for _ in range(consultas)]
+    trechos = [(f"{rnd.choice(TIPOS)[:5]} {rnd.choice(QUALIFICADORES)[:4]} {rnd.randrange(quantidade)}",)
+               for _ in range(consultas)]
+    filtros = [("", (f"Cor={rnd.choice(CORES)}", f"Material={rnd.choice(MATERIAIS)}")) for _ in range(consultas)]
+    combinados = [(rnd.choice(TIPOS), (f"Cor={rnd.choice(CORES)}",)) for _ in range(consultas)]
+
+    # Alterações para medir atualizar(): renomeia e desativa alguns produtos.
+    conexao = conectar_bd()
+    cursor = conexao.cursor()
+    alterados = rnd.sample(produtos, min(200, len(produtos)))
+    cursor.executemany("UPDATE produto SET nome = %s WHERE produto_id = %s",
+                       [(_produto(rnd, quantidade + i)[1], p) for i, p in enumerate(alterados[:150])])
+    cursor.executemany("UPDATE produto SET ativo = 0 WHERE produto_id = %s", [(p,) for p in alterados[150:]])
+    conexao.commit()
+    cursor.close()
+    conexao.close()
+
+    # Logo depois da carga todos os produtos estão dentro da janela de
+    # SOBREPOSICAO_SEGUNDOS: atualizar() relê o catálogo inteiro (pior caso).
+    inicio = time.perf_counter()
+    reindexados = catalogo.atualizar()
+    segundos_atualizacao = time.perf_counter() - inicio
+
+    return {
+        "backend": backend_atual(),
+        "produtos": quantidade,
+        "carga_segundos": round(segundos_carga, 3),
+        "por_sku": medir(catalogo.por_sku, skus),
+        "buscar_prefixo": medir(catalogo.buscar, prefixos),
+        "buscar_trechos": medir(catalogo.buscar, trechos),
+        "filtrar_especificacoes": medir(catalogo.buscar, filtros),
+        "buscar_com_especificacao": medir(catalogo.buscar, combinados),
+        "atualizar": {"reindexados": reindexados, "segundos": round(segundos_atualizacao, 4)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga e consultas do catálogo de produtos em memória.")
+    parser.add_argument("--produtos", type=int, default=100_000)
+    parser.add_argument("--consultas", type=int, default=10_000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    args = parser.parse_args()
+
+    resultado = executar(args.produtos, args.consultas, args.semente, args.backend)
+    json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+"""
+Carga concorrente no caixa: muitas vendas ao mesmo tempo disputando os
+mesmos produtos.
+
+Popula um banco sintético, dispara as vendas em várias threads e mede a
+vazão e a latência de registrar_venda. No fim confere que o estoque fechou:
+nenhum lote negativo e, para cada lote, a baixa igual à soma das
+movimentações de 'saida', que por sua vez é igual à soma dos itens vendidos.
+
+    python -m benchmarks.checkout --vendas 2000 --threads 32
+    python -m benchmarks.checkout --backend mysql --produtos-disputados 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config_bd import usar_backend, backend_atual, conectar_bd, Error
+from benchmarks.dados_sinteticos import popular
+from benchmarks.executar import percentil, _ids
+
+
+def _conferir_estoque(ultima_venda_inicial):
+    """
+    Divergências entre lotes, movimentações de saída e itens das vendas
+    posteriores a 'ultima_venda_inicial' (lista vazia se estiver tudo certo).
+    """
+    conexao = conectar_bd()
+    cursor = conexao.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM lote WHERE quantidade_atual < 0")
+        negativos = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT l.lote_id, l.quantidade_inicial - l.quantidade_atual,
+                   (SELECT COALESCE(SUM(m.quantidade), 0) FROM movimentacao_estoque m
+                    WHERE m.lote_id = l.lote_id AND m.tipo = 'saida')
+            FROM lote l
+        """)
+        divergencias = [(lote_id, baixa, saidas) for lote_id, baixa, saidas in cursor.fetchall() if baixa != saidas]
+        cursor.execute("SELECT COALESCE(SUM(quantidade), 0) FROM movimentacao_estoque WHERE tipo = 'saida'")
+        total_saidas = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT COALESCE(SUM(quantidade), 0) FROM venda_item WHERE venda_id > %s
+        """, (ultima_venda_inicial,))
+        total_vendido = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conexao.close()
+
+    problemas = []
+    if negativos:
+        problemas.append(f"{negativos} lote(s) com quantidade negativa")
+    if divergencias:
+        problemas.append(f"{len(divergencias)} lote(s) com baixa diferente das saídas, ex.: {divergencias[:3]}")
+    if total_saidas != total_vendido:
+        problemas.append(f"saídas ({total_saidas}) diferentes dos itens vendidos ({total_vendido})")
+    return problemas
+
+
+def executar(vendas, threads, produtos_disputados, semente=42, backend="sqlite", pasta=None):
+    from index.vendas import registrar_venda, EstoqueInsuficiente, VendaRecusada
+
+    if pasta is None:
+        with tempfile.TemporaryDirectory(prefix="gestorpro_checkout_") as temporaria:
+            return executar(vendas, threads, produtos_disputados, semente, backend, temporaria)
+
+    if backend == "sqlite":
+        usar_backend("sqlite", caminho=os.path.join(pasta, "checkout.db"))
+    else:
+        usar_backend("mysql")
+
+    popular(2000, semente)
+    funcionarios = _ids("funcionario", "funcionario_id")
+    produtos = _ids("produto", "produto_id")
+    # As vendas geradas por popular() não passaram pelo caixa nem baixaram estoque.
+    vendas_iniciais = _ids("venda", "venda_id")
+    ultima_venda_inicial = vendas_iniciais[-1] if vendas_iniciais else 0
+
+    # Poucos produtos concentram as vendas, para forçar a disputa pelos mesmos lotes.
+    disputados = produtos[:produtos_disputados]
+    rnd = random.Random(semente)
+    pedidos = [
+        (rnd.choice(funcionarios),
+         [(rnd.choice(disputados if rnd.random() < 0.8 else produtos), rnd.randrange(1, 4))
+          for _ in range(rnd.randrange(1, 6))])
+        for _ in range(vendas)
+    ]
+
+    latencias = []
+    contagem = {"concluidas": 0, "sem_estoque": 0, "recusadas": 0, "erros": 0}
+    erros = []
+    lock = threading.Lock()
+
+    def vender(pedido):
+        funcionario_id, itens = pedido
+        inicio = time.perf_counter()
+        try:
+            registrar_venda(funcionario_id, itens, "PIX")
+            resultado = "concluidas"
+        except EstoqueInsuficiente:
+            resultado = "sem_estoque"
+        except VendaRecusada:
+            resultado = "recusadas"
+        except Error as e:
+            resultado = "erros"
+            with lock:
+                erros.append(str(e))
+        with lock:
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            contagem[resultado] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(vender, pedidos))
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "backend": backend_atual(),
+        "vendas": vendas,
+        "threads": threads,
+        "produtos_disputados": produtos_disputados,
+        **contagem,
+        "segundos": round(segundos, 3),
+        "vendas_por_segundo": round(vendas / segundos, 1) if segundos else None,
+        "p50_ms": round(percentil(latencias, 50), 3),
+        "p99_ms": round(percentil(latencias, 99), 3),
+        "max_ms": round(latencias[-1], 3),
+        "exemplos_de_erro": erros[:5],
+        "problemas_no_estoque": _conferir_estoque(ultima_venda_inicial),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendas concorrentes disputando os mesmos lotes.")
+    parser.add_argument("--vendas", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--produtos-disputados", type=int, default=10,
+                        help="produtos que concentram 80%% dos itens vendidos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    args = parser.parse_args()
+
+    resultado = executar(args.vendas, args.threads, args.produtos_disputados, args.semente, args.backend)
+    json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0 if not resultado["erros"] and not resultado["problemas_no_estoque"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
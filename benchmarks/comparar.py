@@ -0,0 +1,59 @@
+"""
+Compara dois resultados de benchmarks.executar (ex.: antes e depois de um commit).
+
+    python -m benchmarks.comparar benchmarks/resultados/10k-abc123.json benchmarks/resultados/10k-def456.json
+
+Para cada medição mostra a vazão e o p99 das duas execuções e a variação.
+"""
+import argparse
+import json
+
+GRUPOS = ("crud_cargos", "crud_funcionarios", "massa", "relatorios", "preparados")
+
+
+def _vazao(medicao):
+    return medicao.get("ops_por_segundo") or medicao.get("linhas_por_segundo")
+
+
+def _variacao(antes, depois):
+    if not antes or depois is None:
+        return ""
+    return f"{(depois - antes) / antes * 100:+.1f}%"
+
+
+def comparar(antes, depois):
+    """Linhas de texto com a comparação medição a medição."""
+    linhas = [
+        f"{antes.get('commit')} -> {depois.get('commit')} (escala {antes.get('escala')} / {depois.get('escala')})",
+        f"{'medição':<45}{'vazão antes':>14}{'vazão depois':>14}{'var.':>9}{'p99 antes':>12}{'p99 depois':>12}{'var.':>9}",
+    ]
+    for grupo in GRUPOS:
+        for nome, medicao in depois.get(grupo, {}).items():
+            anterior = antes.get(grupo, {}).get(nome)
+            if anterior is None:
+                linhas.append(f"{grupo + '.' + nome:<45}{'(nova)':>14}")
+                continue
+            v1, v2 = _vazao(anterior), _vazao(medicao)
+            p1, p2 = anterior.get("p99_ms"), medicao.get("p99_ms")
+            linhas.append(
+                f"{grupo + '.' + nome:<45}{v1 or '':>14}{v2 or '':>14}{_variacao(v1, v2):>9}"
+                f"{'' if p1 is None else p1:>12}{'' if p2 is None else p2:>12}{_variacao(p1, p2):>9}"
+            )
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois arquivos de resultados de benchmark.")
+    parser.add_argument("antes")
+    parser.add_argument("depois")
+    args = parser.parse_args()
+
+    with open(args.antes, encoding="utf-8") as arquivo:
+        antes = json.load(arquivo)
+    with open(args.depois, encoding="utf-8") as arquivo:
+        depois = json.load(arquivo)
+    print("\n".join(comparar(antes, depois)))
+
+
+if __name__ == "__main__":
+    main()
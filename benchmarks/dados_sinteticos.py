@@ -0,0 +1,223 @@
+"""
+Gerador de dados sintéticos para os benchmarks.
+
+Popula cargo, funcionario, categoria, produto, estoque, lote, venda e
+venda_item com volumes proporcionais à escala (10k, 100k, 1M funcionários).
+CPFs têm dígitos verificadores válidos e CPFs/e-mails são únicos, então as
+linhas passam pelas mesmas validações do cadastro. Com a mesma semente, os
+dados gerados são sempre os mesmos.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+from config.config_bd import conectar_bd, Error
+from index.crud_funcionarios import QUERY_INSERIR_FUNCIONARIO
+from index.texto import normalizar_busca
+from index.resumo_cargos import reconstruir_resumo
+from index.saldo_estoque import reconstruir_saldos
+
+ESCALAS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+TAMANHO_BLOCO = 5000
+
+PRIMEIROS_NOMES = ("Ana", "João", "Maria", "José", "Antônio", "Francisca", "Carlos", "Paulo",
+                   "Lúcia", "Márcia", "Luís", "Gabriel", "Letícia", "Rafael", "Júlia", "Sérgio")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Ferreira", "Araújo",
+              "Gonçalves", "Conceição", "Magalhães", "Brandão", "Rocha", "Simões")
+CARGOS = ("Vendedor", "Caixa", "Estoquista", "Gerente", "Supervisor", "Repositor", "Comprador")
+METODOS_PAGAMENTO = ("DINHEIRO", "CARTAO", "PIX", "OUTRO")
+
+
+# -----------------------------
+# CAMPOS VÁLIDOS
+# -----------------------------
+
+def gerar_cpf(numero):
+    """CPF válido e único para cada 'numero' (1 a 999.999.998), com máscara."""
+    base = [int(d) for d in f"{numero:09d}"]
+    for i in (9, 10):
+        soma = sum(base[num] * ((i + 1) - num) for num in range(i))
+        base.append(((soma * 10) % 11) % 10)
+    cpf = "".join(map(str, base))
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def numeros_de_cpf(inicio):
+    """Números-base a partir de 'inicio' que não geram CPF de dígitos repetidos."""
+    numero = inicio
+    while True:
+        digitos = f"{numero:09d}"
+        if digitos != digitos[0] * 9:
+            yield numero
+        numero += 1
+
+
+def gerar_funcionario(rnd, indice, numero_cpf, cargos):
+    """Parâmetros de QUERY_INSERIR_FUNCIONARIO para um funcionário válido."""
+    nome = f"{rnd.choice(PRIMEIROS_NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+    admissao = date(2010, 1, 1) + timedelta(days=rnd.randrange(5000))
+    termino = admissao + timedelta(days=rnd.randrange(30, 2000)) if rnd.random() < 0.1 else None
+    return (
+        rnd.choice(cargos),
+        nome,
+        f"func{indice}@exemplo.com.br",
+        gerar_cpf(numero_cpf),
+        f"11{rnd.randrange(900000000, 999999999)}",
+        admissao,
+        termino,
+        round(rnd.uniform(1400, 15000), 2),
+        0 if termino else 1,
+        normalizar_busca(nome),
+    )
+
+
+def _itens_da_venda(semente, indice, produtos):
+    """
+    Itens (produto_id, quantidade, preco_unitario) da venda 'indice'. Cada venda
+    tem a própria semente, então os itens podem ser gerados de novo (para o
+    total da venda e depois para venda_item) sem guardar todos na memória.
+    """
+    rnd = random.Random(semente * 10_000_019 + indice)
+    return [(rnd.choice(produtos), rnd.randrange(1, 5), round(rnd.uniform(1, 500), 2))
+            for _ in range(rnd.randrange(1, 6))]
+
+
+# -----------------------------
+# CARGA
+# -----------------------------
+
+def _inserir_em_blocos(conexao, query, linhas):
+    cursor = conexao.cursor()
+    bloco = []
+    for linha in linhas:
+        bloco.append(linha)
+        if len(bloco) >= TAMANHO_BLOCO:
+            cursor.executemany(query, bloco)
+            conexao.commit()
+            bloco = []
+    if bloco:
+        cursor.executemany(query, bloco)
+        conexao.commit()
+    cursor.close()
+
+
+def _ids(conexao, tabela, chave):
+    cursor = conexao.cursor()
+    cursor.execute(f"SELECT {chave} FROM {tabela} ORDER BY {chave}")
+    ids = [linha[0] for linha in cursor.fetchall()]
+    cursor.close()
+    return ids
+
+
+def popular(escala, semente=42):
+    """
+    Gera os dados de uma escala ('10k', '100k', '1m' ou um número de
+    funcionários) no banco configurado, que deve estar vazio.
+    Retorna a contagem de linhas por tabela.
+    """
+    funcionarios = ESCALAS[escala] if escala in ESCALAS else int(escala)
+    rnd = random.Random(semente)
+
+    qtd_cargos = max(len(CARGOS), funcionarios // 1000)
+    qtd_produtos = max(100, funcionarios // 10)
+    qtd_lotes = qtd_produtos * 2
+    qtd_vendas = funcionarios
+
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        _inserir_em_blocos(
+            conexao,
+            "INSERT INTO cargo (cargo_nome, pode_gerenciar_estoque, pode_fazer_vendas) VALUES (%s, %s, %s)",
+            ((f"{CARGOS[i % len(CARGOS)]} {i + 1}", rnd.randrange(2), rnd.randrange(2)) for i in range(qtd_cargos)),
+        )
+        cargos = _ids(conexao, "cargo", "cargo_id")
+
+        cpfs = numeros_de_cpf(100_000_000)
+        _inserir_em_blocos(
+            conexao, QUERY_INSERIR_FUNCIONARIO,
+            (gerar_funcionario(rnd, i, next(cpfs), cargos) for i in range(funcionarios)),
+        )
+        ids_funcionarios = _ids(conexao, "funcionario", "funcionario_id")
+
+        _inserir_em_blocos(
+            conexao, "INSERT INTO categoria (categoria_nome) VALUES (%s)",
+            ((f"Categoria {i + 1}",) for i in range(20)),
+        )
+        categorias = _ids(conexao, "categoria", "categoria_id")
+
+        _inserir_em_blocos(
+            conexao,
+            "INSERT INTO produto (categoria_id, sku, nome, preco_venda, custo_medio) VALUES (%s, %s, %s, %s, %s)",
+            (
+                (rnd.choice(categorias), f"SKU-{i:07d}", f"Produto {i}", preco, round(preco * 0.6, 2))
+                for i, preco in ((i, round(rnd.uniform(1, 500), 2)) for i in range(qtd_produtos))
+            ),
+        )
+        produtos = _ids(conexao, "produto", "produto_id")
+
+        _inserir_em_blocos(
+            conexao, "INSERT INTO estoque (descricao, tipo_estoque) VALUES (%s, %s)",
+            ((f"Depósito {i + 1}", "loja") for i in range(5)),
+        )
+        estoques = _ids(conexao, "estoque", "estoque_id")
+
+        def lotes():
+            for i in range(qtd_lotes):
+                quantidade = rnd.randrange(10, 1000)
+                yield (rnd.choice(estoques), produtos[i % len(produtos)],
+                       date(2024, 1, 1) + timedelta(days=rnd.randrange(365)), quantidade, quantidade)
+
+        _inserir_em_blocos(
+            conexao,
+            "INSERT INTO lote (estoque_id, produto_id, data_aquisicao, quantidade_inicial, quantidade_atual) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            lotes(),
+        )
+
+        inicio_vendas = datetime(2024, 1, 1)
+        _inserir_em_blocos(
+            conexao,
+            "INSERT INTO venda (funcionario_id, metodo_pagamento, total_venda, data_venda, status) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            (
+                (rnd.choice(ids_funcionarios), rnd.choice(METODOS_PAGAMENTO),
+                 round(sum(q * p for _, q, p in _itens_da_venda(semente, i, produtos)), 2),
+                 inicio_vendas + timedelta(minutes=rnd.randrange(525_600)),
+                 rnd.choice(("CONCLUIDA", "CONCLUIDA", "CONCLUIDA", "CANCELADA", "ABERTA")))
+                for i in range(qtd_vendas)
+            ),
+        )
+        vendas = _ids(conexao, "venda", "venda_id")
+
+        _inserir_em_blocos(
+            conexao,
+            "INSERT INTO venda_item (venda_id, produto_id, quantidade, preco_unitario) VALUES (%s, %s, %s, %s)",
+            (
+                (venda_id,) + item
+                for i, venda_id in enumerate(vendas)
+                for item in _itens_da_venda(semente, i, produtos)
+            ),
+        )
+
+        cursor = conexao.cursor()
+        contagens = {}
+        for tabela in ("cargo", "funcionario", "categoria", "produto", "estoque", "lote", "venda", "venda_item"):
+            cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+            contagens[tabela] = cursor.fetchone()[0]
+        cursor.close()
+    finally:
+        conexao.close()
+
+    # Os funcionários entraram direto por executemany: recalcula o resumo por cargo.
+    ok, mensagem = reconstruir_resumo()
+    if not ok:
+        raise Error(mensagem)
+    # Idem para os lotes, que entraram sem movimentação de entrada.
+    ok, mensagem = reconstruir_saldos()
+    if not ok:
+        raise Error(mensagem)
+
+    return contagens
@@ -0,0 +1,350 @@
+"""
+Suíte de benchmarks do GestorPro.
+
+Cria um banco SQLite local (ou usa o MySQL local configurado), popula com
+dados sintéticos da escala pedida e mede vazão e latência (p50/p99) das
+funções de CRUD de cargos e funcionários, dos caminhos em massa (importação,
+exportação, validação em lote), dos relatórios e das consultas frequentes com
+e sem statements preparados. O resultado é gravado em
+JSON com o commit atual, para comparar execuções entre commits:
+
+    python -m benchmarks.executar --escala 10k
+    python -m benchmarks.executar --escala 100k --repeticoes 500
+    python -m benchmarks.comparar antes.json depois.json
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from config.config_bd import usar_backend, backend_atual, transacao, exigir
+from benchmarks.dados_sinteticos import ESCALAS, popular, gerar_cpf, numeros_de_cpf, PRIMEIROS_NOMES, SOBRENOMES
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+
+# -----------------------------
+# MEDIÇÃO
+# -----------------------------
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) pelo método do posto mais próximo."""
+    if not valores_ordenados:
+        return None
+    posto = max(1, round(p / 100 * len(valores_ordenados)))
+    return valores_ordenados[min(posto, len(valores_ordenados)) - 1]
+
+
+def medir(funcao, argumentos):
+    """
+    Chama funcao(*args) para cada args de 'argumentos' e devolve vazão
+    (operações/s) e latências p50/p99/máxima em ms.
+    """
+    latencias = []
+    inicio_total = time.perf_counter()
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcao(*args)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    total = time.perf_counter() - inicio_total
+
+    latencias.sort()
+    return {
+        "operacoes": len(latencias),
+        "segundos": round(total, 4),
+        "ops_por_segundo": round(len(latencias) / total, 1) if total else None,
+        "p50_ms": round(percentil(latencias, 50), 4),
+        "p99_ms": round(percentil(latencias, 99), 4),
+        "max_ms": round(latencias[-1], 4),
+    }
+
+
+def medir_lote(funcao, *args, linhas):
+    """Para os caminhos em massa: uma única chamada, vazão em linhas/s."""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    return {
+        "linhas": linhas,
+        "segundos": round(segundos, 4),
+        "linhas_por_segundo": round(linhas / segundos, 1) if segundos else None,
+    }, resultado
+
+
+# -----------------------------
+# CENÁRIOS
+# -----------------------------
+
+def _exigir(resultado):
+    """As funções de CRUD devolvem Resposta(ok, mensagem, ...): um erro invalida o benchmark."""
+    if isinstance(resultado, tuple) and resultado and resultado[0] is False:
+        raise RuntimeError(resultado[1])
+    return resultado
+
+
+def benchmarks_cargos(rnd, repeticoes, ids_cargos):
+    from index import crud_cargos as c
+
+    resultados = {}
+    nomes = [f"Cargo Benchmark {i}" for i in range(repeticoes)]
+    resultados["inserir_cargo"] = medir(
+        lambda nome: _exigir(c.inserir_cargo(nome, 1, 0)), ((nome,) for nome in nomes))
+
+    novos = c.listar_cargos_pagina(tamanho=repeticoes, apos_id=max(ids_cargos))["linhas"]
+    novos_ids = [cargo.cargo_id for cargo in novos]
+
+    resultados["listar_cargos_pagina"] = medir(
+        c.listar_cargos_pagina, ((50, rnd.choice(ids_cargos)) for _ in range(repeticoes)))
+    resultados["buscar_cargo"] = medir(
+        c.buscar_cargo, ((rnd.choice(ids_cargos),) for _ in range(repeticoes)))
+    resultados["atualizar_cargo"] = medir(
+        lambda cargo_id: _exigir(c.atualizar_cargo(cargo_id, None, 1, 1)), ((i,) for i in novos_ids))
+    resultados["deletar_cargo"] = medir(
+        lambda cargo_id: _exigir(c.deletar_cargo(cargo_id)), ((i,) for i in novos_ids))
+    return resultados
+
+
+def _novos_funcionarios(rnd, quantidade, primeiro_indice, ids_cargos):
+    """Funcionários válidos (formato do formulário) que não colidem com os gerados."""
+    cpfs = numeros_de_cpf(900_000_000 + primeiro_indice)
+    for i in range(primeiro_indice, primeiro_indice + quantidade):
+        yield (
+            rnd.choice(ids_cargos),
+            f"{rnd.choice(PRIMEIROS_NOMES)} {rnd.choice(SOBRENOMES)}",
+            f"bench{i}@exemplo.com.br",
+            gerar_cpf(next(cpfs)),
+            "11987654321",
+            "01/03/2022",
+            "",
+            "3500,00",
+            1,
+        )
+
+
+def benchmarks_funcionarios(rnd, repeticoes, ids_cargos, ids_funcionarios):
+    from index import crud_funcionarios as f
+
+    resultados = {}
+    resultados["inserir_funcionario"] = medir(
+        lambda *args: _exigir(f.inserir_funcionario(*args)),
+        _novos_funcionarios(rnd, repeticoes, 0, ids_cargos))
+
+    novos = f.buscar_funcionarios("", tamanho=repeticoes, apos_id=max(ids_funcionarios))["linhas"]
+    novos_ids = [funcionario.funcionario_id for funcionario in novos]
+
+    resultados["listar_funcionarios_pagina"] = medir(
+        f.listar_funcionarios_pagina, ((50, rnd.choice(ids_funcionarios)) for _ in range(repeticoes)))
+    resultados["buscar_funcionario"] = medir(
+        f.buscar_funcionario, ((rnd.choice(ids_funcionarios),) for _ in range(repeticoes)))
+    resultados["buscar_funcionarios_nome"] = medir(
+        f.buscar_funcionarios, ((rnd.choice(PRIMEIROS_NOMES)[:3],) for _ in range(repeticoes)))
+    resultados["atualizar_funcionario"] = medir(
+        lambda funcionario_id: _exigir(f.atualizar_funcionario(
+            funcionario_id, None, None, None, None, None, None, None, f"{rnd.randrange(1500, 9000)},00", None)),
+        ((rnd.choice(ids_funcionarios),) for _ in range(repeticoes)))
+
+    # O mesmo UPDATE, agora com um único commit para todas as repetições.
+    def atualizar_em_transacao(ids):
+        with transacao():
+            for funcionario_id in ids:
+                exigir(f.atualizar_funcionario(
+                    funcionario_id, None, None, None, None, None, None, None, f"{rnd.randrange(1500, 9000)},00", None))
+
+    resultados["atualizar_funcionario_transacao"], _ = medir_lote(
+        atualizar_em_transacao, [rnd.choice(ids_funcionarios) for _ in range(repeticoes)], linhas=repeticoes)
+    resultados["deletar_funcionario"] = medir(
+        lambda funcionario_id: _exigir(f.deletar_funcionario(funcionario_id)), ((i,) for i in novos_ids))
+    return resultados
+
+
+def benchmarks_massa(rnd, ids_cargos, pasta, quantidade_importacao):
+    from index import crud_funcionarios as f
+    from index import exportacao
+
+    resultados = {}
+
+    caminho_csv = os.path.join(pasta, "importacao.csv")
+    with open(caminho_csv, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=";")
+        escritor.writerow(f.CAMPOS_IMPORTACAO)
+        for registro in _novos_funcionarios(rnd, quantidade_importacao, 1_000_000, ids_cargos):
+            escritor.writerow(registro[:8] + ("S",))
+
+    resultados["importar_funcionarios"], relatorio = medir_lote(
+        f.importar_funcionarios, caminho_csv, linhas=quantidade_importacao)
+    if relatorio["rejeitados"]:
+        raise RuntimeError(f"Importação rejeitou linhas: {relatorio['rejeitados'][:5]}")
+
+    # exportar() já mede o próprio tempo, a vazão e o pico de memória.
+    resultados["exportar_funcionarios_csv"] = exportacao.exportar_funcionarios(
+        os.path.join(pasta, "exportacao.csv"), "csv")
+    resultados["exportar_funcionarios_jsonl"] = exportacao.exportar_funcionarios(
+        os.path.join(pasta, "exportacao.jsonl"), "jsonl")
+
+    try:
+        from index.validacao_lote import validar_lote
+    except ImportError:  # NumPy não instalado
+        return resultados
+
+    registros = list(_novos_funcionarios(rnd, quantidade_importacao, 2_000_000, ids_cargos))
+    colunas = list(zip(*registros))
+    resultados["validar_lote"], _ = medir_lote(
+        validar_lote, colunas[1], colunas[2], colunas[3], colunas[4], colunas[5], colunas[6], colunas[7],
+        linhas=len(registros))
+    resultados["validar_funcionario_escalar"], _ = medir_lote(
+        lambda: [f.validar_funcionario(*r[1:8]) for r in registros], linhas=len(registros))
+    return resultados
+
+
+def _execucoes(operacao):
+    """Quantos execute a operação já fez (cada um é um parse no protocolo de texto)."""
+    from config.instrumentacao import instrumentacao
+    execucao = instrumentacao.estatisticas().get(operacao, {}).get("execucao")
+    return execucao["quantidade"] if execucao else 0
+
+
+def benchmarks_preparados(rnd, repeticoes, ids_cargos, ids_funcionarios):
+    """
+    As consultas frequentes pelo protocolo de texto (SQL reenviado e analisado
+    a cada chamada) e por statements preparados, com o número de parses de
+    cada caminho. No SQLite os dois caminhos já reaproveitam o statement
+    compilado (cache do módulo sqlite3), então a diferença aparece no MySQL.
+    """
+    from config.config_bd import obter_pool
+    from index import crud_cargos as c
+    from index import crud_funcionarios as f
+
+    cenarios = {
+        "buscar_funcionario": (f.buscar_funcionario, lambda: (rnd.choice(ids_funcionarios),)),
+        "buscar_cargo": (c.buscar_cargo, lambda: (rnd.choice(ids_cargos),)),
+        "listar_funcionarios_pagina": (f.listar_funcionarios_pagina, lambda: (50, rnd.choice(ids_funcionarios))),
+        "atualizar_funcionario": (
+            lambda funcionario_id: _exigir(f.atualizar_funcionario(
+                funcionario_id, None, None, None, None, None, None, None, f"{rnd.randrange(1500, 9000)},00", None)),
+            lambda: (rnd.choice(ids_funcionarios),),
+        ),
+    }
+
+    pool = obter_pool()
+    original = pool.preparar
+    resultados = {}
+    try:
+        for modo in ("texto", "preparado"):
+            pool.preparar = modo == "preparado"
+            for nome, (funcao, argumentos) in cenarios.items():
+                execucoes, preparadas = _execucoes(nome), pool.estatisticas()["preparadas"]
+                medicao = medir(funcao, (argumentos() for _ in range(repeticoes)))
+                executados = _execucoes(nome) - execucoes
+                medicao["parses"] = executados if modo == "texto" else pool.estatisticas()["preparadas"] - preparadas
+                resultados[f"{nome}_{modo}"] = medicao
+    finally:
+        pool.preparar = original
+    return resultados
+
+
+def benchmarks_relatorios(repeticoes):
+    from index.crud_funcionarios import relatorio_funcionarios_por_cargo
+    from index.resumo_cargos import verificar_resumo
+
+    return {
+        "relatorio_funcionarios_por_cargo": medir(relatorio_funcionarios_por_cargo, (() for _ in range(repeticoes))),
+        # A agregação completa, usada na verificação do resumo.
+        "verificar_resumo": medir(verificar_resumo, (() for _ in range(max(1, repeticoes // 20)))),
+    }
+
+
+# -----------------------------
+# EXECUÇÃO
+# -----------------------------
+
+def commit_atual():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ids(tabela, chave):
+    from config.config_bd import conectar_bd
+    conexao = conectar_bd()
+    cursor = conexao.cursor()
+    cursor.execute(f"SELECT {chave} FROM {tabela} ORDER BY {chave}")
+    ids = [linha[0] for linha in cursor.fetchall()]
+    cursor.close()
+    conexao.close()
+    return ids
+
+
+def executar(escala, repeticoes=200, semente=42, backend="sqlite", pasta=None):
+    """Roda a suíte inteira e devolve o dict de resultados."""
+    if pasta is None:
+        with tempfile.TemporaryDirectory(prefix="gestorpro_bench_") as temporaria:
+            return executar(escala, repeticoes, semente, backend, temporaria)
+
+    if backend == "sqlite":
+        usar_backend("sqlite", caminho=os.path.join(pasta, "benchmark.db"))
+    else:
+        # MySQL local, com o banco vazio indicado na configuração.
+        usar_backend("mysql")
+
+    rnd = random.Random(semente)
+    resultados = {
+        "commit": commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "escala": escala,
+        "repeticoes": repeticoes,
+        "semente": semente,
+        "backend": backend_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+    }
+
+    inicio = time.perf_counter()
+    resultados["linhas_geradas"] = popular(escala, semente)
+    resultados["segundos_geracao"] = round(time.perf_counter() - inicio, 2)
+
+    ids_cargos = _ids("cargo", "cargo_id")
+    ids_funcionarios = _ids("funcionario", "funcionario_id")
+    funcionarios = ESCALAS[escala] if escala in ESCALAS else int(escala)
+
+    resultados["crud_cargos"] = benchmarks_cargos(rnd, repeticoes, ids_cargos)
+    resultados["crud_funcionarios"] = benchmarks_funcionarios(rnd, repeticoes, ids_cargos, ids_funcionarios)
+    resultados["massa"] = benchmarks_massa(rnd, ids_cargos, pasta, min(50_000, max(1000, funcionarios // 10)))
+    resultados["relatorios"] = benchmarks_relatorios(repeticoes)
+    resultados["preparados"] = benchmarks_preparados(rnd, repeticoes, ids_cargos, ids_funcionarios)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do GestorPro com dados sintéticos.")
+    parser.add_argument("--escala", default="10k", help="10k, 100k, 1m ou um número de funcionários")
+    parser.add_argument("--repeticoes", type=int, default=200, help="chamadas medidas por função de CRUD")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/<escala>-<commit>.json)")
+    args = parser.parse_args()
+
+    resultados = executar(args.escala, args.repeticoes, args.semente, args.backend)
+
+    saida = args.saida
+    if not saida:
+        os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+        saida = os.path.join(PASTA_RESULTADOS, f"{args.escala}-{resultados['commit'] or 'sem-commit'}.json")
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+
+    json.dump(resultados, sys.stdout, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+
+if __name__ == "__main__":
+    main()
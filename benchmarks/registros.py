@@ -0,0 +1,124 @@
+"""
+Memória por linha: registros Funcionario/Cargo contra os dicts de antes.
+
+Gera N funcionários num banco sintético e lê a tabela inteira duas vezes:
+com cursor(dictionary=True) e a consulta antiga (um dict por linha, 'Sim'/'Não'
+nas colunas booleanas) e com cursor de tuplas + Funcionario.da_linha. Para
+cada forma mede, com tracemalloc, os bytes que a lista de linhas ocupa depois
+da leitura (e o pico durante ela) e o tempo de montagem.
+
+    python -m benchmarks.registros --funcionarios 100000
+    python -m benchmarks.registros --backend mysql
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from config.config_bd import usar_backend, backend_atual, conectar_bd, Error
+from benchmarks.dados_sinteticos import popular
+
+# As listagens antes dos registros: booleanos convertidos em texto no SELECT.
+SELECT_FUNCIONARIOS_DICTS = (
+    "SELECT funcionario_id, cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, "
+    "CASE WHEN ativo = 1 THEN 'Sim' ELSE 'Não' END AS ativo, versao FROM funcionario"
+)
+SELECT_CARGOS_DICTS = (
+    "SELECT cargo_id, cargo_nome, CASE WHEN pode_gerenciar_estoque = 1 THEN 'Sim' ELSE 'Não' END "
+    "AS pode_gerenciar_estoque, CASE WHEN pode_fazer_vendas = 1 THEN 'Sim' ELSE 'Não' END AS pode_fazer_vendas, "
+    "versao FROM cargo"
+)
+
+
+def _ler(query, registro=None):
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+    try:
+        if registro is None:
+            cursor = conexao.cursor(dictionary=True)
+            cursor.execute(query)
+            linhas = cursor.fetchall()
+        else:
+            cursor = conexao.cursor()
+            cursor.execute(query)
+            linhas = list(map(registro, cursor.fetchall()))
+        cursor.close()
+    finally:
+        conexao.close()
+    return linhas
+
+
+def _medir(query, registro=None):
+    """Bytes retidos pela lista de linhas, pico da leitura e segundos."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    linhas = _ler(query, registro)
+    segundos = time.perf_counter() - inicio
+    retidos, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    quantidade = len(linhas)
+    return {
+        "linhas": quantidade,
+        "bytes_por_linha": round(retidos / quantidade, 1) if quantidade else None,
+        "retidos_kb": retidos // 1024,
+        "pico_kb": pico // 1024,
+        "segundos": round(segundos, 3),
+    }
+
+
+def _comparar(antes, depois):
+    economia = antes["bytes_por_linha"] - depois["bytes_por_linha"]
+    return {
+        "dicts": antes,
+        "registros": depois,
+        "economia_bytes_por_linha": round(economia, 1),
+        "economia_percentual": round(economia / antes["bytes_por_linha"] * 100, 1),
+    }
+
+
+def executar(funcionarios, semente=42, backend="sqlite", pasta=None):
+    from index.crud_cargos import SELECT_CARGOS
+    from index.crud_funcionarios import SELECT_FUNCIONARIOS
+    from index.registros import Cargo, Funcionario
+
+    if pasta is None:
+        with tempfile.TemporaryDirectory(prefix="gestorpro_registros_") as temporaria:
+            return executar(funcionarios, semente, backend, temporaria)
+
+    if backend == "sqlite":
+        usar_backend("sqlite", caminho=os.path.join(pasta, "registros.db"))
+    else:
+        usar_backend("mysql")
+
+    popular(funcionarios, semente)
+
+    return {
+        "backend": backend_atual(),
+        "funcionario": _comparar(_medir(SELECT_FUNCIONARIOS_DICTS),
+                                 _medir(SELECT_FUNCIONARIOS, Funcionario.da_linha)),
+        "cargo": _comparar(_medir(SELECT_CARGOS_DICTS), _medir(SELECT_CARGOS, Cargo.da_linha)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória por linha: registros contra dicts.")
+    parser.add_argument("--funcionarios", type=int, default=100_000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    args = parser.parse_args()
+
+    resultado = executar(args.funcionarios, args.semente, args.backend)
+    json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
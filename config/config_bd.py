@@ -1,22 +1,601 @@
-import mysql.connector
-from mysql.connector import Error
+import atexit
+import collections
+import configparser
+import contextlib
+import contextvars
+import os
+import queue
+import threading
+import time
+
+from config.instrumentacao import instrumentacao, configurar as configurar_instrumentacao
+from config.instrumentacao import instrumentar_cursor, registrar_conexao
+
+try:
+    import mysql.connector
+    from mysql.connector import Error
+    from mysql.connector.constants import ClientFlag
+except ImportError:
+    # Sem o driver MySQL só o backend SQLite fica disponível.
+    mysql = None
+
+    class Error(Exception):
+        """Erro de banco de dados (substitui mysql.connector.Error)."""
+
+# -----------------------------
+# CONFIGURAÇÃO
+# -----------------------------
+# Os valores abaixo são apenas os padrões. Eles podem ser sobrescritos pelo
+# arquivo config/gestorpro.ini (ou o caminho em GESTORPRO_CONFIG) e, por
+# último, por variáveis de ambiente no formato GESTORPRO_<SECAO>_<CHAVE>,
+# por exemplo GESTORPRO_BD_PASSWORD ou GESTORPRO_POOL_TAMANHO.
+
+CAMINHO_CONFIG = os.environ.get(
+    "GESTORPRO_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestorpro.ini")
+)
+
+CONFIG_PADRAO = {
+    'bd': {
+        'backend': 'mysql',           # mysql ou sqlite
+        'host': 'localhost',
+        'port': '3306',
+        'user': 'root',
+        'password': '',
+        'database': 'GestorPro_BD',
+        'timeout_conexao': '10',
+        'preparar': 'sim',            # statements preparados no servidor para as consultas frequentes
+    },
+    'sqlite': {
+        'caminho': ':memory:',        # arquivo .db ou :memory:
+    },
+    'cache': {
+        'ttl_cargos': '60',           # segundos até o cache de cargos ser relido
+    },
+    'pool': {
+        'tamanho': '5',               # máximo de conexões abertas ao mesmo tempo
+        'timeout_checkout': '10',     # segundos esperando uma conexão livre
+        'verificar_apos': '30',       # segundos ociosa antes de testar com ping
+    },
+    'instrumentacao': {
+        'ativo': 'sim',               # mede conexão, execute e fetch por operação
+        'lenta_ms': '200',            # consultas acima disso vão para o log
+        'arquivo_lentas': '',         # vazio: o log sai no stderr
+        'despejar_ao_sair': 'nao',    # imprime as estatísticas ao fechar o programa
+    },
+}
+
+
+def carregar_config(caminho=None):
+    """Lê os padrões, o arquivo .ini (se existir) e as variáveis de ambiente."""
+    config = configparser.ConfigParser()
+    # Além de yes/no, true/false, on/off e 1/0.
+    config.BOOLEAN_STATES = {**config.BOOLEAN_STATES, 'sim': True, 'nao': False, 'não': False}
+    config.read_dict(CONFIG_PADRAO)
+    config.read(caminho or CAMINHO_CONFIG, encoding="utf-8")
+
+    for secao in config.sections():
+        for chave in config[secao]:
+            variavel = f"GESTORPRO_{secao}_{chave}".upper()
+            if variavel in os.environ:
+                config[secao][chave] = os.environ[variavel]
+
+    return config
+
+
+CONFIG = carregar_config()
+
+configurar_instrumentacao(CONFIG['instrumentacao'])
+if CONFIG['instrumentacao'].getboolean('despejar_ao_sair'):
+    atexit.register(lambda: print(instrumentacao.relatorio()))
 
 DB_CONFIG = {
-    'host': 'localhost',
-    'port': 3306,
-    'user': 'root',
-    'password': 'F&rradura01',
-    'database': 'GestorPro_BD'
+    'host': CONFIG['bd']['host'],
+    'port': CONFIG['bd'].getint('port'),
+    'user': CONFIG['bd']['user'],
+    'password': CONFIG['bd']['password'],
+    'database': CONFIG['bd']['database'],
+    'connection_timeout': CONFIG['bd'].getint('timeout_conexao'),
 }
 
+
+# Códigos de erro do MySQL que as funções de CRUD distinguem; o backend
+# SQLite põe os mesmos em Error.errno nas falhas equivalentes.
+ERRO_CHAVE_DUPLICADA = 1062       # ER_DUP_ENTRY: valor repetido numa chave única
+ERRO_LINHA_REFERENCIADA = 1451    # ER_ROW_IS_REFERENCED_2: apagar uma linha ainda referenciada
+ERRO_SEM_LINHA_PAI = 1452         # ER_NO_REFERENCED_ROW_2: chave estrangeira para uma linha inexistente
+
+
+# -----------------------------
+# POOL DE CONEXÕES
+# -----------------------------
+
+class PoolEsgotado(Error):
+    """Nenhuma conexão ficou livre dentro do tempo de espera do pool."""
+
+
+# Statements preparados guardados por conexão física; os menos usados
+# recentemente são fechados quando o limite é atingido.
+LIMITE_PREPARADAS = 64
+
+
+class ConsultaPreparada:
+    """
+    Statement preparado no servidor (protocolo binário do MySQL), guardado na
+    conexão física com um nome, ex.: "funcionario.deletar". O SQL é enviado e
+    analisado uma única vez por conexão; as execuções seguintes mandam só os
+    parâmetros.
+
+    O cursor devolvido por executar() pertence à consulta: leia todas as
+    linhas (fetchall) antes de usar a conexão de novo e não o feche.
+    """
+
+    def __init__(self, conexao, sql):
+        self.sql = sql
+        self._cursor = instrumentar_cursor(conexao.cursor(prepared=True))
+
+    def executar(self, params=()):
+        self._cursor.execute(self.sql, params)
+        return self._cursor
+
+    def fechar(self):
+        try:
+            self._cursor.close()
+        except Exception:
+            pass
+
+
+class ConsultaTexto:
+    """Mesma interface de ConsultaPreparada, pelo protocolo de texto (SQL reenviado a cada chamada)."""
+
+    def __init__(self, conexao, sql):
+        self.sql = sql
+        self._conexao = conexao
+
+    def executar(self, params=()):
+        cursor = instrumentar_cursor(self._conexao.cursor())
+        cursor.execute(self.sql, params)
+        return cursor
+
+
+class ConexaoDoPool:
+    """
+    Conexão emprestada do pool. Se comporta como a conexão original,
+    mas close() devolve a conexão ao pool em vez de fechá-la.
+    """
+
+    def __init__(self, pool, conexao):
+        self._pool = pool
+        self._conexao = conexao
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+    def cursor(self, *args, **kwargs):
+        return instrumentar_cursor(self._conexao.cursor(*args, **kwargs))
+
+    def preparada(self, nome, sql):
+        """A ConsultaPreparada 'nome' desta conexão (preparada na primeira chamada)."""
+        return self._pool.preparada(self._conexao, nome, sql)
+
+    def close(self):
+        if self._conexao is not None:
+            self._pool.devolver(self._conexao)
+            self._conexao = None
+
+    def descartar(self):
+        """Fecha a conexão de vez (ex.: ficou com resultado pendente no cursor)."""
+        if self._conexao is not None:
+            self._pool.descartar(self._conexao)
+            self._conexao = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PoolConexoes:
+    """
+    Mantém até 'tamanho' conexões abertas e as reaproveita entre as chamadas.
+    Conexões ociosas há mais de 'verificar_apos' segundos são testadas antes
+    de serem emprestadas; as que não respondem são descartadas e recriadas.
+    """
+
+    def __init__(self, fabrica, tamanho=5, timeout_checkout=10.0, verificar_apos=30.0, preparar=True):
+        self.fabrica = fabrica
+        self.tamanho = tamanho
+        self.timeout_checkout = timeout_checkout
+        self.verificar_apos = verificar_apos
+        # False: as consultas "preparadas" usam o protocolo de texto (para comparação).
+        self.preparar = preparar
+
+        # id(conexão física) -> OrderedDict nome -> ConsultaPreparada. Cada
+        # conexão só é usada por quem a tomou emprestada, então não há disputa.
+        self._preparadas = {}
+
+        # LIFO: a conexão usada mais recentemente é a mais provável de estar viva.
+        self._livres = queue.LifoQueue()
+        self._abertas = 0
+        self._lock = threading.Lock()
+        self._metricas = {
+            'emprestimos': 0,
+            'devolucoes': 0,
+            'criadas': 0,
+            'descartadas': 0,
+            'esperas': 0,           # empréstimos que precisaram aguardar uma devolução
+            'esgotamentos': 0,      # empréstimos que desistiram por timeout
+            'tempo_espera_total': 0.0,
+            'tempo_espera_max': 0.0,
+            'em_uso': 0,
+            'pico_em_uso': 0,
+            'preparadas': 0,        # statements preparados (cada um custa um parse no servidor)
+        }
+
+    # --- Empréstimo ---
+
+    def emprestar(self):
+        """Retorna uma ConexaoDoPool ou levanta PoolEsgotado após o timeout."""
+        inicio = time.perf_counter()
+        limite = inicio + self.timeout_checkout
+        esperou = False
+
+        while True:
+            conexao, ociosa_desde, esperou_agora = self._obter(limite)
+            esperou = esperou or esperou_agora
+
+            if ociosa_desde is None or self._esta_viva(conexao, ociosa_desde):
+                break
+            self._descartar(conexao)
+
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            m = self._metricas
+            m['emprestimos'] += 1
+            m['em_uso'] += 1
+            m['pico_em_uso'] = max(m['pico_em_uso'], m['em_uso'])
+            if esperou:
+                m['esperas'] += 1
+                m['tempo_espera_total'] += espera
+                m['tempo_espera_max'] = max(m['tempo_espera_max'], espera)
+
+        return ConexaoDoPool(self, conexao)
+
+    def _obter(self, limite):
+        """Pega uma conexão livre, cria uma nova ou espera uma devolução."""
+        try:
+            conexao, ociosa_desde = self._livres.get_nowait()
+            return conexao, ociosa_desde, False
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            pode_criar = self._abertas < self.tamanho
+            if pode_criar:
+                self._abertas += 1
+
+        if pode_criar:
+            try:
+                conexao = self.fabrica()
+            except Exception:
+                with self._lock:
+                    self._abertas -= 1
+                raise
+            with self._lock:
+                self._metricas['criadas'] += 1
+            return conexao, None, False
+
+        restante = limite - time.perf_counter()
+        try:
+            if restante <= 0:
+                raise queue.Empty
+            conexao, ociosa_desde = self._livres.get(timeout=restante)
+            return conexao, ociosa_desde, True
+        except queue.Empty:
+            with self._lock:
+                self._metricas['esgotamentos'] += 1
+            raise PoolEsgotado(
+                f"Pool esgotado: nenhuma das {self.tamanho} conexões foi liberada "
+                f"em {self.timeout_checkout}s."
+            )
+
+    def _esta_viva(self, conexao, ociosa_desde):
+        # Conexões usadas há pouco não pagam o round trip do ping.
+        if time.monotonic() - ociosa_desde < self.verificar_apos:
+            return True
+        try:
+            return conexao.is_connected()
+        except Exception:
+            return False
+
+    # --- Statements preparados ---
+
+    def preparada(self, conexao, nome, sql):
+        if not self.preparar:
+            return ConsultaTexto(conexao, sql)
+
+        cache = self._preparadas.setdefault(id(conexao), collections.OrderedDict())
+        consulta = cache.get(nome)
+        if consulta is not None and consulta.sql == sql:
+            cache.move_to_end(nome)
+            return consulta
+
+        if consulta is not None:
+            consulta.fechar()
+        consulta = cache[nome] = ConsultaPreparada(conexao, sql)
+        if len(cache) > LIMITE_PREPARADAS:
+            cache.popitem(last=False)[1].fechar()
+        with self._lock:
+            self._metricas['preparadas'] += 1
+        return consulta
+
+    # --- Devolução ---
+
+    def devolver(self, conexao):
+        """Desfaz transações pendentes e coloca a conexão de volta na fila."""
+        try:
+            # Sem isso, a próxima chamada herdaria o snapshot (REPEATABLE READ)
+            # ou as alterações não confirmadas da anterior.
+            if conexao.in_transaction:
+                conexao.rollback()
+        except Exception:
+            self.descartar(conexao)
+            return
+
+        with self._lock:
+            self._metricas['devolucoes'] += 1
+            self._metricas['em_uso'] -= 1
+        self._livres.put((conexao, time.monotonic()))
+
+    def descartar(self, conexao):
+        """Fecha uma conexão emprestada em vez de devolvê-la à fila."""
+        with self._lock:
+            self._metricas['em_uso'] -= 1
+        self._descartar(conexao)
+
+    def _descartar(self, conexao):
+        self._preparadas.pop(id(conexao), None)
+        try:
+            conexao.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._abertas -= 1
+            self._metricas['descartadas'] += 1
+
+    def fechar(self):
+        """Fecha todas as conexões livres (as emprestadas fecham ao voltar)."""
+        while True:
+            try:
+                conexao, _ = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(conexao)
+
+    def estatisticas(self):
+        with self._lock:
+            estatisticas = dict(self._metricas)
+            estatisticas['abertas'] = self._abertas
+        estatisticas['livres'] = self._livres.qsize()
+        estatisticas['tamanho'] = self.tamanho
+        return estatisticas
+
+
+# -----------------------------
+# BACKENDS
+# -----------------------------
+
+def _conectar_mysql():
+    if mysql is None:
+        raise Error("O pacote mysql-connector-python não está instalado.")
+    # FOUND_ROWS: o rowcount de um UPDATE conta as linhas encontradas, não só
+    # as que mudaram (os UPDATEs parciais usam isso para detectar ID inexistente).
+    return mysql.connector.connect(**DB_CONFIG, client_flags=[ClientFlag.FOUND_ROWS])
+
+
+def _conectar_sqlite():
+    from config.sqlite_bd import conectar_sqlite
+    return conectar_sqlite(CONFIG['sqlite']['caminho'])
+
+
+BACKENDS = {
+    'mysql': _conectar_mysql,
+    'sqlite': _conectar_sqlite,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def backend_atual():
+    """Nome do backend configurado ('mysql' ou 'sqlite')."""
+    return CONFIG['bd']['backend']
+
+
+def usar_backend(nome, **opcoes):
+    """
+    Troca o backend em tempo de execução, por exemplo
+    usar_backend('sqlite', caminho=':memory:') em benchmarks.
+    """
+    global _pool
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {nome}")
+
+    CONFIG['bd']['backend'] = nome
+    for chave, valor in opcoes.items():
+        secao = 'sqlite' if nome == 'sqlite' else 'bd'
+        CONFIG[secao][chave] = str(valor)
+    DB_CONFIG.update({chave: valor for chave, valor in opcoes.items() if chave in DB_CONFIG})
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.fechar()
+        _pool = None
+
+
+def obter_pool():
+    """Cria o pool na primeira chamada, com as configurações carregadas."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                backend = backend_atual()
+                tamanho = CONFIG['pool'].getint('tamanho')
+                if backend == 'sqlite' and CONFIG['sqlite']['caminho'] == ':memory:':
+                    # O banco em memória compartilhado trava tabelas entre
+                    # conexões concorrentes; uma única conexão basta.
+                    tamanho = 1
+                _pool = PoolConexoes(
+                    BACKENDS[backend],
+                    tamanho=tamanho,
+                    timeout_checkout=CONFIG['pool'].getfloat('timeout_checkout'),
+                    verificar_apos=CONFIG['pool'].getfloat('verificar_apos'),
+                    preparar=CONFIG['bd'].getboolean('preparar'),
+                )
+    return _pool
+
+
+def estatisticas_pool():
+    """Métricas de uso do pool (empréstimos, esperas, esgotamentos...)."""
+    return obter_pool().estatisticas()
+
+
 def conectar_bd():
     """
-    Tenta se conectar ao banco de dados e retorna a conexão.
+    Empresta uma conexão do pool. Chamar close() nela a devolve ao pool.
+    Dentro de transacao(), devolve a conexão da transação.
     Retorna None se ocorrer erro.
     """
+    atual = _transacao_atual.get()
+    if atual is not None:
+        return atual
+
+    inicio = time.perf_counter()
     try:
-        conexao = mysql.connector.connect(**DB_CONFIG)
-        return conexao
+        conexao = obter_pool().emprestar()
     except Error as e:
-        print(f"Erro ao conectar ao MySQL: {e}")
+        instrumentacao.registrar_erro()
+        print(f"Erro ao conectar ao banco de dados: {e}")
         return None
+    registrar_conexao(time.perf_counter() - inicio)
+    return conexao
+
+
+# -----------------------------
+# TRANSAÇÃO COMPARTILHADA (UNIDADE DE TRABALHO)
+# -----------------------------
+# Cada função de CRUD abre a própria conexão e faz o próprio commit. Dentro de
+# um bloco "with transacao():" elas passam a usar a mesma conexão, e o commit
+# (um só, com um só fsync) acontece no fim do bloco. A transação pertence ao
+# contexto (thread) que a abriu: funções enviadas para o ExecutorBD não a veem.
+
+_transacao_atual = contextvars.ContextVar("transacao_bd", default=None)
+
+
+class TransacaoDesfeita(Error):
+    """A transação compartilhada foi desfeita por uma das operações."""
+
+
+class ConexaoDaTransacao:
+    """
+    Conexão entregue por conectar_bd() dentro de transacao(). As funções de
+    CRUD continuam chamando commit(), rollback() e close() como sempre:
+    commit() e close() não fazem nada, e rollback() não desfaz só a parte de
+    quem chamou, marca a transação inteira para ser desfeita no fim.
+    """
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+        self.desfeita = False
+        self._ao_terminar = []
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.desfeita = True
+
+    def close(self):
+        pass
+
+    def descartar(self):
+        pass
+
+
+@contextlib.contextmanager
+def transacao():
+    """
+    Agrupa várias chamadas de CRUD numa única transação, com uma só conexão
+    e um só commit no fim. Tudo é desfeito se o bloco levantar uma exceção ou
+    se alguma operação chamar rollback() (ex.: conflito de versão, erro do
+    banco no meio de uma alteração); no segundo caso, o fim do bloco levanta
+    TransacaoDesfeita.
+
+        with transacao():
+            exigir(inserir_cargo(...))
+            for funcionario_id in ids:
+                exigir(atualizar_funcionario(funcionario_id, cargo_id, ...))
+
+    As recusas de validação não tocam no banco e só chegam a quem chamou como
+    uma Resposta com ok False; exigir() as transforma em TransacaoDesfeita.
+    Uma transacao() dentro de outra participa da mais externa.
+    """
+    atual = _transacao_atual.get()
+    if atual is not None:
+        yield atual
+        return
+
+    inicio = time.perf_counter()
+    conexao = obter_pool().emprestar()
+    registrar_conexao(time.perf_counter() - inicio)
+
+    unidade = ConexaoDaTransacao(conexao)
+    token = _transacao_atual.set(unidade)
+    try:
+        yield unidade
+        if unidade.desfeita:
+            raise TransacaoDesfeita("Uma das operações falhou e a transação foi desfeita.")
+        conexao.commit()
+    finally:
+        _transacao_atual.reset(token)
+        # Sem o commit, o pool desfaz a transação ao receber a conexão de volta.
+        conexao.close()
+        for funcao in unidade._ao_terminar:
+            funcao()
+
+
+def em_transacao():
+    """True dentro de um bloco transacao() (as operações não confirmam sozinhas)."""
+    return _transacao_atual.get() is not None
+
+
+def exigir(resultado):
+    """
+    Para as funções que devolvem (ok, mensagem) ou uma Resposta
+    (index.resposta): devolve a mensagem ou, se ok for False, levanta
+    TransacaoDesfeita com ela (desfazendo o bloco). O código da Resposta,
+    se houver, vai em TransacaoDesfeita.codigo.
+    """
+    ok, mensagem = resultado[:2]
+    if not ok:
+        erro = TransacaoDesfeita(mensagem)
+        erro.codigo = getattr(resultado, "codigo", None)
+        raise erro
+    return mensagem
+
+
+def apos_transacao(funcao):
+    """
+    Chama 'funcao' quando a transação atual terminar (confirmada ou desfeita)
+    ou na hora, fora de uma transação. Serve para invalidar caches, que dentro
+    do bloco podem ter lido dados ainda não confirmados.
+    """
+    atual = _transacao_atual.get()
+    if atual is None:
+        funcao()
+    elif funcao not in atual._ao_terminar:
+        atual._ao_terminar.append(funcao)
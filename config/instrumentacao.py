@@ -0,0 +1,308 @@
+"""
+Instrumentação das chamadas ao banco.
+
+Cada função de CRUD marcada com @operacao dá nome às consultas que faz. Para
+cada nome são acumulados, em histogramas de latência, o tempo para obter a
+conexão do pool, o tempo de execute e o tempo de fetch, além do número de
+chamadas, linhas lidas e erros. As consultas que passam do limite configurado
+vão para o log de consultas lentas com o SQL normalizado (valores trocados
+por '?'), de modo que execuções da mesma consulta fiquem agrupadas.
+
+Configuração (seção [instrumentacao] do gestorpro.ini):
+    ativo            liga/desliga a coleta
+    lenta_ms         a partir de quantos ms uma consulta é considerada lenta
+    arquivo_lentas   arquivo do log de consultas lentas (vazio: só stderr)
+    despejar_ao_sair imprime o relatório quando o programa termina
+"""
+import bisect
+import contextvars
+import functools
+import logging
+import re
+import threading
+import time
+
+# Limites superiores (ms) das faixas dos histogramas; a última é "acima de 5 s".
+FAIXAS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+FASES = ("conexao", "execucao", "leitura")
+
+SEM_NOME = "(sem nome)"
+
+_operacao_atual = contextvars.ContextVar("operacao_bd", default=SEM_NOME)
+
+log_lentas = logging.getLogger("gestorpro.consultas_lentas")
+
+
+# -----------------------------
+# HISTOGRAMA
+# -----------------------------
+
+class Histograma:
+    """Contagem de latências em faixas fixas; barato de atualizar e de somar."""
+
+    def __init__(self):
+        self.contagens = [0] * len(FAIXAS_MS)
+        self.quantidade = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+
+    def registrar(self, ms):
+        self.contagens[bisect.bisect_left(FAIXAS_MS, ms)] += 1
+        self.quantidade += 1
+        self.total_ms += ms
+        self.maximo_ms = max(self.maximo_ms, ms)
+
+    def percentil(self, p):
+        """Limite superior da faixa que contém o percentil p (0-100)."""
+        if not self.quantidade:
+            return None
+        alvo = self.quantidade * p / 100
+        acumulado = 0
+        for limite, contagem in zip(FAIXAS_MS, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(limite, self.maximo_ms)
+        return self.maximo_ms
+
+    def resumo(self):
+        if not self.quantidade:
+            return None
+        return {
+            "quantidade": self.quantidade,
+            "media_ms": round(self.total_ms / self.quantidade, 3),
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "p99_ms": self.percentil(99),
+            "max_ms": round(self.maximo_ms, 3),
+        }
+
+
+# -----------------------------
+# REGISTRO
+# -----------------------------
+
+class Instrumentacao:
+    """Estatísticas por operação, compartilhadas entre as threads."""
+
+    def __init__(self, ativo=True, lenta_ms=200.0):
+        self.ativo = ativo
+        self.lenta_ms = lenta_ms
+        self._lock = threading.Lock()
+        self._operacoes = {}
+
+    def _dados(self, nome):
+        dados = self._operacoes.get(nome)
+        if dados is None:
+            dados = {"chamadas": 0, "linhas": 0, "erros": 0}
+            dados.update({fase: Histograma() for fase in FASES})
+            self._operacoes[nome] = dados
+        return dados
+
+    def contar_chamada(self, nome):
+        with self._lock:
+            self._dados(nome)["chamadas"] += 1
+
+    def registrar(self, fase, segundos, linhas=0):
+        with self._lock:
+            dados = self._dados(_operacao_atual.get())
+            dados[fase].registrar(segundos * 1000)
+            dados["linhas"] += linhas
+
+    def registrar_erro(self):
+        with self._lock:
+            self._dados(_operacao_atual.get())["erros"] += 1
+
+    def consulta_concluida(self, sql, segundos):
+        ms = segundos * 1000
+        if ms >= self.lenta_ms:
+            log_lentas.warning("%.1f ms [%s] %s", ms, _operacao_atual.get(), normalizar_sql(sql))
+
+    def estatisticas(self):
+        """dict operação -> chamadas, linhas, erros e o resumo de cada fase."""
+        with self._lock:
+            resultado = {}
+            for nome, dados in self._operacoes.items():
+                resultado[nome] = {
+                    "chamadas": dados["chamadas"],
+                    "linhas": dados["linhas"],
+                    "erros": dados["erros"],
+                }
+                resultado[nome].update({fase: dados[fase].resumo() for fase in FASES})
+        return resultado
+
+    def limpar(self):
+        with self._lock:
+            self._operacoes.clear()
+
+    def relatorio(self):
+        """As estatísticas em texto, uma linha por operação e fase."""
+        linhas = [
+            f"{'operação':<32}{'fase':<10}{'n':>7}{'média':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'máx':>9}"
+            f"{'linhas':>9}{'erros':>7}"
+        ]
+        for nome, dados in sorted(self.estatisticas().items()):
+            primeira = True
+            for fase in FASES:
+                h = dados[fase]
+                if h is None:
+                    continue
+                extras = f"{dados['linhas']:>9}{dados['erros']:>7}" if primeira else ""
+                linhas.append(
+                    f"{nome if primeira else '':<32}{fase:<10}{h['quantidade']:>7}{h['media_ms']:>9.2f}"
+                    f"{h['p50_ms']:>8.2f}{h['p95_ms']:>8.2f}{h['p99_ms']:>8.2f}{h['max_ms']:>9.2f}{extras}"
+                )
+                primeira = False
+        linhas.append("(tempos em ms; percentis pelo limite da faixa do histograma)")
+        return "\n".join(linhas)
+
+
+instrumentacao = Instrumentacao()
+
+
+def configurar(secao):
+    """Aplica a seção [instrumentacao] da configuração."""
+    instrumentacao.ativo = secao.getboolean("ativo")
+    instrumentacao.lenta_ms = secao.getfloat("lenta_ms")
+
+    if not log_lentas.handlers:
+        arquivo = secao.get("arquivo_lentas")
+        handler = logging.FileHandler(arquivo, encoding="utf-8") if arquivo else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        log_lentas.addHandler(handler)
+        log_lentas.propagate = False
+
+
+# -----------------------------
+# NOME DAS OPERAÇÕES
+# -----------------------------
+
+def operacao(funcao=None, nome=None):
+    """
+    Decorador que dá nome às consultas feitas dentro da função
+    (por padrão, o próprio nome dela) e conta as chamadas.
+
+        @operacao
+        def listar_funcionarios(): ...
+    """
+    if funcao is None:
+        return functools.partial(operacao, nome=nome)
+
+    nome = nome or funcao.__name__
+
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        if not instrumentacao.ativo:
+            return funcao(*args, **kwargs)
+        instrumentacao.contar_chamada(nome)
+        token = _operacao_atual.set(nome)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _operacao_atual.reset(token)
+
+    return envolvida
+
+
+# -----------------------------
+# SQL NORMALIZADO
+# -----------------------------
+
+_RE_TEXTO = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_MARCADOR = re.compile(r"%s|\?")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalizar_sql(sql):
+    """'SELECT * FROM t WHERE id = 42 AND n IN (1, 2)' -> 'SELECT * FROM t WHERE id = ? AND n IN (?+)'."""
+    sql = " ".join(str(sql).split())
+    sql = _RE_TEXTO.sub("?", sql)
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_MARCADOR.sub("?", sql)
+    return _RE_LISTA.sub("(?+)", sql)
+
+
+# -----------------------------
+# CURSOR INSTRUMENTADO
+# -----------------------------
+
+class CursorInstrumentado:
+    """
+    Envolve o cursor do driver medindo execute/executemany e os fetch*.
+    O tempo de uma consulta (execute + leituras) é conferido contra o limite
+    de consulta lenta quando ela termina: no fetchall, no próximo execute ou
+    no close.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+        self._tempo_consulta = 0.0
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _concluir_consulta(self):
+        if self._sql is not None:
+            instrumentacao.consulta_concluida(self._sql, self._tempo_consulta)
+            self._sql = None
+
+    def _medir(self, funcao, *args):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args)
+        except Exception:
+            instrumentacao.registrar_erro()
+            raise
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._tempo_consulta += segundos
+        return resultado, segundos
+
+    def execute(self, sql, params=()):
+        self._concluir_consulta()
+        self._sql, self._tempo_consulta = sql, 0.0
+        resultado, segundos = self._medir(self._cursor.execute, sql, params)
+        instrumentacao.registrar("execucao", segundos)
+        return resultado
+
+    def executemany(self, sql, sequencia):
+        self._concluir_consulta()
+        self._sql, self._tempo_consulta = sql, 0.0
+        resultado, segundos = self._medir(self._cursor.executemany, sql, sequencia)
+        instrumentacao.registrar("execucao", segundos)
+        return resultado
+
+    def fetchone(self):
+        linha, segundos = self._medir(self._cursor.fetchone)
+        instrumentacao.registrar("leitura", segundos, 0 if linha is None else 1)
+        return linha
+
+    def fetchmany(self, tamanho=1):
+        linhas, segundos = self._medir(self._cursor.fetchmany, tamanho)
+        instrumentacao.registrar("leitura", segundos, len(linhas))
+        return linhas
+
+    def fetchall(self):
+        linhas, segundos = self._medir(self._cursor.fetchall)
+        instrumentacao.registrar("leitura", segundos, len(linhas))
+        self._concluir_consulta()
+        return linhas
+
+    def close(self):
+        self._concluir_consulta()
+        return self._cursor.close()
+
+
+def registrar_conexao(segundos):
+    """Tempo gasto para obter uma conexão do pool (inclui criar e testar)."""
+    if instrumentacao.ativo:
+        instrumentacao.registrar("conexao", segundos)
+
+
+def instrumentar_cursor(cursor):
+    return CursorInstrumentado(cursor) if instrumentacao.ativo else cursor
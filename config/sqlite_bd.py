@@ -0,0 +1,300 @@
+"""
+Backend SQLite embutido: permite rodar e medir a aplicação sem um servidor MySQL.
+
+As conexões imitam a interface do mysql.connector usada pelos CRUDs
+(placeholders %s, cursor(dictionary=True), lastrowid, rowcount, in_transaction,
+is_connected) e o esquema é traduzido a partir de BD/gestorpro_bd.sql.
+"""
+import functools
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+
+from config.config_bd import Error, ERRO_CHAVE_DUPLICADA, ERRO_LINHA_REFERENCIADA, ERRO_SEM_LINHA_PAI
+
+CAMINHO_SCHEMA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "BD", "gestorpro_bd.sql"
+)
+
+# Tipos equivalentes aos devolvidos pelo mysql.connector (date, datetime, Decimal).
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(" "))
+sqlite3.register_converter("DATE", lambda valor: date.fromisoformat(valor.decode()))
+sqlite3.register_converter("DATETIME", lambda valor: datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter("DECIMAL", lambda valor: Decimal(valor.decode()))
+
+# Colunas procuradas por prefixo ("nome_busca LIKE 'jo%'", ver condicoes_busca).
+# O LIKE do SQLite não diferencia maiúsculas, como o do MySQL com collation
+# _ci, mas só usa um índice para isso se ele for COLLATE NOCASE.
+INDICES_BUSCA_PREFIXO = {"funcionario": ("nome_busca", "email", "cpf")}
+
+
+# -----------------------------
+# TRADUÇÃO DO ESQUEMA MYSQL
+# -----------------------------
+
+def _dividir_itens(corpo):
+    """Separa as definições de um CREATE TABLE pelas vírgulas de nível zero."""
+    itens, atual, nivel = [], [], 0
+    for c in corpo:
+        if c == "(":
+            nivel += 1
+        elif c == ")":
+            nivel -= 1
+        if c == "," and nivel == 0:
+            itens.append("".join(atual).strip())
+            atual = []
+        else:
+            atual.append(c)
+    if "".join(atual).strip():
+        itens.append("".join(atual).strip())
+    return itens
+
+
+def indice_busca_prefixo(tabela, coluna):
+    """(nome, colunas) do índice NOCASE que atende 'coluna LIKE ...' no SQLite."""
+    return f"idx_{tabela}_{coluna}_prefixo", f"{coluna} COLLATE NOCASE"
+
+
+def gatilho_atualizacao(tabela, coluna):
+    """CREATE TRIGGER que faz o papel de 'coluna ... ON UPDATE CURRENT_TIMESTAMP'."""
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS tg_{tabela}_{coluna} AFTER UPDATE ON {tabela} "
+        f"FOR EACH ROW WHEN NEW.{coluna} IS OLD.{coluna} BEGIN "
+        f"UPDATE {tabela} SET {coluna} = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+    )
+
+
+def _traduzir_create_table(comando):
+    cabecalho, _, resto = comando.partition("(")
+    corpo = resto[:resto.rindex(")")]
+    tabela = cabecalho.split()[-1].strip("`")
+
+    itens = _dividir_itens(corpo)
+    colunas, indices, gatilhos = [], [], []
+    autoincremento = None
+
+    for item in itens:
+        # Índices comuns/FULLTEXT viram CREATE INDEX separados.
+        m = re.match(r"(?:FULLTEXT\s+)?(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$", item, re.I)
+        if m:
+            indices.append(f"CREATE INDEX IF NOT EXISTS {m.group(1)} ON {tabela} ({m.group(2)})")
+            continue
+
+        # Com o nome do MySQL, para a migração (index.migracao) achar o índice.
+        m = re.match(r"UNIQUE\s+KEY\s+(\w+)\s*\((.*)\)$", item, re.I)
+        if m:
+            indices.append(f"CREATE UNIQUE INDEX IF NOT EXISTS {m.group(1)} ON {tabela} ({m.group(2)})")
+            continue
+
+        m = re.match(r"PRIMARY\s+KEY\s*\((\w+)\)$", item, re.I)
+        if m and m.group(1) == autoincremento:
+            continue  # já declarada junto com a coluna
+
+        m = re.match(r"(\w+)\s+INT\b.*AUTO_INCREMENT", item, re.I)
+        if m:
+            autoincremento = m.group(1)
+            colunas.append(f"{autoincremento} INTEGER PRIMARY KEY AUTOINCREMENT")
+            continue
+
+        # ON UPDATE CURRENT_TIMESTAMP não existe no SQLite: vira um gatilho.
+        m = re.match(r"(\w+)\s.*\sON\s+UPDATE\s+CURRENT_TIMESTAMP", item, re.I)
+        if m:
+            item = re.sub(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP", "", item, flags=re.I)
+            gatilhos.append(gatilho_atualizacao(tabela, m.group(1)))
+
+        item = re.sub(r"^(\w+)\s+ENUM\s*\((.*?)\)", r"\1 TEXT CHECK (\1 IN (\2))", item, flags=re.I)
+        colunas.append(item)
+
+    nomes_colunas = {coluna.split()[0] for coluna in colunas}
+    for coluna in INDICES_BUSCA_PREFIXO.get(tabela, ()):
+        if coluna in nomes_colunas:
+            nome, definicao = indice_busca_prefixo(tabela, coluna)
+            indices.append(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({definicao})")
+
+    tabela_sql = f"CREATE TABLE IF NOT EXISTS {tabela} (\n  " + ",\n  ".join(colunas) + "\n)"
+    return [tabela_sql] + indices + gatilhos
+
+
+def traduzir_schema(sql_mysql):
+    """Converte o script MySQL do projeto em uma lista de comandos SQLite."""
+    sql = re.sub(r"(--|#)[^\n]*", "", sql_mysql)
+    comandos = []
+
+    for comando in sql.split(";"):
+        comando = " ".join(comando.split())
+        if not comando:
+            continue
+
+        palavras = comando.upper().split()
+        if palavras[0] == "USE" or palavras[:2] in (["CREATE", "SCHEMA"], ["CREATE", "DATABASE"]):
+            continue
+
+        if palavras[:2] == ["CREATE", "TABLE"]:
+            comandos.extend(_traduzir_create_table(comando))
+        else:
+            comandos.append(comando)
+
+    return comandos
+
+
+# -----------------------------
+# CONEXÃO E CURSOR
+# -----------------------------
+
+_RE_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\s*$", re.I)
+
+
+@functools.lru_cache(maxsize=256)
+def _traduzir_query(query):
+    """
+    Troca %s por ? e tira o FOR UPDATE, que o SQLite não tem.
+    Devolve (query, trava), com trava=True se a consulta era SELECT ... FOR UPDATE.
+    """
+    query = query.replace("%s", "?")
+    trava = _RE_FOR_UPDATE.search(query)
+    return (query[:trava.start()], True) if trava else (query, False)
+
+
+def _erro(e, query):
+    """sqlite3.Error -> Error, com o errno do MySQL nas violações de chave."""
+    erro = Error(str(e))
+    if isinstance(e, sqlite3.IntegrityError):
+        mensagem = str(e)
+        if mensagem.startswith("UNIQUE constraint failed"):
+            erro.errno = ERRO_CHAVE_DUPLICADA
+        elif mensagem.startswith("FOREIGN KEY constraint failed"):
+            # O SQLite não diz qual lado falhou: num DELETE é a linha referenciada.
+            apagando = query.lstrip().upper().startswith("DELETE")
+            erro.errno = ERRO_LINHA_REFERENCIADA if apagando else ERRO_SEM_LINHA_PAI
+    return erro
+
+
+class CursorSQLite:
+    """Cursor com a mesma interface que os CRUDs usam do mysql.connector."""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def _linha(self, linha):
+        if linha is None or not self._dictionary:
+            return linha
+        return dict(zip(self.column_names, linha))
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self._cursor.description or ())
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, params=()):
+        query, trava = _traduzir_query(query)
+        try:
+            if trava and not self._cursor.connection.in_transaction:
+                # No lugar das travas de linha, a transação já começa com a
+                # trava de escrita do banco (as outras escritas esperam).
+                self._cursor.execute("BEGIN IMMEDIATE")
+            self._cursor.execute(query, params or ())
+        except sqlite3.Error as e:
+            raise _erro(e, query) from e
+
+    def executemany(self, query, seq_params):
+        query = _traduzir_query(query)[0]
+        try:
+            self._cursor.executemany(query, seq_params)
+        except sqlite3.Error as e:
+            raise _erro(e, query) from e
+
+    def fetchone(self):
+        return self._linha(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._linha(linha) for linha in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._linha(linha) for linha in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexaoSQLite:
+    """Conexão SQLite compatível com o uso que o projeto faz do mysql.connector."""
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+
+    def cursor(self, dictionary=False, buffered=None, prepared=None):
+        # 'buffered' e 'prepared' não se aplicam: o sqlite3 já lê sob demanda
+        # e mantém um cache próprio de statements compilados (por SQL, em
+        # cada conexão), que faz o papel dos statements preparados do MySQL.
+        return CursorSQLite(self._conexao.cursor(), dictionary=dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._conexao.in_transaction
+
+    def commit(self):
+        self._conexao.commit()
+
+    def rollback(self):
+        self._conexao.rollback()
+
+    def is_connected(self):
+        try:
+            self._conexao.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._conexao.close()
+
+
+def conectar_sqlite(caminho=":memory:", caminho_schema=CAMINHO_SCHEMA):
+    """
+    Abre o banco SQLite e cria as tabelas na primeira vez.
+    ':memory:' usa um banco em memória compartilhado pelas conexões do pool.
+    """
+    if caminho == ":memory:":
+        alvo, uri = "file:gestorpro_memoria?mode=memory&cache=shared", True
+    else:
+        alvo, uri = caminho, False
+
+    conexao = sqlite3.connect(
+        alvo, uri=uri, timeout=10,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,  # as conexões do pool circulam entre threads
+    )
+    conexao.execute("PRAGMA foreign_keys = ON")
+    if caminho != ":memory:":
+        conexao.execute("PRAGMA journal_mode = WAL")
+
+    existe = conexao.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cargo'"
+    ).fetchone()
+    if not existe:
+        with open(caminho_schema, encoding="utf-8") as arquivo:
+            comandos = traduzir_schema(arquivo.read())
+        for comando in comandos:
+            conexao.execute(comando)
+        conexao.commit()
+
+    return ConexaoSQLite(conexao)
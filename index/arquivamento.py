@@ -0,0 +1,303 @@
+"""
+Arquivamento das vendas encerradas em historico_venda / historico_venda_item.
+
+As vendas CONCLUIDA e CANCELADA anteriores à data de corte saem de venda e
+venda_item em lotes pequenos. Cada lote é uma transação curta e baseada em
+conjuntos:
+
+1. escolhe, sem travar nada, as próximas N vendas elegíveis até o maior
+   venda_id lido no início, e trava só essas (SELECT ... FOR UPDATE pela
+   chave primária, conferindo de novo status e data);
+2. copia o cabeçalho com INSERT ... SELECT e os itens com outro INSERT ...
+   SELECT, já calculando o subtotal;
+3. apaga os itens e as vendas copiadas.
+
+Um lote ou vai inteiro ou não vai, e o que já foi movido some de venda,
+então basta rodar de novo para continuar de onde parou (a chave única de
+historico_venda.venda_id impede arquivar a mesma venda duas vezes). Entre os
+lotes há uma pausa e, opcionalmente, um limite de vendas por segundo, para
+não disputar travas e E/S com o caixa.
+
+venda não tem índice por (status, data_venda), e um SELECT ... FOR UPDATE
+que filtrasse por essas colunas travaria no InnoDB cada linha lida pelo
+caminho (inclusive as vendas abertas puladas) e, no último lote, o intervalo
+depois da maior chave, segurando as inserções do caixa. Por isso a escolha é
+uma leitura comum, limitada a venda_id <= o maior venda_id do início, e a
+trava vai só nas chaves escolhidas.
+
+    python -m index.arquivamento --dias 90
+    python -m index.arquivamento --dias 30 --lote 200 --pausa 0.2 --limite 500
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config.config_bd import conectar_bd, Error
+from config.instrumentacao import operacao
+from index.vendas import ERROS_REPETIVEIS
+
+# Vezes seguidas que um mesmo lote é refeito após deadlock/timeout de trava
+# antes de o arquivamento desistir.
+REPETICOES_MAX = 5
+
+QUERY_ULTIMA_VENDA = "SELECT MAX(venda_id) FROM venda"
+
+# Leitura sem trava: só escolhe as vendas do lote.
+QUERY_PROXIMO_LOTE = """
+    SELECT venda_id
+    FROM venda
+    WHERE venda_id > %s AND venda_id <= %s AND status IN ('CONCLUIDA', 'CANCELADA') AND data_venda < %s
+    ORDER BY venda_id
+    LIMIT %s
+"""
+
+# Trava só as escolhidas, pela chave primária; status e data são conferidos
+# de novo porque a venda pode ter mudado entre as duas consultas.
+QUERY_TRAVAR_LOTE = """
+    SELECT venda_id
+    FROM venda
+    WHERE venda_id IN ({}) AND status IN ('CONCLUIDA', 'CANCELADA') AND data_venda < %s
+    ORDER BY venda_id
+    FOR UPDATE
+"""
+
+QUERY_COPIAR_VENDAS = """
+    INSERT INTO historico_venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, status)
+    SELECT venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, status
+    FROM venda
+    WHERE venda_id IN ({})
+"""
+
+QUERY_COPIAR_ITENS = """
+    INSERT INTO historico_venda_item (historico_venda_id, produto_id, quantidade, preco_unitario, subtotal)
+    SELECT h.historico_id, i.produto_id, i.quantidade, i.preco_unitario, ROUND(i.quantidade * i.preco_unitario, 2)
+    FROM venda_item i
+    JOIN historico_venda h ON h.venda_id = i.venda_id
+    WHERE i.venda_id IN ({})
+"""
+
+
+def _marcadores(quantidade):
+    return ", ".join(["%s"] * quantidade)
+
+
+# -----------------------------
+# UM LOTE
+# -----------------------------
+
+def ultima_venda():
+    """Maior venda_id atual (0 se não há vendas), lido sem trava."""
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(QUERY_ULTIMA_VENDA)
+        (ultimo,), = cursor.fetchall()
+        cursor.close()
+        conexao.rollback()
+        return ultimo or 0
+    finally:
+        conexao.close()
+
+
+@operacao
+def arquivar_lote(corte, apos_id=0, tamanho=500, ate_id=None):
+    """
+    Move até 'tamanho' vendas elegíveis com apos_id < venda_id <= ate_id
+    (padrão: a maior venda atual) numa única transação. Devolve {"vendas",
+    "itens", "ultimo_id", "espera_trava"}, com a espera pelas travas em
+    segundos; "ultimo_id" = apos_id quando não há mais nada no intervalo.
+    Levanta Error se o lote falhar (nada é movido).
+    """
+    if ate_id is None:
+        ate_id = ultima_venda()
+
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(QUERY_PROXIMO_LOTE, (apos_id, ate_id, corte, tamanho))
+        escolhidas = [linha[0] for linha in cursor.fetchall()]
+        if not escolhidas:
+            conexao.rollback()
+            return {"vendas": 0, "itens": 0, "ultimo_id": apos_id, "espera_trava": 0.0}
+
+        # O tempo deste SELECT é, quase todo, espera pelas travas do caixa.
+        inicio = time.perf_counter()
+        cursor.execute(QUERY_TRAVAR_LOTE.format(_marcadores(len(escolhidas))), (*escolhidas, corte))
+        ids = [linha[0] for linha in cursor.fetchall()]
+        espera_trava = time.perf_counter() - inicio
+
+        if not ids:
+            # Todas mudaram desde a escolha: segue para depois delas.
+            conexao.rollback()
+            return {"vendas": 0, "itens": 0, "ultimo_id": escolhidas[-1], "espera_trava": espera_trava}
+
+        marcadores = _marcadores(len(ids))
+        cursor.execute(QUERY_COPIAR_VENDAS.format(marcadores), ids)
+        cursor.execute(QUERY_COPIAR_ITENS.format(marcadores), ids)
+        itens = cursor.rowcount
+
+        cursor.execute(f"DELETE FROM venda_item WHERE venda_id IN ({marcadores})", ids)
+        cursor.execute(f"DELETE FROM venda WHERE venda_id IN ({marcadores})", ids)
+        if cursor.rowcount != len(ids):
+            raise Error("Uma venda do lote sumiu durante o arquivamento.")
+
+        conexao.commit()
+        cursor.close()
+        return {"vendas": len(ids), "itens": itens, "ultimo_id": escolhidas[-1], "espera_trava": espera_trava}
+
+    except Error:
+        conexao.rollback()
+        raise
+
+    finally:
+        conexao.close()
+
+
+# -----------------------------
+# TODOS OS LOTES
+# -----------------------------
+
+def arquivar_vendas(corte, tamanho_lote=500, pausa=0.05, limite_por_segundo=None, parar=None,
+                    ao_concluir_lote=None, repeticoes_max=REPETICOES_MAX):
+    """
+    Arquiva, lote a lote, as vendas encerradas antes de 'corte' (datetime)
+    que já existiam no início (venda_id até o maior lido nessa hora).
+
+    pausa:              segundos de folga entre um lote e outro.
+    limite_por_segundo: máximo de vendas movidas por segundo (None: sem limite).
+    parar:              threading.Event que interrompe o trabalho entre dois lotes.
+    ao_concluir_lote:   chamada com o relatório parcial depois de cada lote.
+    repeticoes_max:     vezes seguidas que um lote é refeito após deadlock/timeout
+                        de trava antes de desistir.
+
+    Devolve o relatório: lotes, vendas, itens, segundos, vendas_por_segundo,
+    linhas_por_segundo (vendas + itens), espera_trava_s, espera_trava_max_ms,
+    repeticoes (lotes refeitos após deadlock/timeout de trava), interrompido e
+    desistiu (o mesmo lote falhou mais de repeticoes_max vezes seguidas; o
+    erro vai em "erro" e os lotes anteriores ficam gravados).
+    """
+    relatorio = {
+        "lotes": 0, "vendas": 0, "itens": 0, "segundos": 0.0,
+        "vendas_por_segundo": None, "linhas_por_segundo": None,
+        "espera_trava_s": 0.0, "espera_trava_max_ms": 0.0,
+        "repeticoes": 0, "interrompido": False, "desistiu": False, "erro": None,
+    }
+    inicio = time.perf_counter()
+    ultimo_id = 0
+    ate_id = ultima_venda()
+    seguidas = 0
+
+    while True:
+        if parar is not None and parar.is_set():
+            relatorio["interrompido"] = True
+            break
+
+        try:
+            lote = arquivar_lote(corte, ultimo_id, tamanho_lote, ate_id)
+        except Error as e:
+            if getattr(e, "errno", None) not in ERROS_REPETIVEIS:
+                raise
+            seguidas += 1
+            if seguidas > repeticoes_max:
+                relatorio["desistiu"] = True
+                relatorio["erro"] = str(e)
+                break
+            # O caixa venceu a disputa pelas travas: tenta o mesmo lote depois de
+            # uma pausa que cresce a cada nova falha.
+            relatorio["repeticoes"] += 1
+            time.sleep(max(pausa, 0.1) * seguidas)
+            continue
+        seguidas = 0
+
+        relatorio["espera_trava_s"] += lote["espera_trava"]
+        relatorio["espera_trava_max_ms"] = max(relatorio["espera_trava_max_ms"], lote["espera_trava"] * 1000)
+        if lote["ultimo_id"] == ultimo_id:
+            break
+        ultimo_id = lote["ultimo_id"]
+        if not lote["vendas"]:
+            continue
+
+        relatorio["lotes"] += 1
+        relatorio["vendas"] += lote["vendas"]
+        relatorio["itens"] += lote["itens"]
+
+        decorrido = time.perf_counter() - inicio
+        _atualizar_vazao(relatorio, decorrido)
+        if ao_concluir_lote:
+            ao_concluir_lote(dict(relatorio))
+
+        espera = pausa
+        if limite_por_segundo:
+            # Quanto falta para a média voltar a ficar abaixo do limite.
+            espera = max(espera, relatorio["vendas"] / limite_por_segundo - decorrido)
+        if espera > 0:
+            if parar is not None:
+                parar.wait(espera)
+            else:
+                time.sleep(espera)
+
+    _atualizar_vazao(relatorio, time.perf_counter() - inicio)
+    relatorio["espera_trava_s"] = round(relatorio["espera_trava_s"], 3)
+    relatorio["espera_trava_max_ms"] = round(relatorio["espera_trava_max_ms"], 2)
+    return relatorio
+
+
+def _atualizar_vazao(relatorio, segundos):
+    relatorio["segundos"] = round(segundos, 3)
+    if segundos:
+        relatorio["vendas_por_segundo"] = round(relatorio["vendas"] / segundos, 1)
+        relatorio["linhas_por_segundo"] = round((relatorio["vendas"] + relatorio["itens"]) / segundos, 1)
+
+
+def iniciar_em_segundo_plano(corte, **opcoes):
+    """
+    Roda arquivar_vendas numa thread daemon. Devolve (thread, parar):
+    parar.set() encerra o trabalho depois do lote em andamento.
+    """
+    parar = threading.Event()
+    thread = threading.Thread(target=arquivar_vendas, args=(corte,), kwargs={**opcoes, "parar": parar},
+                              name="arquivamento-vendas", daemon=True)
+    thread.start()
+    return thread, parar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move as vendas encerradas para o histórico.")
+    parser.add_argument("--dias", type=int, default=90, help="arquiva as vendas com mais de N dias")
+    parser.add_argument("--lote", type=int, default=500, help="vendas por transação")
+    parser.add_argument("--pausa", type=float, default=0.05, help="segundos entre os lotes")
+    parser.add_argument("--limite", type=float, help="máximo de vendas movidas por segundo")
+    args = parser.parse_args()
+
+    corte = datetime.now() - timedelta(days=args.dias)
+
+    def progresso(parcial):
+        print(f"{parcial['vendas']} vendas, {parcial['itens']} itens, "
+              f"{parcial['linhas_por_segundo']} linhas/s", flush=True)
+
+    try:
+        relatorio = arquivar_vendas(corte, args.lote, args.pausa, args.limite, ao_concluir_lote=progresso)
+    except Error as e:
+        print(f"Erro no arquivamento (os lotes já concluídos estão gravados): {e}")
+        return 1
+
+    print(f"Arquivadas {relatorio['vendas']} vendas e {relatorio['itens']} itens em {relatorio['lotes']} lotes "
+          f"({relatorio['segundos']} s, {relatorio['vendas_por_segundo']} vendas/s, "
+          f"{relatorio['linhas_por_segundo']} linhas/s).")
+    print(f"Espera por travas: {relatorio['espera_trava_s']} s no total, "
+          f"{relatorio['espera_trava_max_ms']} ms no pior lote; {relatorio['repeticoes']} lote(s) repetido(s).")
+    if relatorio["desistiu"]:
+        print(f"Arquivamento interrompido: um lote falhou mais de {REPETICOES_MAX} vezes seguidas "
+              f"({relatorio['erro']}). Rode de novo para continuar.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
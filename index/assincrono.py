@@ -0,0 +1,214 @@
+"""
+Fachada asyncio sobre o CRUD de cargos e funcionários, para serviços de
+integração que disparam muitas consultas ao mesmo tempo.
+
+As funções de CRUD são bloqueantes (driver síncrono + pool de conexões):
+aqui elas rodam num ThreadPoolExecutor com tantas threads quantas conexões
+há no pool, então nenhuma thread fica parada esperando conexão. Um semáforo
+limita as chamadas em andamento (rodando ou na fila do executor); acima do
+limite o chamador espera, e se esperar mais que 'espera_max' recebe um
+Resultado com codigo SOBRECARGA em vez de aumentar a fila sem fim.
+
+Em vez da Resposta do CRUD, cada chamada devolve um Resultado, com os
+registros de index.registros (Cargo, Funcionario) nas consultas:
+
+    async with CrudAssincrono() as crud:
+        r = await crud.buscar_funcionario(42)
+        if r.ok:
+            print(r.dados.nome)
+        lote = await crud.em_lote(crud.buscar_funcionario(i) for i in ids)
+"""
+import asyncio
+import functools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config_bd import Error, CONFIG
+from index.paginacao import paginar, buscar_por_chave, TAMANHO_PAGINA_PADRAO
+from index.crud_cargos import (
+    inserir_cargo, atualizar_cargo, deletar_cargo, SELECT_CARGOS,
+)
+from index.crud_funcionarios import (
+    inserir_funcionario, atualizar_funcionario, deletar_funcionario, condicoes_busca, SELECT_FUNCIONARIOS,
+)
+from index.registros import Cargo, Funcionario
+from index.resposta import CRIADO, ATUALIZADO, DELETADO, INEXISTENTE, ERRO_BD
+
+OK = "ok"
+NAO_ENCONTRADO = "nao_encontrado"
+SOBRECARGA = "sobrecarga"
+
+Resultado = namedtuple("Resultado", "ok codigo dados mensagem", defaults=(None, None))
+
+# Código da Resposta do CRUD (index.resposta) -> código do Resultado; os
+# demais (INVALIDO, CONFLITO, ERRO_BD) passam como estão.
+_CODIGOS_DA_RESPOSTA = {
+    CRIADO: OK,
+    ATUALIZADO: OK,
+    DELETADO: OK,
+    INEXISTENTE: NAO_ENCONTRADO,
+}
+
+
+class Sobrecarga(Error):
+    """Nenhuma vaga para a chamada em 'espera_max' segundos."""
+
+
+def converter_resposta(resposta):
+    """Resposta das funções de CRUD -> Resultado, com o ID criado em dados."""
+    codigo = _CODIGOS_DA_RESPOSTA.get(resposta.codigo, resposta.codigo)
+    dados = {"id": resposta.id} if resposta.id is not None else None
+    return Resultado(resposta.ok, codigo, dados, resposta.mensagem.replace("\n-> ", "").strip())
+
+
+class CrudAssincrono:
+    """
+    trabalhadores: threads do executor (padrão: o tamanho do pool de conexões).
+    pendentes_max: chamadas em andamento ao mesmo tempo (padrão: 4 por thread).
+    espera_max:    segundos esperando vaga antes de devolver SOBRECARGA
+                   (None: espera o quanto for preciso).
+    """
+
+    def __init__(self, trabalhadores=None, pendentes_max=None, espera_max=None):
+        trabalhadores = trabalhadores or CONFIG['pool'].getint('tamanho')
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="crud-async")
+        self._vagas = asyncio.Semaphore(pendentes_max or trabalhadores * 4)
+        self.espera_max = espera_max
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        # shutdown(wait=True) espera as threads: fora do loop, para não travá-lo.
+        await asyncio.to_thread(self.fechar)
+
+    def fechar(self):
+        """
+        Espera as chamadas em andamento e encerra as threads. Bloqueia: dentro
+        do loop, use 'async with' (ou await asyncio.to_thread(crud.fechar)).
+        """
+        self._executor.shutdown(wait=True)
+
+    async def _rodar(self, funcao, *args, **kwargs):
+        """
+        funcao(*args, **kwargs) numa thread do executor. Devolve o retorno ou
+        levanta Sobrecarga se não houver vaga em 'espera_max' segundos.
+        """
+        if self.espera_max is None:
+            await self._vagas.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._vagas.acquire(), self.espera_max)
+            except asyncio.TimeoutError:
+                raise Sobrecarga("Muitas chamadas em andamento.") from None
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(funcao, *args, **kwargs))
+        finally:
+            self._vagas.release()
+
+    async def _resposta(self, funcao, *args):
+        """Para as funções que devolvem uma Resposta (index.resposta)."""
+        try:
+            return converter_resposta(await self._rodar(funcao, *args))
+        except Sobrecarga as e:
+            return Resultado(False, SOBRECARGA, None, str(e))
+        except Error as e:
+            return Resultado(False, ERRO_BD, None, str(e))
+
+    async def _consulta(self, funcao, *args, **kwargs):
+        """Para as leituras, que levantam Error em falhas."""
+        try:
+            return Resultado(True, OK, await self._rodar(funcao, *args, **kwargs))
+        except Sobrecarga as e:
+            return Resultado(False, SOBRECARGA, None, str(e))
+        except Error as e:
+            return Resultado(False, ERRO_BD, None, str(e))
+
+    async def em_lote(self, chamadas):
+        """
+        Roda as corrotinas (ex.: crud.buscar_cargo(i) for i in ids) ao mesmo
+        tempo e devolve os Resultados na mesma ordem. O semáforo segura o
+        excesso, então o lote pode ser bem maior que o pool.
+        """
+        return list(await asyncio.gather(*chamadas))
+
+    # --- Cargos ---
+
+    async def inserir_cargo(self, nome, gerenciar_estoque, fazer_vendas):
+        return await self._resposta(inserir_cargo, nome, int(gerenciar_estoque), int(fazer_vendas))
+
+    async def atualizar_cargo(self, cargo_id, nome=None, gerenciar_estoque=None, fazer_vendas=None, versao=None):
+        return await self._resposta(
+            atualizar_cargo, cargo_id, nome,
+            None if gerenciar_estoque is None else int(gerenciar_estoque),
+            None if fazer_vendas is None else int(fazer_vendas),
+            versao,
+        )
+
+    async def deletar_cargo(self, cargo_id):
+        return await self._resposta(deletar_cargo, cargo_id)
+
+    async def buscar_cargo(self, cargo_id):
+        resultado = await self._consulta(buscar_por_chave, "cargo.buscar", SELECT_CARGOS, "cargo_id", cargo_id,
+                                         Cargo.da_linha)
+        if resultado.ok and resultado.dados is None:
+            return Resultado(False, NAO_ENCONTRADO, None, f"Nenhum cargo encontrado com ID {cargo_id}.")
+        return resultado
+
+    async def listar_cargos(self, tamanho=TAMANHO_PAGINA_PADRAO, apos_id=None):
+        """Uma página (paginação por chave), como em listar_cargos_pagina."""
+        return await self._consulta(paginar, SELECT_CARGOS, "cargo_id", tamanho=tamanho, apos=apos_id,
+                                    registro=Cargo.da_linha)
+
+    # --- Funcionários ---
+
+    async def inserir_funcionario(self, cargo_id, nome, email, cpf, telefone, data_admissao, salario,
+                                  data_termino="", ativo=True):
+        """Datas no formato do cadastro (dd/mm/aaaa), como em inserir_funcionario."""
+        return await self._resposta(inserir_funcionario, cargo_id, nome, email, cpf, telefone,
+                                    data_admissao, data_termino, salario, int(ativo))
+
+    async def atualizar_funcionario(self, funcionario_id, cargo_id=None, nome=None, email=None, cpf=None,
+                                    telefone=None, data_admissao=None, data_termino=None, salario=None,
+                                    ativo=None, versao=None):
+        return await self._resposta(
+            atualizar_funcionario, funcionario_id, cargo_id, nome, email, cpf, telefone,
+            data_admissao, data_termino, salario, None if ativo is None else int(ativo), versao,
+        )
+
+    async def deletar_funcionario(self, funcionario_id):
+        return await self._resposta(deletar_funcionario, funcionario_id)
+
+    async def buscar_funcionario(self, funcionario_id):
+        resultado = await self._consulta(buscar_por_chave, "funcionario.buscar", SELECT_FUNCIONARIOS,
+                                         "funcionario_id", funcionario_id, Funcionario.da_linha)
+        if resultado.ok and resultado.dados is None:
+            return Resultado(False, NAO_ENCONTRADO, None, f"Nenhum funcionário encontrado com ID {funcionario_id}.")
+        return resultado
+
+    async def listar_funcionarios(self, termo="", cargo_id=None, ativo=None, tamanho=TAMANHO_PAGINA_PADRAO,
+                                  apos_id=None):
+        """
+        Uma página de funcionários, opcionalmente só os cujo nome, CPF ou
+        e-mail começa com 'termo' (como em buscar_funcionarios).
+        """
+        filtros = {"cargo_id": cargo_id, "ativo": None if ativo is None else int(ativo)}
+        return await self._consulta(paginar, SELECT_FUNCIONARIOS, "funcionario_id", filtros, tamanho,
+                                    apos_id, condicoes=condicoes_busca(termo), registro=Funcionario.da_linha)
+
+    async def percorrer_funcionarios(self, termo="", cargo_id=None, ativo=None, tamanho=500):
+        """
+        Gerador assíncrono de todos os funcionários do filtro, página a página.
+        Levanta Error se alguma página falhar.
+        """
+        apos_id = None
+        while True:
+            resultado = await self.listar_funcionarios(termo, cargo_id, ativo, tamanho, apos_id)
+            if not resultado.ok:
+                raise Error(resultado.mensagem)
+            for linha in resultado.dados["linhas"]:
+                yield linha
+            if not resultado.dados["tem_proxima"]:
+                return
+            apos_id = resultado.dados["ultimo"]
@@ -0,0 +1,61 @@
+"""
+UPDATE parcial em um único comando.
+
+Só as colunas informadas entram no SET, então o banco não reescreve (nem
+reindexa) os campos que não mudaram, e não é preciso ler a linha antes.
+Cada atualização também incrementa a coluna 'versao' da linha; quem passar
+a versão que leu recebe um aviso de conflito em vez de sobrescrever a
+alteração de outro usuário (controle de concorrência otimista).
+"""
+
+ATUALIZADO = "atualizado"
+INEXISTENTE = "inexistente"
+CONFLITO = "conflito"
+
+
+def montar_update(tabela, chave, valor_chave, campos, versao_esperada=None):
+    """Monta (query, params) do UPDATE com as colunas de 'campos' que não são None."""
+    campos = {coluna: valor for coluna, valor in campos.items() if valor is not None}
+    if not campos:
+        return None, None
+
+    atribuicoes = [f"{coluna} = %s" for coluna in campos] + ["versao = versao + 1"]
+    query = f"UPDATE {tabela} SET {', '.join(atribuicoes)} WHERE {chave} = %s"
+    params = list(campos.values()) + [valor_chave]
+
+    if versao_esperada is not None:
+        query += " AND versao = %s"
+        params.append(versao_esperada)
+
+    return query, tuple(params)
+
+
+def atualizar_parcial(conexao, tabela, chave, valor_chave, campos, versao_esperada=None):
+    """
+    Executa o UPDATE parcial e devolve ATUALIZADO, INEXISTENTE ou CONFLITO
+    (None se nenhum campo foi informado). Não faz commit.
+
+    Cada combinação de colunas é um statement preparado próprio, ex.:
+    "funcionario.atualizar(salario,ativo)+versao".
+    """
+    query, params = montar_update(tabela, chave, valor_chave, campos, versao_esperada)
+    if query is None:
+        return None
+
+    colunas = ",".join(coluna for coluna, valor in campos.items() if valor is not None)
+    nome = f"{tabela}.atualizar({colunas})" + ("+versao" if versao_esperada is not None else "")
+    cursor = conexao.preparada(nome, query).executar(params)
+    # O MySQL é conectado com FOUND_ROWS, então rowcount conta as linhas
+    # encontradas, mesmo que os valores novos sejam iguais aos antigos.
+    if cursor.rowcount:
+        return ATUALIZADO
+
+    if versao_esperada is None:
+        return INEXISTENTE
+
+    # Só no caminho de falha: descobre se a linha sumiu ou mudou de versão.
+    cursor = conexao.cursor()
+    cursor.execute(f"SELECT 1 FROM {tabela} WHERE {chave} = %s", (valor_chave,))
+    existe = cursor.fetchone() is not None
+    cursor.close()
+    return CONFLITO if existe else INEXISTENTE
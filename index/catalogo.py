@@ -0,0 +1,387 @@
+"""
+Catálogo de produtos em memória, para a leitura de código no caixa e a busca
+por nome enquanto se digita, sem ir ao banco a cada tecla.
+
+Três índices sobre os produtos ativos:
+
+- SKU -> produto (dicionário), para o leitor de código de barras;
+- nome normalizado (minúsculas, sem acentos): trigramas de cada palavra e os
+  prefixos de 1 e 2 letras de cada palavra, para buscar por pedaços do nome
+  ("parafu 6m" acha "Parafuso Sextavado 6mm");
+- especificação "Atributo=Valor" -> produtos ("Cor=Branco", "Volume=18").
+
+carregar() lê as duas tabelas de uma vez; atualizar() relê só os produtos e
+especificações com atualizado_em recente. Um produto desativado (ativo = 0)
+sai do catálogo na atualização seguinte. Um produto apagado não deixa linha
+com atualizado_em: a cada CONFERIR_EXCLUSOES_A_CADA atualizações, atualizar()
+compara os ids em memória com os da tabela (SELECT produto_id, só o índice
+primário) e remove os que sumiram.
+
+A exclusão de uma especificação também não muda atualizado_em de nada: quem
+apaga especificações deve tocar o produto (UPDATE produto SET atualizado_em =
+CURRENT_TIMESTAMP) ou esperar a próxima carga completa de acompanhar().
+"""
+import functools
+import heapq
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from config.config_bd import conectar_bd, Error
+from config.instrumentacao import operacao
+from index.texto import normalizar_busca
+
+ProdutoCatalogo = namedtuple("ProdutoCatalogo", "produto_id sku nome preco_venda especificacoes")
+
+# atualizado_em é gravado no UPDATE, mas a linha só fica visível no commit:
+# cada consulta de alterações relê também este intervalo antes da última vista.
+SOBREPOSICAO_SEGUNDOS = 60
+
+# Até este número de candidatos a busca confere todos e devolve os primeiros
+# em ordem alfabética; acima dele, para nos primeiros 'limite' que conferem.
+LIMITE_CONFERENCIA = 1000
+
+TAMANHO_IN = 1000
+
+# De quantas em quantas chamadas de atualizar() procurar produtos apagados.
+CONFERIR_EXCLUSOES_A_CADA = 12
+
+QUERY_PRODUTOS = "SELECT produto_id, sku, nome, preco_venda, ativo, atualizado_em FROM produto"
+
+QUERY_ESPECIFICACOES = """
+    SELECT produto_id, nome_atributo, valor_atributo, unidade_medida
+    FROM especificacao
+"""
+
+VAZIO = frozenset()
+
+
+def _blocos(ids):
+    for inicio in range(0, len(ids), TAMANHO_IN):
+        bloco = ids[inicio:inicio + TAMANHO_IN]
+        yield bloco, ", ".join(["%s"] * len(bloco))
+
+
+def normalizar_sku(sku):
+    return sku.strip().upper() if sku else None
+
+
+@functools.lru_cache(maxsize=4096)
+def chave_atributo(atributo, valor=None):
+    """'Cor=Branco' ou ('Cor', 'Branco') -> 'cor=branco'."""
+    if valor is None:
+        atributo, _, valor = atributo.partition("=")
+    return f"{normalizar_busca(atributo or '')}={normalizar_busca(valor or '')}"
+
+
+# As palavras se repetem muito entre os produtos ("parafuso", "branco", "mm"):
+# normalização e gramas de cada palavra são calculados uma vez só.
+@functools.lru_cache(maxsize=65536)
+def _normalizar_palavra(palavra):
+    return normalizar_busca(palavra)
+
+
+def normalizar_nome(nome):
+    return " ".join(_normalizar_palavra(palavra) for palavra in nome.split())
+
+
+@functools.lru_cache(maxsize=65536)
+def _gramas_da_palavra(palavra):
+    gramas = {"^" + palavra[:1], "^" + palavra[:2]}
+    gramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return frozenset(gramas)
+
+
+def _gramas_do_nome(nome):
+    palavras = nome.split()
+    if len(palavras) == 1:
+        return _gramas_da_palavra(palavras[0])
+    return frozenset().union(*map(_gramas_da_palavra, palavras))
+
+
+def _gramas_do_termo(termo):
+    """Gramas que todo nome com o termo tem (prefixo de palavra, se curto)."""
+    if len(termo) < 3:
+        return ["^" + termo]
+    return [termo[i:i + 3] for i in range(len(termo) - 2)]
+
+
+def _tem_termo(nome, termo):
+    # Termos curtos valem só como início de palavra ('pa' acha 'parafuso', não 'chapa').
+    if len(termo) < 3:
+        return nome.startswith(termo) or f" {termo}" in nome
+    return termo in nome
+
+
+# -----------------------------
+# ÍNDICES
+# -----------------------------
+
+class _Indices:
+    """Os índices de um catálogo. Quem altera ou consulta segura o lock do catálogo."""
+
+    def __init__(self):
+        self.produtos = {}      # produto_id -> ProdutoCatalogo
+        self.por_sku = {}       # SKU normalizado -> produto_id
+        self.nomes = {}         # produto_id -> nome normalizado
+        self.gramas = {}        # grama -> {produto_id}
+        self.atributos = {}     # 'atributo=valor' -> {produto_id}
+
+    def indexar(self, produto):
+        produto_id = produto.produto_id
+        nome = normalizar_nome(produto.nome)
+        self.produtos[produto_id] = produto
+        self.nomes[produto_id] = nome
+        sku = normalizar_sku(produto.sku)
+        if sku:
+            self.por_sku[sku] = produto_id
+
+        gramas = self.gramas
+        for grama in _gramas_do_nome(nome):
+            conjunto = gramas.get(grama)
+            if conjunto is None:
+                gramas[grama] = conjunto = set()
+            conjunto.add(produto_id)
+        for atributo, valor, _ in produto.especificacoes:
+            self.atributos.setdefault(chave_atributo(atributo, valor), set()).add(produto_id)
+
+    def remover(self, produto_id):
+        produto = self.produtos.pop(produto_id, None)
+        if produto is None:
+            return
+        nome = self.nomes.pop(produto_id)
+        sku = normalizar_sku(produto.sku)
+        if sku and self.por_sku.get(sku) == produto_id:
+            del self.por_sku[sku]
+
+        for grama in _gramas_do_nome(nome):
+            self._descartar(self.gramas, grama, produto_id)
+        for atributo, valor, _ in produto.especificacoes:
+            self._descartar(self.atributos, chave_atributo(atributo, valor), produto_id)
+
+    @staticmethod
+    def _descartar(indice, chave, produto_id):
+        conjunto = indice.get(chave)
+        if conjunto is not None:
+            conjunto.discard(produto_id)
+            if not conjunto:
+                del indice[chave]
+
+    def buscar(self, texto, atributos, limite):
+        termos = normalizar_nome(texto or "").split()
+        conjuntos = [self.gramas.get(grama, VAZIO) for termo in termos for grama in _gramas_do_termo(termo)]
+        filtros = [self.atributos.get(chave_atributo(a), VAZIO) for a in atributos]
+        conjuntos += filtros
+        if not conjuntos:
+            return []
+
+        conjuntos.sort(key=len)
+        menor = conjuntos[0]
+        if not menor:
+            return []
+
+        # Os gramas só pré-selecionam: o nome precisa conter cada termo inteiro.
+        def confere(produto_id):
+            nome = self.nomes[produto_id]
+            return (all(_tem_termo(nome, termo) for termo in termos)
+                    and all(produto_id in filtro for filtro in filtros))
+
+        if len(menor) <= LIMITE_CONFERENCIA:
+            # Poucos candidatos: a interseção (em C) já aplica gramas e filtros.
+            candidatos = menor.intersection(*conjuntos[1:])
+            achados = heapq.nsmallest(limite, (
+                (nome, p) for p, nome in ((p, self.nomes[p]) for p in candidatos)
+                if all(_tem_termo(nome, termo) for termo in termos)
+            ))
+        else:
+            achados = []
+            for produto_id in menor:
+                if confere(produto_id):
+                    achados.append((self.nomes[produto_id], produto_id))
+                    if len(achados) == limite:
+                        break
+            achados.sort()
+        return [self.produtos[produto_id] for _, produto_id in achados]
+
+
+# -----------------------------
+# CATÁLOGO
+# -----------------------------
+
+class CatalogoProdutos:
+    """
+    Produtos ativos em memória. por_sku() é uma consulta a dicionário;
+    buscar() combina termos do nome e especificações. A carga completa monta
+    índices novos e troca de uma vez; atualizar() reindexa só os produtos
+    alterados.
+    """
+
+    def __init__(self):
+        self._indices = _Indices()
+        self._lock = threading.Lock()
+        self._ultima_alteracao = None     # maior atualizado_em visto (relógio do banco)
+        self._atualizacoes = 0            # desde a última carga, para conferir as exclusões
+        self.carregado_em = None
+
+    def __len__(self):
+        return len(self._indices.produtos)
+
+    # --- Leitura do banco ---
+
+    @staticmethod
+    def _montar(linhas_produtos, linhas_especificacoes):
+        """(produtos ativos, ids inativos, maior atualizado_em) a partir das linhas lidas."""
+        especificacoes = {}
+        for produto_id, atributo, valor, unidade in linhas_especificacoes:
+            especificacoes.setdefault(produto_id, []).append((atributo, valor, unidade))
+
+        produtos, inativos, maior = [], [], None
+        for produto_id, sku, nome, preco, ativo, atualizado_em in linhas_produtos:
+            if maior is None or (atualizado_em is not None and atualizado_em > maior):
+                maior = atualizado_em
+            if not ativo:
+                inativos.append(produto_id)
+                continue
+            produtos.append(ProdutoCatalogo(produto_id, sku, nome, preco,
+                                            tuple(especificacoes.get(produto_id, ()))))
+        return produtos, inativos, maior
+
+    @operacao(nome="carregar_catalogo")
+    def carregar(self):
+        """Lê todos os produtos e especificações e troca os índices."""
+        conexao = conectar_bd()
+        if not conexao:
+            raise Error("Falha ao conectar no banco de dados.")
+        try:
+            cursor = conexao.cursor()
+            cursor.execute(QUERY_PRODUTOS)
+            linhas_produtos = cursor.fetchall()
+            cursor.execute(f"{QUERY_ESPECIFICACOES} ORDER BY especificacao_id")
+            linhas_especificacoes = cursor.fetchall()
+            cursor.close()
+        finally:
+            conexao.close()
+
+        produtos, _, maior = self._montar(linhas_produtos, linhas_especificacoes)
+        indices = _Indices()
+        for produto in produtos:
+            indices.indexar(produto)
+
+        with self._lock:
+            self._indices = indices
+            self._ultima_alteracao = maior
+            self._atualizacoes = 0
+            self.carregado_em = time.monotonic()
+        return len(produtos)
+
+    @operacao(nome="atualizar_catalogo")
+    def atualizar(self):
+        """
+        Reindexa os produtos alterados desde a última leitura e, de tempos em
+        tempos, remove os apagados do banco. Devolve quantos.
+        """
+        if self._ultima_alteracao is None:
+            return self.carregar()
+        self._atualizacoes += 1
+        conferir_exclusoes = self._atualizacoes % CONFERIR_EXCLUSOES_A_CADA == 0
+
+        desde = self._ultima_alteracao - timedelta(seconds=SOBREPOSICAO_SEGUNDOS)
+        conexao = conectar_bd()
+        if not conexao:
+            raise Error("Falha ao conectar no banco de dados.")
+        try:
+            cursor = conexao.cursor()
+            cursor.execute(f"{QUERY_PRODUTOS} WHERE atualizado_em >= %s", (desde,))
+            linhas_produtos = cursor.fetchall()
+            lidos = {linha[0] for linha in linhas_produtos}
+            cursor.execute("SELECT DISTINCT produto_id FROM especificacao WHERE atualizado_em >= %s", (desde,))
+            alterados = lidos | {linha[0] for linha in cursor.fetchall()}
+
+            # Produto com especificação alterada é relido inteiro, com todas elas.
+            for bloco, marcadores in _blocos(sorted(alterados - lidos)):
+                cursor.execute(f"{QUERY_PRODUTOS} WHERE produto_id IN ({marcadores})", bloco)
+                linhas_produtos += cursor.fetchall()
+            linhas_especificacoes = []
+            for bloco, marcadores in _blocos(sorted(alterados)):
+                cursor.execute(f"{QUERY_ESPECIFICACOES} WHERE produto_id IN ({marcadores}) ORDER BY especificacao_id",
+                               bloco)
+                linhas_especificacoes += cursor.fetchall()
+            existentes = None
+            if conferir_exclusoes:
+                # Depois das consultas acima: o que elas trouxeram ainda existia.
+                cursor.execute("SELECT produto_id FROM produto")
+                existentes = {linha[0] for linha in cursor.fetchall()}
+            cursor.close()
+        finally:
+            conexao.close()
+
+        produtos, inativos, maior = self._montar(linhas_produtos, linhas_especificacoes)
+        # Produto com especificação alterada mas que não existe mais.
+        sumidos = alterados - {linha[0] for linha in linhas_produtos}
+
+        reindexados = 0
+        with self._lock:
+            indices = self._indices
+            if existentes is not None:
+                sumidos |= indices.produtos.keys() - existentes
+            for produto_id in list(inativos) + list(sumidos):
+                if produto_id in indices.produtos:
+                    indices.remover(produto_id)
+                    reindexados += 1
+            for produto in produtos:
+                if indices.produtos.get(produto.produto_id) == produto:
+                    continue
+                indices.remover(produto.produto_id)
+                indices.indexar(produto)
+                reindexados += 1
+            if maior is not None and maior > self._ultima_alteracao:
+                self._ultima_alteracao = maior
+        return reindexados
+
+    def acompanhar(self, intervalo=5.0, recarga_completa=3600.0, parar=None):
+        """
+        Numa thread daemon: atualizar() a cada 'intervalo' segundos e carregar()
+        a cada 'recarga_completa' segundos, até parar.set(). Devolve (thread, parar).
+        """
+        parar = parar or threading.Event()
+
+        def laco():
+            while not parar.wait(intervalo):
+                try:
+                    if self.carregado_em is None or time.monotonic() - self.carregado_em >= recarga_completa:
+                        self.carregar()
+                    else:
+                        self.atualizar()
+                except Error as e:
+                    print("Erro ao atualizar o catálogo de produtos:", e)
+
+        thread = threading.Thread(target=laco, name="catalogo-produtos", daemon=True)
+        thread.start()
+        return thread, parar
+
+    # --- Consultas ---
+
+    def por_sku(self, sku):
+        """Produto ativo com o SKU (sem diferenciar maiúsculas), ou None."""
+        indices = self._indices
+        produto_id = indices.por_sku.get(normalizar_sku(sku))
+        return indices.produtos.get(produto_id) if produto_id is not None else None
+
+    def por_id(self, produto_id):
+        return self._indices.produtos.get(produto_id)
+
+    def buscar(self, texto="", atributos=(), limite=20):
+        """
+        Até 'limite' produtos cujo nome contém todos os termos de 'texto' e
+        que têm todas as especificações de 'atributos' ('Cor=Branco' ou
+        ('Cor', 'Branco')), em ordem alfabética. Termos com menos de 3 letras
+        valem como início de palavra. Com muitos candidatos, devolve os
+        primeiros que conferem, não os primeiros do alfabeto.
+        """
+        atributos = [a if isinstance(a, str) else "=".join(map(str, a)) for a in atributos]
+        with self._lock:
+            return self._indices.buscar(texto, atributos, limite)
+
+
+catalogo = CatalogoProdutos()
@@ -0,0 +1,366 @@
+"""
+Linha de comando do GestorPro, sem a interface gráfica.
+
+Listagem, inclusão, alteração e exclusão de cargos e funcionários, além de
+importação e exportação. A saída é sempre JSON: as listagens escrevem uma
+linha JSON por registro; as demais operações, um único objeto com o resultado.
+
+Os registros a incluir ou alterar vêm de um arquivo .jsonl/.csv (os mesmos
+campos da importação e da exportação) ou da entrada padrão ('-', em JSONL).
+Todos os registros de uma chamada vão numa única transação: se algum for
+recusado, nada é gravado.
+
+    python -m index.cli cargos listar
+    python -m index.cli funcionarios listar --busca "maria" --cargo 3
+    python -m index.cli funcionarios inserir novos.csv
+    python -m index.cli funcionarios atualizar - < reajustes.jsonl
+    python -m index.cli funcionarios deletar 10 11 12
+    python -m index.cli funcionarios importar carga.csv --lote 1000
+    python -m index.cli cargos exportar cargos.jsonl --formato jsonl
+
+Códigos de saída: 0 sucesso, 1 operação recusada ou erro, 2 argumentos inválidos.
+"""
+import argparse
+import json
+import sys
+
+from config.config_bd import transacao, Error
+from index.paginacao import TAMANHO_PAGINA_PADRAO
+from index.crud_cargos import (
+    inserir_cargo, listar_cargos_pagina, atualizar_cargo, deletar_cargo,
+)
+from index.crud_funcionarios import (
+    inserir_funcionario, buscar_funcionarios, atualizar_funcionario, deletar_funcionario,
+    importar_funcionarios, ler_arquivo_funcionarios, converter_para_br, ler_sim_nao,
+    CAMPOS_IMPORTACAO,
+)
+from index.exportacao import exportar_cargos, exportar_funcionarios
+from index.registros import sim_nao
+from index.migracao import migrar
+from index.resposta import Resposta, INVALIDO
+
+
+class RegistroInvalido(ValueError):
+    """Registro que não pôde ser convertido nos argumentos da função de CRUD."""
+
+
+class OperacaoRecusada(Exception):
+    """Desfaz a transação quando uma função de CRUD devolve (False, mensagem)."""
+
+
+# -----------------------------
+# SAÍDA
+# -----------------------------
+
+def escrever(objeto):
+    sys.stdout.write(json.dumps(objeto, ensure_ascii=False, default=str))
+    sys.stdout.write("\n")
+
+
+def _mensagem(texto):
+    # As mensagens das funções de CRUD trazem "\n-> " para as caixas de diálogo.
+    return texto.replace("\n-> ", "").strip()
+
+
+# -----------------------------
+# LEITURA DOS REGISTROS
+# -----------------------------
+
+def ler_registros(caminho):
+    """Gera (linha, registro) de um arquivo .jsonl/.csv ou da entrada padrão ('-')."""
+    if caminho != "-":
+        yield from ler_arquivo_funcionarios(caminho)
+        return
+
+    for numero, linha in enumerate(sys.stdin, start=1):
+        if not linha.strip():
+            continue
+        try:
+            yield numero, json.loads(linha)
+        except ValueError as e:
+            yield numero, e
+
+
+def _texto(registro, campo):
+    """Valor do campo como texto, ou None se ausente/vazio (campo não informado)."""
+    valor = registro.get(campo)
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _inteiro(registro, campo, obrigatorio=False):
+    valor = _texto(registro, campo)
+    if valor is None:
+        if obrigatorio:
+            raise RegistroInvalido(f"O campo '{campo}' é obrigatório.")
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise RegistroInvalido(f"O campo '{campo}' deve ser numérico.") from None
+
+
+def _sim_nao(registro, campo, obrigatorio=False):
+    valor = registro.get(campo)
+    if isinstance(valor, bool):
+        return int(valor)
+    texto = _texto(registro, campo)
+    if texto is None:
+        if obrigatorio:
+            raise RegistroInvalido(f"O campo '{campo}' é obrigatório.")
+        return None
+    convertido = ler_sim_nao(texto)
+    if convertido is None:
+        raise RegistroInvalido(f"'{campo}' só aceita os valores S/N ou Sim/Não.")
+    return convertido
+
+
+# -----------------------------
+# REGISTRO -> CHAMADA DO CRUD
+# -----------------------------
+
+def _inserir_cargo(registro):
+    nome = _texto(registro, "cargo_nome")
+    if nome is None:
+        raise RegistroInvalido("O campo 'cargo_nome' é obrigatório.")
+    return inserir_cargo(nome, _sim_nao(registro, "pode_gerenciar_estoque", True),
+                         _sim_nao(registro, "pode_fazer_vendas", True))
+
+
+def _atualizar_cargo(registro):
+    return atualizar_cargo(
+        _inteiro(registro, "cargo_id", True),
+        _texto(registro, "cargo_nome"),
+        _sim_nao(registro, "pode_gerenciar_estoque"),
+        _sim_nao(registro, "pode_fazer_vendas"),
+        _inteiro(registro, "versao"),
+    )
+
+
+def _inserir_funcionario(registro):
+    campos = {c: _texto(registro, c) or "" for c in CAMPOS_IMPORTACAO}
+    ativo = _sim_nao(registro, "ativo")
+    return inserir_funcionario(
+        _inteiro(registro, "cargo_id", True),
+        campos["nome"], campos["email"], campos["cpf"], campos["telefone"],
+        campos["data_admissao"], campos["data_termino"], campos["salario"],
+        1 if ativo is None else ativo,
+    )
+
+
+def _atualizar_funcionario(registro):
+    return atualizar_funcionario(
+        _inteiro(registro, "funcionario_id", True),
+        _inteiro(registro, "cargo_id"),
+        _texto(registro, "nome"),
+        _texto(registro, "email"),
+        _texto(registro, "cpf"),
+        _texto(registro, "telefone"),
+        _texto(registro, "data_admissao"),
+        _texto(registro, "data_termino"),
+        _texto(registro, "salario"),
+        _sim_nao(registro, "ativo"),
+        _inteiro(registro, "versao"),
+    )
+
+
+# -----------------------------
+# APLICAÇÃO EM UMA TRANSAÇÃO
+# -----------------------------
+
+def aplicar(registros, funcao, simular=False):
+    """
+    Chama 'funcao' para cada (linha, registro) dentro de uma única transação.
+    No primeiro registro recusado a transação é desfeita e o resto não é
+    processado. Com simular=True, tudo é executado e desfeito no fim.
+    Cada item do resultado traz o código da Resposta (index.resposta) e,
+    nas inclusões, o ID criado.
+    """
+    resultados = []
+    resultado = {"ok": False, "confirmado": False, "processados": 0, "resultados": resultados}
+
+    try:
+        with transacao():
+            for numero, registro in registros:
+                item = {"linha": numero}
+                resultados.append(item)
+                if isinstance(registro, Exception):
+                    item.update(ok=False, mensagem=f"Linha ilegível: {registro}")
+                    raise OperacaoRecusada
+                if not isinstance(registro, dict):
+                    item.update(ok=False, mensagem="Cada registro deve ser um objeto JSON.")
+                    raise OperacaoRecusada
+
+                try:
+                    resposta = funcao(registro)
+                except RegistroInvalido as e:
+                    resposta = Resposta(False, str(e), INVALIDO)
+
+                item.update(ok=resposta.ok, codigo=resposta.codigo, mensagem=_mensagem(resposta.mensagem))
+                if resposta.id is not None:
+                    item["id"] = resposta.id
+                if not resposta.ok:
+                    raise OperacaoRecusada
+                resultado["processados"] += 1
+
+            if simular:
+                raise OperacaoRecusada
+    except OperacaoRecusada:
+        pass
+    except (Error, OSError) as e:
+        resultado["erro"] = str(e)
+        return resultado
+    else:
+        resultado["confirmado"] = True
+
+    resultado["ok"] = resultado["processados"] == len(resultados)
+    return resultado
+
+
+# -----------------------------
+# COMANDOS
+# -----------------------------
+
+def _formatar_cargo(cargo):
+    linha = cargo._asdict()
+    linha["pode_gerenciar_estoque"] = sim_nao(cargo.pode_gerenciar_estoque)
+    linha["pode_fazer_vendas"] = sim_nao(cargo.pode_fazer_vendas)
+    return linha
+
+
+def _formatar_funcionario(funcionario):
+    linha = funcionario.como_dict()
+    linha["data_admissao"] = converter_para_br(funcionario.data_admissao)
+    linha["data_termino"] = converter_para_br(funcionario.data_termino)
+    linha["ativo"] = sim_nao(funcionario.ativo)
+    return linha
+
+
+def listar(args):
+    """Percorre as páginas (paginação por chave) escrevendo uma linha JSON por registro."""
+    if args.tabela == "cargos":
+        def pagina(apos_id):
+            return listar_cargos_pagina(args.tamanho, apos_id)
+        formatar = _formatar_cargo
+    else:
+        def pagina(apos_id):
+            return buscar_funcionarios(args.busca, args.cargo, args.tamanho, apos_id)
+        formatar = _formatar_funcionario
+
+    apos_id, restantes = args.apos, args.limite
+    while restantes is None or restantes > 0:
+        resultado = pagina(apos_id)
+        if resultado is None:
+            escrever({"ok": False, "erro": "Erro ao listar dados."})
+            return 1
+        for linha in resultado["linhas"][:restantes]:
+            escrever(formatar(linha))
+        if restantes is not None:
+            restantes -= len(resultado["linhas"])
+        if not resultado["tem_proxima"]:
+            break
+        apos_id = resultado["ultimo"]
+    return 0
+
+
+OPERACOES = {
+    ("cargos", "inserir"): _inserir_cargo,
+    ("cargos", "atualizar"): _atualizar_cargo,
+    ("funcionarios", "inserir"): _inserir_funcionario,
+    ("funcionarios", "atualizar"): _atualizar_funcionario,
+}
+
+
+def gravar(args):
+    resultado = aplicar(ler_registros(args.arquivo), OPERACOES[args.tabela, args.comando], args.simular)
+    escrever(resultado)
+    return 0 if resultado["ok"] else 1
+
+
+def deletar(args):
+    funcao = deletar_cargo if args.tabela == "cargos" else deletar_funcionario
+    registros = ((indice, {"id": id_registro}) for indice, id_registro in enumerate(args.ids, start=1))
+    resultado = aplicar(registros, lambda registro: funcao(registro["id"]), args.simular)
+    escrever(resultado)
+    return 0 if resultado["ok"] else 1
+
+
+def importar(args):
+    relatorio = importar_funcionarios(args.arquivo, args.lote)
+    relatorio["rejeitados"] = [{"linha": linha, "mensagem": motivo} for linha, motivo in relatorio["rejeitados"]]
+    relatorio["ok"] = not relatorio["rejeitados"]
+    escrever(relatorio)
+    return 0 if relatorio["ok"] else 1
+
+
+def exportar(args):
+    funcao = exportar_cargos if args.tabela == "cargos" else exportar_funcionarios
+    try:
+        estatisticas = funcao(args.arquivo, args.formato)
+    except (Error, OSError) as e:
+        escrever({"ok": False, "erro": str(e)})
+        return 1
+    escrever({"ok": True, **estatisticas})
+    return 0
+
+
+# -----------------------------
+# ARGUMENTOS
+# -----------------------------
+
+def _montar_parser():
+    parser = argparse.ArgumentParser(prog="python -m index.cli", description="GestorPro sem interface gráfica.")
+    tabelas = parser.add_subparsers(dest="tabela", required=True)
+
+    for tabela in ("cargos", "funcionarios"):
+        comandos = tabelas.add_parser(tabela).add_subparsers(dest="comando", required=True)
+
+        p = comandos.add_parser("listar", help="uma linha JSON por registro")
+        p.add_argument("--tamanho", type=int, default=TAMANHO_PAGINA_PADRAO, help="registros por página lida do banco")
+        p.add_argument("--apos", type=int, help="começa depois deste ID")
+        p.add_argument("--limite", type=int, help="máximo de registros")
+        if tabela == "funcionarios":
+            p.add_argument("--busca", default="", help="nome, e-mail ou CPF (prefixo)")
+            p.add_argument("--cargo", type=int, help="só os funcionários deste cargo")
+        p.set_defaults(funcao=listar)
+
+        for comando in ("inserir", "atualizar"):
+            p = comandos.add_parser(comando, help="registros de um .jsonl/.csv ou '-' (JSONL na entrada padrão)")
+            p.add_argument("arquivo", nargs="?", default="-")
+            p.add_argument("--simular", action="store_true", help="executa tudo e desfaz no fim")
+            p.set_defaults(funcao=gravar)
+
+        p = comandos.add_parser("deletar")
+        p.add_argument("ids", nargs="+", type=int)
+        p.add_argument("--simular", action="store_true", help="executa tudo e desfaz no fim")
+        p.set_defaults(funcao=deletar)
+
+        p = comandos.add_parser("exportar")
+        p.add_argument("arquivo")
+        p.add_argument("--formato", choices=("csv", "jsonl"), default="csv")
+        p.set_defaults(funcao=exportar)
+
+        if tabela == "funcionarios":
+            p = comandos.add_parser("importar", help="carga em lotes; linhas inválidas não interrompem")
+            p.add_argument("arquivo")
+            p.add_argument("--lote", type=int, default=500)
+            p.set_defaults(funcao=importar)
+
+    return parser
+
+
+def main(argv=None):
+    args = _montar_parser().parse_args(argv)
+    # Um banco criado por uma versão anterior ganha as colunas e tabelas novas.
+    try:
+        migrar()
+    except Error as e:
+        escrever({"ok": False, "erro": str(e)})
+        return 1
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,13 +1,27 @@
-from config.config_bd import conectar_bd
-from mysql.connector import Error
+import threading
+import time
+
+from config.config_bd import conectar_bd, apos_transacao, Error, CONFIG
+from config.instrumentacao import operacao
+from index.paginacao import paginar, buscar_por_chave, TAMANHO_PAGINA_PADRAO
+from index.lista_virtual import ListaVirtual
+from index.tarefas_bd import ExecutorBD
+from index.atualizacao import atualizar_parcial
+from index.resposta import (Resposta, codigo_do_erro, CRIADO, ATUALIZADO, DELETADO, INEXISTENTE, CONFLITO,
+                            INVALIDO, ERRO_BD)
+from index.resumo_cargos import criar_resumo
+from index.registros import Cargo, sim_nao
 import tkinter as tk
 from tkinter import ttk  
 from tkinter import messagebox 
 
 # --- 2. Funções do CRUD (A Lógica do Banco) ---
 # MODIFICADAS para retornar mensagens em vez de printar no console.
+# As que gravam devolvem uma Resposta (index.resposta): ok, mensagem, código e,
+# no inserir, o ID criado.
 
 # --- CREATE (Criar) ---
+@operacao
 def inserir_cargo(nome, gerenciar_estoque, fazer_vendas):
 
     query = "INSERT INTO cargo (cargo_nome, pode_gerenciar_estoque, pode_fazer_vendas) VALUES (%s, %s, %s)"
@@ -15,96 +29,203 @@ def inserir_cargo(nome, gerenciar_estoque, fazer_vendas):
     conexao = conectar_bd()
     if conexao:
         try:
-            cursor = conexao.cursor()
-            cursor.execute(query, (nome, gerenciar_estoque, fazer_vendas))
+            # Statement preparado da conexão: não é fechado aqui.
+            cursor = conexao.preparada("cargo.inserir", query).executar((nome, gerenciar_estoque, fazer_vendas))
+            cargo_id = cursor.lastrowid
+            criar_resumo(conexao, cargo_id)
             conexao.commit()
-            return True, (f"\n-> Cargo '{nome}' criado com sucesso (ID: {cursor.lastrowid}).")
+            apos_transacao(cache_cargos.invalidar)
+            return Resposta(True, f"\n-> Cargo '{nome}' criado com sucesso (ID: {cargo_id}).", CRIADO, cargo_id)
         except Error as e:
-            return False, f"Erro ao inserir dados: {e}"
+            conexao.rollback()
+            return Resposta(False, f"Erro ao inserir dados: {e}", codigo_do_erro(e))
         finally:
-            cursor.close()
             conexao.close()
-    return False, "Falha ao conectar no banco de dados."
+    return Resposta(False, "Falha ao conectar no banco de dados.", ERRO_BD)
 
 # --- READ (Ler/Consultar) ---
+# Colunas na ordem dos campos de Cargo (index.registros).
+SELECT_CARGOS = "SELECT cargo_id, cargo_nome, pode_gerenciar_estoque, pode_fazer_vendas, versao FROM cargo"
+
+@operacao
 def listar_cargos():
-    query = "SELECT cargo_id, cargo_nome, IF (pode_gerenciar_estoque = 1, 'Sim', 'Não') AS pode_gerenciar_estoque, IF (pode_fazer_vendas = 1, 'Sim', 'Não') AS pode_fazer_vendas FROM cargo"
-    
-    conexao = conectar_bd()
-    if conexao:
+    """Lista todos os cargos (Cargo) a partir do cache (o banco só é lido quando ele expira)."""
+    try:
+        return cache_cargos.todos()
+    except Error as e:
+        messagebox.showerror("Erro de Leitura", f"Erro ao listar dados: {e}")
+        return None
+
+@operacao
+def listar_cargos_pagina(tamanho=TAMANHO_PAGINA_PADRAO, apos_id=None, antes_id=None):
+    """
+    Uma página de cargos (Cargo) ordenada por cargo_id (paginação por chave).
+    Use 'ultimo' da página atual como apos_id para avançar e 'primeiro'
+    como antes_id para voltar. Retorna None se ocorrer erro.
+    """
+    try:
+        return paginar(SELECT_CARGOS, "cargo_id", tamanho=tamanho, apos=apos_id, antes=antes_id,
+                       registro=Cargo.da_linha)
+    except Error as e:
+        print("Erro ao listar cargos:", e)
+        return None
+
+@operacao
+def buscar_cargo(cargo_id):
+    """Um Cargo, ou None se não existir."""
+    try:
+        return buscar_por_chave("cargo.buscar", SELECT_CARGOS, "cargo_id", cargo_id, Cargo.da_linha)
+    except Error as e:
+        print("Erro ao buscar cargo:", e)
+        return None
+
+# -----------------------------
+# CACHE DE CARGOS
+# -----------------------------
+
+class CacheCargos:
+    """
+    Cópia em memória da tabela cargo (read-through): a primeira consulta, ou a
+    primeira depois de 'ttl' segundos ou de invalidar(), relê a tabela inteira;
+    as demais respondem id -> Cargo direto de um dicionário.
+    inserir_cargo, atualizar_cargo e deletar_cargo invalidam o cache.
+
+    Cada invalidar() avança a geração: uma leitura que começou antes dela
+    responde a quem pediu, mas não fica guardada como se estivesse em dia.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._por_id = None
+        self._anterior = {}             # última leitura, para quem não pode esperar (bloquear=False)
+        self._carregado_em = 0.0
+        self._geracao = 0
+        self._lock = threading.Lock()            # uma leitura do banco por vez
+        self._lock_geracao = threading.Lock()    # geração e cópia mudam juntas
+
+    @operacao(nome="carregar_cargos")
+    def _carregar(self):
+        conexao = conectar_bd()
+        if not conexao:
+            raise Error("Falha ao conectar no banco de dados.")
         try:
-            # dictionary=True faz o resultado vir como um dicionário (chave: valor)
-            cursor = conexao.cursor(dictionary=True)
-            cursor.execute(query)
-            resultados = cursor.fetchall()
-            return resultados 
-        except Error as e:
-            messagebox.showerror("Erro de Leitura", f"Erro ao listar dados: {e}")
-            return None
-        finally:
+            cursor = conexao.cursor()
+            cursor.execute(SELECT_CARGOS + " ORDER BY cargo_id")
+            por_id = {cargo.cargo_id: cargo for cargo in map(Cargo.da_linha, cursor.fetchall())}
             cursor.close()
+        finally:
             conexao.close()
-    return None
+        return por_id
+
+    def _vencido(self, por_id):
+        return por_id is None or time.monotonic() - self._carregado_em >= self.ttl
+
+    def _dados(self, bloquear=True):
+        por_id = self._por_id
+        if not bloquear:
+            # Nunca vai ao banco (uso na thread do Tk): serve o que houver, mesmo vencido.
+            return self._anterior if por_id is None else por_id
+        if not self._vencido(por_id):
+            return por_id
+
+        with self._lock:
+            # Outra thread pode ter recarregado enquanto esperávamos o lock.
+            por_id = self._por_id
+            if not self._vencido(por_id):
+                return por_id
+            geracao = self._geracao
+            por_id = self._carregar()
+            with self._lock_geracao:
+                self._anterior = por_id
+                if geracao == self._geracao:
+                    self._por_id = por_id
+                    self._carregado_em = time.monotonic()
+            return por_id
+
+    def invalidar(self):
+        with self._lock_geracao:
+            self._geracao += 1
+            self._por_id = None
+
+    def nome(self, cargo_id, bloquear=True):
+        """Nome do cargo, ou None se não existir."""
+        cargo = self._dados(bloquear).get(cargo_id)
+        return cargo.cargo_nome if cargo else None
+
+    def permissoes(self, cargo_id, bloquear=True):
+        """(pode_gerenciar_estoque, pode_fazer_vendas) do cargo, ou None se não existir."""
+        cargo = self._dados(bloquear).get(cargo_id)
+        return (cargo.pode_gerenciar_estoque, cargo.pode_fazer_vendas) if cargo else None
+
+    def todos(self):
+        """Todos os cargos (Cargo), por cargo_id."""
+        return list(self._dados().values())
+
+
+cache_cargos = CacheCargos(ttl=CONFIG['cache'].getfloat('ttl_cargos'))
 
 # --- UPDATE (Atualizar) ---
-def atualizar_cargo(cargo_id, novo_nome, novo_estoque, novas_vendas):
-    """Atualiza somente os campos preenchidos."""
+@operacao
+def atualizar_cargo(cargo_id, novo_nome, novo_estoque, novas_vendas, versao_esperada=None):
+    """
+    Atualiza somente os campos preenchidos (os que não são None), num único UPDATE.
+    Com versao_esperada, recusa a alteração se outro usuário mudou o cargo antes.
+    """
+    campos = {
+        "cargo_nome": novo_nome,
+        "pode_gerenciar_estoque": novo_estoque,
+        "pode_fazer_vendas": novas_vendas,
+    }
+    if all(valor is None for valor in campos.values()):
+        return Resposta(False, "Nenhum campo informado para atualizar.", INVALIDO)
 
     conexao = conectar_bd()
     if not conexao:
-        return False, "Falha ao conectar no banco de dados."
+        return Resposta(False, "Falha ao conectar no banco de dados.", ERRO_BD)
 
     try:
-        cursor = conexao.cursor(dictionary=True)
-
-        # 1) BUSCA os valores atuais
-        cursor.execute("SELECT * FROM cargo WHERE cargo_id = %s", (cargo_id,))
-        cargo_atual = cursor.fetchone()
-
-        if not cargo_atual:
-            return False, f"Nenhum cargo encontrado com ID {cargo_id}."
+        situacao = atualizar_parcial(conexao, "cargo", "cargo_id", cargo_id, campos, versao_esperada)
 
-        # 2) Decide o valor final de cada campo
-        nome_final = cargo_atual["cargo_nome"] if novo_nome is None else novo_nome
-        estoque_final = cargo_atual["pode_gerenciar_estoque"] if novo_estoque is None else novo_estoque
-        vendas_final = cargo_atual["pode_fazer_vendas"] if novas_vendas is None else novas_vendas
+        if situacao == CONFLITO:
+            return Resposta(False, f"O cargo {cargo_id} foi alterado por outro usuário. Recarregue e tente novamente.",
+                            CONFLITO)
+        if situacao != ATUALIZADO:
+            return Resposta(False, f"Nenhum cargo encontrado com ID {cargo_id}.", INEXISTENTE)
 
-        # 3) Executa o UPDATE
-        query = "UPDATE cargo SET cargo_nome = %s, pode_gerenciar_estoque = %s, pode_fazer_vendas = %s WHERE cargo_id = %s"
-
-        cursor.execute(query, (nome_final, estoque_final, vendas_final, cargo_id))
         conexao.commit()
+        apos_transacao(cache_cargos.invalidar)
 
-        return True, "Cargo atualizado com sucesso."
+        return Resposta(True, "Cargo atualizado com sucesso.", ATUALIZADO)
 
     except Error as e:
-        return False, f"Erro ao atualizar: {e}"
+        conexao.rollback()
+        return Resposta(False, f"Erro ao atualizar: {e}", codigo_do_erro(e))
 
     finally:
-        cursor.close()
         conexao.close()
 
 
 # --- DELETE (Deletar) ---
+@operacao
 def deletar_cargo(cargo_id):
     query = "DELETE FROM cargo WHERE cargo_id = %s"
     conexao = conectar_bd()
     if conexao:
         try:
-            cursor = conexao.cursor()
-            cursor.execute(query, (cargo_id,))
+            cursor = conexao.preparada("cargo.deletar", query).executar((cargo_id,))
             conexao.commit()
 
             if cursor.rowcount == 0:
-                return False, f"Nenhum cargo encontrado com esse id {cargo_id}."
+                return Resposta(False, f"Nenhum cargo encontrado com esse id {cargo_id}.", INEXISTENTE)
             else:
-                return True, f"Cargo {cargo_id} foi deletado com sucesso."
+                apos_transacao(cache_cargos.invalidar)
+                return Resposta(True, f"Cargo {cargo_id} foi deletado com sucesso.", DELETADO)
         except Error as e:
-            return False, f"Erro ao deletar dados: {e}"
+            conexao.rollback()
+            return Resposta(False, f"Erro ao deletar dados: {e}", codigo_do_erro(e))
         finally:
-            cursor.close()
             conexao.close()
-    return False, "Falha ao conectar no banco de dados."
+    return Resposta(False, "Falha ao conectar no banco de dados.", ERRO_BD)
 
 # --- 3. Classe da Aplicação GUI (Tkinter) ---
 # Importações necessárias para a GUI
@@ -171,44 +292,52 @@ class JanelaCargos:
 
         colunas = ('ID', 'Nome', 'Pode Gerenciar Estoque?', 'Pode Fazer Vendas?')
         
-        self.tree = ttk.Treeview(frame_lista, columns=colunas, show='headings')
+        # As consultas rodam numa thread de trabalho para não travar a janela.
+        self.executor = ExecutorBD(self.root)
+
+        # Mesma lista virtual da janela de funcionários.
+        self.lista = ListaVirtual(
+            frame_lista, colunas,
+            buscar_pagina=lambda apos_id, tamanho, antes_id=None: listar_cargos_pagina(tamanho, apos_id, antes_id),
+            formatar=self.formatar_linha,
+            chave='cargo_id',
+            executor=self.executor,
+            buscar_linha=buscar_cargo
+        )
+        self.lista.pack(fill="both", expand=True)
+        self.tree = self.lista.tree
 
         for col in colunas:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=100 if col != 'Nome' else 200) 
 
-        # --- Barra de Rolagem (Scrollbar) ---
-        
-        scrollbar = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.pack(fill="both", expand=True)
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.lista.ao_selecionar(self.on_tree_select)
         
         # --- Barra de Status ---
         self.status_label = ttk.Label(self.root, text="Pronto.", relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+        self.executor.status_label = self.status_label
+
+        # Aquece o cache usado por buscar_nome_por_id.
+        self.executor.executar(cache_cargos.todos, mensagem=None)
 
         # --- Carregar dados iniciais ---     
-        self.atualizar_treeview()
+        self.lista.recarregar()
 
     # --- Funções de Callback (Ações da GUI) ---
 
     def atualizar_treeview(self):
-        """Limpa e recarrega a lista de cargos no Treeview."""
-        
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        
-        cargos = listar_cargos()
-        if cargos:
-            for cargo in cargos:
-                self.tree.insert('', tk.END, values=(
-                    cargo['cargo_id'],
-                    cargo['cargo_nome'],
-                    cargo['pode_gerenciar_estoque'],
-                    cargo['pode_fazer_vendas'],
-                ))
+        """Atualiza a lista de cargos aplicando só as linhas que mudaram."""
+        self.lista.atualizar_tudo()
+
+    def formatar_linha(self, cargo):
+        """Valores exibidos no Treeview para um cargo."""
+        return (
+            cargo.cargo_id,
+            cargo.cargo_nome,
+            sim_nao(cargo.pode_gerenciar_estoque),
+            sim_nao(cargo.pode_fazer_vendas),
+        )
 
     def limpar_campos(self):
         """Limpa todos os campos de entrada do formulário."""
@@ -221,11 +350,10 @@ class JanelaCargos:
     def on_tree_select(self, event):
         """Preenche os campos quando um item da lista é selecionado."""
         try:
-            item_selecionado = self.tree.focus()
-            
-            if not item_selecionado:
+            valores = self.lista.valores_selecionados()
+
+            if not valores:
                 return
-            valores = self.tree.item(item_selecionado, 'values')
             
             self.limpar_campos()
             
@@ -238,8 +366,30 @@ class JanelaCargos:
         except Exception as e:
             self.status_label.config(text=f"Erro ao selecionar: {e}")
     
-    # def buscar_nome_por_id(self, id_cargo):
-    #     return self.nome_cargos.get(id_cargo, None)
+    def buscar_nome_por_id(self, id_cargo):
+        return cache_cargos.nome(id_cargo, bloquear=False)
+
+    def concluir_operacao(self, resultado, titulo_erro, id_alterado=None):
+        """
+        Mostra o resultado de uma operação do CRUD (já de volta à thread do Tk).
+        id_alterado: linha atualizada/deletada; None depois de um inserir.
+        """
+        sucesso, mensagem = resultado.ok, resultado.mensagem
+
+        if sucesso:
+            # 'messagebox.showinfo()': Exibe um pop-up de INFORMAÇÃO.
+            messagebox.showinfo("Sucesso", mensagem)
+            # ATUALIZA na tela só a linha que mudou
+            if id_alterado is None:
+                self.lista.carregar_novas()
+            else:
+                self.lista.atualizar_chave(id_alterado)
+            self.limpar_campos()      # Limpa o formulário
+        else:
+            messagebox.showerror(titulo_erro, mensagem)
+
+        # Atualiza a barra de status com o resultado.
+        self.status_label.config(text=mensagem)
 
     def adicionar_cargo_gui(self):
         """Coleta dados dos campos e chama a função de inserir."""
@@ -272,21 +422,21 @@ class JanelaCargos:
             messagebox.showwarning("Valor incorreto","'Pode Fazer Vendas' só aceita os valores S e N.")
             return       
 
-        # Chama a função do CRUD (da Seção 2)
-        sucesso, mensagem = inserir_cargo(nome, gerencia, venda)
-        
-        if sucesso:
-            # 'messagebox.showinfo()': Exibe um pop-up de INFORMAÇÃO.
-            messagebox.showinfo("Sucesso", mensagem)
-            self.atualizar_treeview() # ATUALIZA a lista na tela
-            self.limpar_campos()      # Limpa o formulário
-        else:
-            messagebox.showerror("Erro ao Adicionar", mensagem)
-        
-        # Atualiza a barra de status com o resultado.
-        self.status_label.config(text=mensagem)
+        # Chama a função do CRUD (da Seção 2) na thread de trabalho
+        self.executor.executar(
+            inserir_cargo, nome, gerencia, venda,
+            ao_concluir=lambda resultado: self.concluir_operacao(resultado, "Erro ao Adicionar"),
+            mensagem="Salvando cargo..."
+        )
         
         
+    def versao_do_formulario(self, id_registro):
+        """Versão da linha selecionada na lista, se o formulário ainda se refere a ela."""
+        linha = self.lista.linha_selecionada()
+        if linha and linha.cargo_id == id_registro:
+            return linha.versao
+        return None
+
     def atualizar_cargo_gui(self):
         try:
             cargo_id = int(self.entry_id.get().strip())
@@ -326,14 +476,13 @@ class JanelaCargos:
             return
 
         # ---- Chama a função de atualização ----
-        sucesso, mensagem = atualizar_cargo(cargo_id, novo_nome, novo_gerencia, novo_venda)
-
-        if sucesso:
-            messagebox.showinfo("Sucesso", mensagem)
-            self.atualizar_treeview()
-            self.limpar_campos()
-        else:
-            messagebox.showerror("Erro", mensagem)
+        self.executor.executar(
+            atualizar_cargo, cargo_id, novo_nome, novo_gerencia, novo_venda,
+            # Recusa a gravação se outro usuário alterou o cargo depois que ele foi lido.
+            self.versao_do_formulario(cargo_id),
+            ao_concluir=lambda resultado: self.concluir_operacao(resultado, "Erro", cargo_id),
+            mensagem="Atualizando cargo..."
+        )
 
 
     def deletar_cargo_gui(self):
@@ -351,23 +500,18 @@ class JanelaCargos:
         except ValueError:
             messagebox.showerror("ID Inválido", "O ID deve ser um número.")
             return
-        # nome_cargo = self.buscar_nome_por_id(id)
+        nome_cargo = self.buscar_nome_por_id(id) or nome_cargo
 
         # 'messagebox.askyesno()': Exibe um pop-up de SIM/NÃO.
         # Retorna True se o usuário clicar em "Sim" e False se clicar em "Não".
-        if messagebox.askyesno("Confirmar Exclusão", f"Tem CERTEZA que deseja deletar o cargo: {id}?"):
+        if messagebox.askyesno("Confirmar Exclusão", f"Tem CERTEZA que deseja deletar o cargo: {id} - {nome_cargo}?"):
             
             # Só executa se o usuário confirmou
-            sucesso, mensagem = deletar_cargo(id)
-            
-            if sucesso:
-                messagebox.showinfo("Sucesso", mensagem)
-                self.atualizar_treeview()
-                self.limpar_campos()
-            else:
-                messagebox.showerror("Erro ao Deletar", mensagem)
-            
-            self.status_label.config(text=mensagem)
+            self.executor.executar(
+                deletar_cargo, id,
+                ao_concluir=lambda resultado: self.concluir_operacao(resultado, "Erro ao Deletar", id),
+                mensagem="Deletando cargo..."
+            )
         else:
             # Se o usuário clicou em "Não"
             self.status_label.config(text="Operação de exclusão cancelada.")
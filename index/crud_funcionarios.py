@@ -1,10 +1,23 @@
 from datetime import datetime, date
-from config.config_bd import conectar_bd
-from mysql.connector import Error
+import csv
+import json
+from config.config_bd import conectar_bd, transacao, exigir, Error
+from config.instrumentacao import operacao
+from index.paginacao import paginar, buscar_por_chave, TAMANHO_PAGINA_PADRAO
+from index.lista_virtual import ListaVirtual
+from index.tarefas_bd import ExecutorBD
+from index.crud_cargos import cache_cargos
+from index.atualizacao import atualizar_parcial
+from index.resposta import (Resposta, codigo_do_erro, CRIADO, ATUALIZADO, DELETADO, INEXISTENTE, CONFLITO,
+                            INVALIDO, ERRO_BD)
+from index.resumo_cargos import resumo_por_cargo, somar_funcionarios, ajustar_por_funcionario
+from index.registros import Funcionario, sim_nao
+from index.texto import normalizar_busca
 import re
 import tkinter as tk
 from tkinter import ttk  # 'themed tk' para widgets mais modernos
 from tkinter import messagebox # Para pop-ups de confirmação e erro
+from tkinter import filedialog
 
 # -----------------------------
 # CONVERSORES DE DATA
@@ -30,6 +43,19 @@ def converter_para_br(data_mysql):
 
         
 
+# -----------------------------
+# SIM / NÃO
+# -----------------------------
+
+def ler_sim_nao(texto):
+    """'S', 'Sim', '1' -> 1; 'N', 'Não', '0' -> 0; qualquer outra coisa -> None."""
+    texto = str(texto).strip().upper()
+    if texto in ("S", "SIM", "1"):
+        return 1
+    if texto in ("N", "NAO", "NÃO", "0"):
+        return 0
+    return None
+
 # -----------------------------
 # VALIDAÇÃO DE CPF
 # -----------------------------
@@ -65,17 +91,25 @@ def validar_telefone(telefone):
 # VALIDAÇÃO DE DATAS
 # -----------------------------
 
+def ler_data_br(data_br):
+    """Converte 'DD/MM/AAAA' em date, ou None se a data for inválida."""
+    try:
+        return datetime.strptime(data_br, "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
 def validar_datas(data_adm_br, data_term_br):
-    data_adm = converter_para_mysql(data_adm_br)
+    # Cada data é lida uma única vez; a comparação é feita entre objetos date.
+    data_adm = ler_data_br(data_adm_br)
     if not data_adm:
         return False, "Data de admissão inválida! Use o formato DD/MM/AAAA."
 
     if data_term_br:
-        data_term = converter_para_mysql(data_term_br)
+        data_term = ler_data_br(data_term_br)
         if not data_term:
             return False, "Data de término inválida! Use o formato DD/MM/AAAA."
 
-        if datetime.strptime(data_term, "%Y-%m-%d") < datetime.strptime(data_adm, "%Y-%m-%d"):
+        if data_term < data_adm:
             return False, "A data de término não pode ser anterior à data de admissão."
 
     return True, ""
@@ -93,10 +127,11 @@ def validar_nome(nome):
 # -----------------------------
 # VALIDAÇÃO DE EMAIL
 # -----------------------------
+PADRAO_EMAIL = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+
 def validar_email(email):
     """Valida um e-mail simples usando regex."""
-    padrao = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(padrao, email) is not None
+    return PADRAO_EMAIL.match(email) is not None
 
 # -----------------------------
 # VALIDAÇÃO DE SALÁRIO
@@ -114,8 +149,11 @@ def validar_salario(salario):
     except ValueError:
         return False
 
-# --- CREATE (Criar) ---
-def inserir_funcionario(cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, ativo):
+# -----------------------------
+# VALIDAÇÃO DO REGISTRO COMPLETO
+# -----------------------------
+def validar_funcionario(nome, email, cpf, telefone, data_admissao, data_termino, salario):
+    """Aplica todas as validações de um novo funcionário. Retorna (ok, erro)."""
 
     # -------------------------
     # VALIDAR CPF
@@ -151,9 +189,21 @@ def inserir_funcionario(cargo_id, nome, email, cpf, telefone, data_admissao, dat
     # -------------------------
     # VALIDAR DATAS
     # -------------------------
-    ok, erro = validar_datas(data_admissao, data_termino)
+    return validar_datas(data_admissao, data_termino)
+
+# --- CREATE (Criar) ---
+QUERY_INSERIR_FUNCIONARIO = """
+    INSERT INTO funcionario 
+    (cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, ativo, nome_busca) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+@operacao
+def inserir_funcionario(cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, ativo):
+
+    ok, erro = validar_funcionario(nome, email, cpf, telefone, data_admissao, data_termino, salario)
     if not ok:
-        return False, erro
+        return Resposta(False, erro, INVALIDO)
 
     # Converter para formato MySQL
     data_admissao = converter_para_mysql(data_admissao)
@@ -162,46 +212,49 @@ def inserir_funcionario(cargo_id, nome, email, cpf, telefone, data_admissao, dat
     # -------------------------
     # QUERY
     # -------------------------
-    query = """
-        INSERT INTO funcionario 
-        (cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, ativo) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
+    query = QUERY_INSERIR_FUNCIONARIO
 
     conexao = conectar_bd()
     if conexao:
         try:
-            cursor = conexao.cursor()
             salario = float(str(salario).replace(",", "."))
-            cursor.execute(query, (
+            # Statement preparado da conexão: não é fechado aqui.
+            cursor = conexao.preparada("funcionario.inserir", query).executar((
                 cargo_id, nome, email, cpf, telefone,
-                data_admissao, data_termino, salario, ativo
+                data_admissao, data_termino, salario, ativo, normalizar_busca(nome)
             ))
+            funcionario_id = cursor.lastrowid
+            somar_funcionarios(conexao, [(cargo_id, ativo, salario)])
             conexao.commit()
 
-            return True, f"\n-> Funcionário '{nome}' adicionado com sucesso (ID: {cursor.lastrowid})."
+            return Resposta(True, f"\n-> Funcionário '{nome}' adicionado com sucesso (ID: {funcionario_id}).", CRIADO,
+                            funcionario_id)
 
         except Error as e:
-            return False, f"Erro ao inserir dados: {e}"
+            conexao.rollback()
+            return Resposta(False, f"Erro ao inserir dados: {e}", codigo_do_erro(e))
 
         finally:
-            cursor.close()
             conexao.close()
 
-    return False, "Falha ao conectar no banco de dados."
+    return Resposta(False, "Falha ao conectar no banco de dados.", ERRO_BD)
 
 
 # --- READ (Ler/Consultar) ---
+# Colunas na ordem dos campos de Funcionario (index.registros).
+SELECT_FUNCIONARIOS = "SELECT funcionario_id, cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, ativo, versao FROM funcionario"
+
+@operacao
 def listar_funcionarios():
-    query = "SELECT funcionario_id, cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario, IF (ativo = 1, 'Sim', 'Não') AS ativo FROM funcionario"
+    query = SELECT_FUNCIONARIOS
     
     conexao = conectar_bd()
     if conexao:
         try:
-            # dictionary=True faz o resultado vir como um dicionário (chave: valor)
-            cursor = conexao.cursor(dictionary=True)
+            # Tuplas do cursor viram registros Funcionario (sem um dict por linha)
+            cursor = conexao.cursor()
             cursor.execute(query)
-            resultados = cursor.fetchall()
+            resultados = list(map(Funcionario.da_linha, cursor.fetchall()))
             return resultados 
         except Error as e:
             messagebox.showerror("Erro de Leitura", f"Erro ao listar dados: {e}")
@@ -211,29 +264,114 @@ def listar_funcionarios():
             conexao.close()
     return None
 
+@operacao
+def listar_funcionarios_pagina(tamanho=TAMANHO_PAGINA_PADRAO, apos_id=None, antes_id=None,
+                               cargo_id=None, ativo=None):
+    """
+    Uma página de funcionários (Funcionario) ordenada por funcionario_id (paginação por chave),
+    opcionalmente filtrada por cargo_id e/ou ativo (1/0).
+    Use 'ultimo' da página atual como apos_id para avançar e 'primeiro'
+    como antes_id para voltar. Retorna None se ocorrer erro.
+    """
+    filtros = {"cargo_id": cargo_id, "ativo": None if ativo is None else int(ativo)}
+    try:
+        return paginar(SELECT_FUNCIONARIOS, "funcionario_id", filtros, tamanho, apos_id, antes_id,
+                       registro=Funcionario.da_linha)
+    except Error as e:
+        print("Erro ao listar funcionários:", e)
+        return None
+
+def _prefixo_like(texto):
+    """Padrão LIKE 'texto%' com os curingas do próprio texto escapados (ESCAPE '!')."""
+    for especial in "!%_":
+        texto = texto.replace(especial, "!" + especial)
+    return texto + "%"
+
+def _formatar_prefixo_cpf(digitos):
+    """Aplica a máscara 000.000.000-00 ao início de um CPF digitado sem pontuação."""
+    formatado = ""
+    for i, digito in enumerate(digitos[:11]):
+        if i in (3, 6):
+            formatado += "."
+        elif i == 9:
+            formatado += "-"
+        formatado += digito
+    return formatado
+
+def condicoes_busca(termo):
+    """
+    Traduz o texto digitado na busca em condições para paginar():
+    com '@' procura pelo início do e-mail; só dígitos e pontuação, pelo início
+    do CPF (com ou sem máscara); o resto, pelo início do nome, sem diferenciar
+    maiúsculas nem acentos. Todas usam índices da tabela funcionario.
+    """
+    termo = termo.strip()
+    if not termo:
+        return []
+
+    if "@" in termo:
+        return [("email LIKE %s ESCAPE '!'", (_prefixo_like(termo),))]
+
+    if all(c.isdigit() or c in ".- " for c in termo) and any(c.isdigit() for c in termo):
+        digitos = "".join(filter(str.isdigit, termo))
+        # O CPF fica gravado como foi digitado no cadastro: com ou sem máscara.
+        return [("cpf LIKE %s ESCAPE '!' OR cpf LIKE %s ESCAPE '!'",
+                 (_prefixo_like(digitos), _prefixo_like(_formatar_prefixo_cpf(digitos))))]
+
+    return [("nome_busca LIKE %s ESCAPE '!'", (_prefixo_like(normalizar_busca(termo)),))]
+
+@operacao
+def buscar_funcionarios(termo="", cargo_id=None, tamanho=TAMANHO_PAGINA_PADRAO, apos_id=None, antes_id=None):
+    """
+    Uma página (como em listar_funcionarios_pagina) dos funcionários cujo nome,
+    CPF ou e-mail começa com 'termo', opcionalmente só de um cargo.
+    Retorna None se ocorrer erro.
+    """
+    try:
+        return paginar(SELECT_FUNCIONARIOS, "funcionario_id", {"cargo_id": cargo_id}, tamanho,
+                       apos_id, antes_id, condicoes=condicoes_busca(termo), registro=Funcionario.da_linha)
+    except Error as e:
+        print("Erro ao buscar funcionários:", e)
+        return None
+
+@operacao
+def buscar_funcionario(funcionario_id):
+    """Um Funcionario, ou None se não existir."""
+    try:
+        return buscar_por_chave("funcionario.buscar", SELECT_FUNCIONARIOS, "funcionario_id", funcionario_id,
+                                Funcionario.da_linha)
+    except Error as e:
+        print("Erro ao buscar funcionário:", e)
+        return None
+
 # --- UPDATE (Atualizar) ---
+@operacao
 def atualizar_funcionario(funcionario_id, novo_cargo_id, novo_nome, novo_email, novo_cpf,
                           novo_telefone, novo_data_admissao, novo_data_termino,
-                          novo_salario, novo_ativo):
+                          novo_salario, novo_ativo, versao_esperada=None):
+    """
+    Atualiza somente os campos preenchidos (os que não são None), num único UPDATE.
+    Com versao_esperada, recusa a alteração se outro usuário mudou o funcionário antes.
+    """
 
     # -------------------------
     # VALIDAR CAMPOS OPCIONAIS
     # -------------------------
 
     if novo_nome is not None and not validar_nome(novo_nome):
-        return False, "Nome inválido! Use apenas letras e espaços."
+        return Resposta(False, "Nome inválido! Use apenas letras e espaços.", INVALIDO)
 
     if novo_email is not None and not validar_email(novo_email):
-        return False, "E-mail inválido! Exemplo: nome@dominio.com"
+        return Resposta(False, "E-mail inválido! Exemplo: nome@dominio.com", INVALIDO)
 
     if novo_cpf is not None and not validar_cpf(novo_cpf):
-        return False, "CPF inválido! Verifique e tente novamente."
+        return Resposta(False, "CPF inválido! Verifique e tente novamente.", INVALIDO)
 
     if novo_telefone is not None and not validar_telefone(novo_telefone):
-        return False, "Telefone inválido! Deve ter 10 ou 11 dígitos."
+        return Resposta(False, "Telefone inválido! Deve ter 10 ou 11 dígitos.", INVALIDO)
     
     if novo_salario is not None and not validar_salario(novo_salario):
-        return False, "Salário inválido! Informe um valor numérico maior que zero."
+        return Resposta(False, "Salário inválido! Informe um valor numérico maior que zero.", INVALIDO)
 
     # -------------------------
     # VALIDAR DATAS (somente se o usuário enviou novas datas)
@@ -242,7 +380,7 @@ def atualizar_funcionario(funcionario_id, novo_cargo_id, novo_nome, novo_email,
 
         ok, erro = validar_datas(novo_data_admissao or "", novo_data_termino or "")
         if not ok:
-            return False, erro
+            return Resposta(False, erro, INVALIDO)
 
         # Converter para MySQL
         if novo_data_admissao is not None:
@@ -251,124 +389,267 @@ def atualizar_funcionario(funcionario_id, novo_cargo_id, novo_nome, novo_email,
         if novo_data_termino:
             novo_data_termino = converter_para_mysql(novo_data_termino)
 
+    if novo_salario is not None:
+        novo_salario = float(str(novo_salario).replace(",", "."))
+
+    campos = {
+        "cargo_id": novo_cargo_id,
+        "nome": novo_nome,
+        "nome_busca": None if novo_nome is None else normalizar_busca(novo_nome),
+        "email": novo_email,
+        "cpf": novo_cpf,
+        "telefone": novo_telefone,
+        "data_admissao": novo_data_admissao,
+        "data_termino": novo_data_termino,
+        "salario": novo_salario,
+        "ativo": novo_ativo,
+    }
+    if all(valor is None for valor in campos.values()):
+        return Resposta(False, "Nenhum campo informado para atualizar.", INVALIDO)
 
     conexao = conectar_bd()
     if not conexao:
-        return False, "Falha ao conectar no banco de dados."
+        return Resposta(False, "Falha ao conectar no banco de dados.", ERRO_BD)
 
     try:
-        cursor = conexao.cursor(dictionary=True)
-
-        # 1) Buscar valores atuais
-        cursor.execute("SELECT * FROM funcionario WHERE funcionario_id = %s", (funcionario_id,))
-        funcionario_atual = cursor.fetchone()
-
-        if not funcionario_atual:
-            return False, f"Nenhum Funcionário encontrado com ID {funcionario_id}."
-
-        # 2) Escolher valores finais
-        cargo_final = funcionario_atual["cargo_id"] if novo_cargo_id is None else novo_cargo_id
-        nome_final = funcionario_atual["nome"] if novo_nome is None else novo_nome
-        email_final = funcionario_atual["email"] if novo_email is None else novo_email
-        cpf_final = funcionario_atual["cpf"] if novo_cpf is None else novo_cpf
-        telefone_final = funcionario_atual["telefone"] if novo_telefone is None else novo_telefone
-        admissao_final = funcionario_atual["data_admissao"] if novo_data_admissao is None else novo_data_admissao
-        termino_final = funcionario_atual["data_termino"] if novo_data_termino is None else novo_data_termino
-        salario_final = funcionario_atual["salario"] if novo_salario is None else novo_salario
-        ativo_final = funcionario_atual["ativo"] if novo_ativo is None else novo_ativo
-
-        # 3) Executar UPDATE
-        query = """
-            UPDATE funcionario
-            SET cargo_id = %s,
-                nome = %s,
-                email = %s,
-                cpf = %s,
-                telefone = %s,
-                data_admissao = %s,
-                data_termino = %s,
-                salario = %s,
-                ativo = %s
-            WHERE funcionario_id = %s
-        """
-
-        params = (
-            cargo_final,
-            nome_final,
-            email_final,
-            cpf_final,
-            telefone_final,
-            admissao_final,
-            termino_final,
-            salario_final,
-            ativo_final,
-            funcionario_id
-        )
-        salario_final = float(str(salario_final).replace(",", "."))
-        cursor.execute(query, params)
+        # O resumo por cargo só muda se cargo, ativo ou salário mudarem.
+        muda_resumo = any(campos[c] is not None for c in ("cargo_id", "ativo", "salario"))
+        if muda_resumo:
+            ajustar_por_funcionario(conexao, funcionario_id, -1)
+
+        # UPDATE único só com os campos informados
+        situacao = atualizar_parcial(conexao, "funcionario", "funcionario_id", funcionario_id, campos, versao_esperada)
+
+        if situacao == CONFLITO:
+            conexao.rollback()
+            return Resposta(False, f"O funcionário {funcionario_id} foi alterado por outro usuário. "
+                                   "Recarregue e tente novamente.", CONFLITO)
+        if situacao != ATUALIZADO:
+            conexao.rollback()
+            return Resposta(False, f"Nenhum Funcionário encontrado com ID {funcionario_id}.", INEXISTENTE)
+
+        if muda_resumo:
+            ajustar_por_funcionario(conexao, funcionario_id, 1)
         conexao.commit()
 
-        return True, f"Funcionário {nome_final} atualizado com sucesso."
+        return Resposta(True, f"Funcionário {novo_nome or funcionario_id} atualizado com sucesso.", ATUALIZADO)
 
     except Error as e:
-        return False, f"Erro ao atualizar: {e}"
+        conexao.rollback()
+        return Resposta(False, f"Erro ao atualizar: {e}", codigo_do_erro(e))
 
     finally:
-        cursor.close()
         conexao.close()
 
 
 
 
 # --- DELETE (Deletar) ---
+@operacao
 def deletar_funcionario(funcionario_id):
     query = "DELETE FROM funcionario WHERE funcionario_id = %s"
     conexao = conectar_bd()
     if conexao:
         try:
-            cursor = conexao.cursor()
-            cursor.execute(query, (funcionario_id,))
+            # Retira o funcionário do resumo por cargo antes de apagá-lo.
+            ajustar_por_funcionario(conexao, funcionario_id, -1)
+            cursor = conexao.preparada("funcionario.deletar", query).executar((funcionario_id,))
             conexao.commit()
 
             if cursor.rowcount == 0:
-                return False, f"Nenhum Funcionário encontrado com esse id {funcionario_id}."
+                return Resposta(False, f"Nenhum Funcionário encontrado com esse id {funcionario_id}.", INEXISTENTE)
             else:
-                return True, f"Funcionário {funcionario_id} foi deletado com sucesso."
+                return Resposta(True, f"Funcionário {funcionario_id} foi deletado com sucesso.", DELETADO)
         except Error as e:
-            return False, f"Erro ao deletar dados: {e}"
+            conexao.rollback()
+            return Resposta(False, f"Erro ao deletar dados: {e}", codigo_do_erro(e))
         finally:
-            cursor.close()
             conexao.close()
-    return False, "Falha ao conectar no banco de dados."
+    return Resposta(False, "Falha ao conectar no banco de dados.", ERRO_BD)
 
+@operacao
+def transferir_funcionarios(funcionario_ids, novo_cargo_id):
+    """
+    Passa os funcionários para o cargo 'novo_cargo_id' numa única transação:
+    ou todos mudam de cargo, ou nenhum muda.
+    """
+    try:
+        with transacao():
+            for funcionario_id in funcionario_ids:
+                exigir(atualizar_funcionario(funcionario_id, novo_cargo_id,
+                                             None, None, None, None, None, None, None, None))
+    except Error as e:
+        return Resposta(False, f"Nenhum funcionário foi transferido: {e}",
+                        getattr(e, "codigo", None) or codigo_do_erro(e))
+
+    return Resposta(True, f"{len(funcionario_ids)} funcionário(s) transferido(s) para o cargo {novo_cargo_id}.",
+                    ATUALIZADO)
+
+@operacao
 def relatorio_funcionarios_por_cargo():
-    query = """
-        SELECT c.cargo_nome AS cargo, COUNT(f.funcionario_id) AS quantidade
-        FROM funcionario f
-        JOIN cargo c ON f.cargo_id = c.cargo_id
-        GROUP BY f.cargo_id
-        ORDER BY quantidade DESC;
     """
+    Quantidade total e de ativos, folha e salário médio por cargo, inclusive
+    os cargos sem funcionários. Lido do resumo mantido a cada alteração de
+    funcionário (uma linha por cargo), não da tabela funcionario.
+    """
+    return resumo_por_cargo()
 
-    conexao = conectar_bd()
-    if not conexao:
-        return None
+
+# -----------------------------
+# IMPORTAÇÃO EM MASSA (CSV / JSONL)
+# -----------------------------
+
+CAMPOS_IMPORTACAO = ("cargo_id", "nome", "email", "cpf", "telefone",
+                     "data_admissao", "data_termino", "salario", "ativo")
+
+def ler_arquivo_funcionarios(caminho):
+    """
+    Lê o arquivo linha a linha (sem carregar tudo na memória) e gera
+    (numero_da_linha, registro). Aceita .jsonl ou CSV separado por ',' ou ';'.
+    """
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        if caminho.lower().endswith((".jsonl", ".json")):
+            for numero, linha in enumerate(arquivo, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    yield numero, json.loads(linha)
+                except ValueError as e:
+                    yield numero, e
+            return
+
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.DictReader(arquivo, dialect=dialeto)
+        for registro in leitor:
+            # A linha 1 é o cabeçalho.
+            yield leitor.line_num, registro
+
+
+def _preparar_registro(registro):
+    """Valida um registro do arquivo e devolve (parametros_do_insert, erro)."""
+    if isinstance(registro, Exception):
+        return None, f"Linha ilegível: {registro}"
+
+    campos = {c: str(registro.get(c) or "").strip() for c in CAMPOS_IMPORTACAO}
 
     try:
-        cursor = conexao.cursor(dictionary=True)
-        cursor.execute(query)
-        return cursor.fetchall()
+        cargo_id = int(campos["cargo_id"])
+    except ValueError:
+        return None, "O ID do cargo deve ser numérico."
 
-    except Error as e:
-        print("Erro ao gerar relatório:", e)
-        return None
+    ativo = ler_sim_nao(campos["ativo"] or "S")
+    if ativo is None:
+        return None, "'Ativo' só aceita os valores S/N ou Sim/Não"
+
+    ok, erro = validar_funcionario(campos["nome"], campos["email"], campos["cpf"], campos["telefone"],
+                                   campos["data_admissao"], campos["data_termino"], campos["salario"])
+    if not ok:
+        return None, erro
+
+    return (
+        cargo_id, campos["nome"], campos["email"], campos["cpf"], campos["telefone"],
+        converter_para_mysql(campos["data_admissao"]),
+        converter_para_mysql(campos["data_termino"]) if campos["data_termino"] else None,
+        float(campos["salario"].replace(",", ".")),
+        ativo,
+        normalizar_busca(campos["nome"]),
+    ), ""
+
+
+def _gravar_lote(conexao, lote, relatorio):
+    """
+    Insere o lote com um único executemany e um único commit. Se o banco
+    recusar alguma linha (CPF repetido, cargo inexistente...), refaz o lote
+    linha a linha na mesma transação para descobrir qual foi.
+    """
+    cursor = conexao.cursor()
+    try:
+        try:
+            cursor.executemany(QUERY_INSERIR_FUNCIONARIO, [params for _, params in lote])
+            # (cargo_id, ativo, salario) de cada linha, para o resumo por cargo.
+            somar_funcionarios(conexao, [(p[0], p[8], p[7]) for _, p in lote])
+            conexao.commit()
+            relatorio["inseridos"] += len(lote)
+            return
+        except Error:
+            conexao.rollback()
 
+        inseridos = []
+        for numero, params in lote:
+            try:
+                cursor.execute(QUERY_INSERIR_FUNCIONARIO, params)
+                inseridos.append((params[0], params[8], params[7]))
+            except Error as e:
+                relatorio["rejeitados"].append((numero, f"Erro do banco: {e}"))
+        somar_funcionarios(conexao, inseridos)
+        conexao.commit()
+        # Só conta depois do commit: se ele falhar, nada do lote foi gravado.
+        relatorio["inseridos"] += len(inseridos)
     finally:
         cursor.close()
+
+
+@operacao
+def importar_funcionarios(caminho, tamanho_lote=500):
+    """
+    Importa funcionários de um arquivo CSV ou JSONL em lotes.
+    Linhas inválidas não interrompem a carga: vão para o relatório
+    devolvido, no formato {"lidos", "inseridos", "rejeitados": [(linha, motivo)]}.
+    """
+    relatorio = {"lidos": 0, "inseridos": 0, "rejeitados": []}
+
+    conexao = conectar_bd()
+    if not conexao:
+        relatorio["rejeitados"].append((0, "Falha ao conectar no banco de dados."))
+        return relatorio
+
+    # CPFs e e-mails já vistos no próprio arquivo: evita derrubar um lote inteiro.
+    cpfs_vistos, emails_vistos = set(), set()
+    lote = []
+
+    try:
+        for numero, registro in ler_arquivo_funcionarios(caminho):
+            relatorio["lidos"] += 1
+
+            params, erro = _preparar_registro(registro)
+            if not erro:
+                cpf, email = params[3], params[2].lower()
+                if cpf in cpfs_vistos:
+                    erro = "CPF repetido no arquivo."
+                elif email in emails_vistos:
+                    erro = "E-mail repetido no arquivo."
+            if erro:
+                relatorio["rejeitados"].append((numero, erro))
+                continue
+
+            cpfs_vistos.add(cpf)
+            emails_vistos.add(email)
+            lote.append((numero, params))
+
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(conexao, lote, relatorio)
+                lote = []
+
+        if lote:
+            _gravar_lote(conexao, lote, relatorio)
+
+    except (OSError, csv.Error) as e:
+        relatorio["rejeitados"].append((0, f"Erro ao ler o arquivo: {e}"))
+    finally:
         conexao.close()
 
+    return relatorio
+
 
 class JanelaFuncionarios:
+
+    # Espera entre a última tecla digitada na busca e a consulta ao banco.
+    ATRASO_BUSCA_MS = 300
     
     # O método __init__ é o "construtor" da classe. 
     # É executado automaticamente quando um novo objeto AplicacaoCRUD é criado.
@@ -395,6 +676,11 @@ class JanelaFuncionarios:
         ttk.Label(frame_formulario, text="ID Cargo:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         self.entry_idCargo = ttk.Entry(frame_formulario)
         self.entry_idCargo.grid(row=1, column=1, padx=5, pady=5)
+        self.entry_idCargo.bind('<KeyRelease>', lambda e: self.mostrar_nome_cargo())
+
+        # Nome do cargo digitado/selecionado, vindo do cache de cargos.
+        self.label_nome_cargo = ttk.Label(frame_formulario, text="", width=18)
+        self.label_nome_cargo.grid(row=1, column=2, padx=5, pady=5, sticky="w")
         
         ttk.Label(frame_formulario, text="ID (p/Atualizar/Deletar):").grid(row=2, column=0, padx=5, pady=5, sticky="w")
         self.entry_id = ttk.Entry(frame_formulario)
@@ -449,14 +735,51 @@ class JanelaFuncionarios:
         self.btn_atualizar = ttk.Button(frame_botoes, text="Relatório", command=self.janela_relatorio_funcionarios)
         self.btn_atualizar.grid(row=0, column=3, padx=5)
 
+        self.btn_importar = ttk.Button(frame_botoes, text="Importar", command=self.importar_funcionarios_gui)
+        self.btn_importar.grid(row=0, column=4, padx=5)
+
+        # --- Frame para a Busca ---
+
+        frame_busca = ttk.Frame(self.root)
+        frame_busca.pack(padx=10, fill="x")
+
+        ttk.Label(frame_busca, text="Buscar (nome, CPF ou e-mail):").pack(side=tk.LEFT, padx=5)
+        self.entry_busca = ttk.Entry(frame_busca, width=40)
+        self.entry_busca.pack(side=tk.LEFT, padx=5)
+        self.entry_busca.bind('<KeyRelease>', self.agendar_busca)
+
+        ttk.Label(frame_busca, text="Cargo:").pack(side=tk.LEFT, padx=5)
+        self.combo_cargo = ttk.Combobox(frame_busca, state="readonly", values=("Todos",))
+        self.combo_cargo.current(0)
+        self.combo_cargo.pack(side=tk.LEFT, padx=5)
+        self.combo_cargo.bind('<<ComboboxSelected>>', lambda e: self.aplicar_busca())
+
+        self.cargos_busca = {"Todos": None}    # texto do combobox -> cargo_id
+        self.filtro_busca = ("", None)         # (termo, cargo_id) da lista exibida
+        self._busca_agendada = None
+
         # --- Frame para a Lista (Treeview) ---
         
         frame_lista = ttk.LabelFrame(self.root, text="Lista de Funcionários")
         frame_lista.pack(padx=10, pady=10, fill="both", expand=True)
 
-        colunas = ('ID', 'Cargo ID', 'Nome', 'Email', 'CPF', 'Telefone', 'Data Admissão', 'Data Término', 'Salário', 'Está ativo?')
+        colunas = ('ID', 'Cargo', 'Nome', 'Email', 'CPF', 'Telefone', 'Data Admissão', 'Data Término', 'Salário', 'Está ativo?')
         
-        self.tree = ttk.Treeview(frame_lista, columns=colunas, show='headings')
+        # As consultas rodam numa thread de trabalho para não travar a janela.
+        self.executor = ExecutorBD(self.root)
+
+        # Lista virtual: só as linhas visíveis viram itens do Treeview e as
+        # páginas seguintes são buscadas conforme a rolagem avança.
+        self.lista = ListaVirtual(
+            frame_lista, colunas,
+            buscar_pagina=self.buscar_pagina,
+            formatar=self.formatar_linha,
+            chave='funcionario_id',
+            executor=self.executor,
+            buscar_linha=self.buscar_linha
+        )
+        self.lista.pack(fill="both", expand=True)
+        self.tree = self.lista.tree
 
         for col in colunas:
             self.tree.heading(col, text=col)
@@ -468,48 +791,90 @@ class JanelaFuncionarios:
             else:
                 self.tree.column(col, width=110)
 
-
-        # --- Barra de Rolagem (Scrollbar) ---
-        
-        scrollbar = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.pack(fill="both", expand=True)
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.lista.ao_selecionar(self.on_tree_select)
         
         # --- Barra de Status ---
         self.status_label = ttk.Label(self.root, text="Pronto.", relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+        self.executor.status_label = self.status_label
+
+        # Carrega o cache de cargos antes da primeira página (o executor é FIFO).
+        self.executor.executar(cache_cargos.todos, ao_concluir=self.preencher_cargos_busca,
+                               mensagem="Carregando cargos...")
 
         # --- Carregar dados iniciais ---     
-        self.atualizar_treeview()
+        self.lista.recarregar()
 
     # --- Funções de Callback (Ações da GUI) ---
 
     def atualizar_treeview(self):
-
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        funcionarios = listar_funcionarios()
-        if funcionarios:
-            for funcionario in funcionarios:
-
-                data_adm_br = converter_para_br(funcionario['data_admissao']) if funcionario['data_admissao'] else ""
-                data_term_br = converter_para_br(funcionario['data_termino']) if funcionario['data_termino'] else ""
-
-                self.tree.insert('', tk.END, values=(
-                    funcionario['funcionario_id'],
-                    funcionario['cargo_id'],
-                    funcionario['nome'],
-                    funcionario['email'],
-                    funcionario['cpf'],
-                    funcionario['telefone'],
-                    data_adm_br,        
-                    data_term_br,       
-                    funcionario['salario'],
-                    funcionario['ativo']
-                ))
+        """Atualiza a lista aplicando só as linhas que mudaram."""
+        self.lista.atualizar_tudo()
+
+    def buscar_pagina(self, apos_id, tamanho, antes_id=None):
+        """Roda na thread de trabalho: busca a página e resolve os nomes dos cargos."""
+        termo, cargo_id = self.filtro_busca
+        if termo:
+            pagina = buscar_funcionarios(termo, cargo_id, tamanho, apos_id=apos_id, antes_id=antes_id)
+        else:
+            pagina = listar_funcionarios_pagina(tamanho, apos_id=apos_id, antes_id=antes_id, cargo_id=cargo_id)
+        if pagina:
+            pagina['linhas'] = [funcionario._replace(cargo_nome=cache_cargos.nome(funcionario.cargo_id))
+                                for funcionario in pagina['linhas']]
+        return pagina
+
+    def buscar_linha(self, funcionario_id):
+        """Roda na thread de trabalho: relê um funcionário para a atualização incremental."""
+        funcionario = buscar_funcionario(funcionario_id)
+        if funcionario:
+            funcionario = funcionario._replace(cargo_nome=cache_cargos.nome(funcionario.cargo_id))
+        return funcionario
+
+    def preencher_cargos_busca(self, cargos):
+        """Opções do filtro por cargo, a partir do cache de cargos."""
+        self.cargos_busca = {"Todos": None}
+        for cargo in cargos:
+            self.cargos_busca[f"{cargo.cargo_id} - {cargo.cargo_nome}"] = cargo.cargo_id
+        self.combo_cargo.config(values=tuple(self.cargos_busca))
+
+    def agendar_busca(self, event=None):
+        """Reinicia a espera a cada tecla: só a última dispara a consulta."""
+        if self._busca_agendada is not None:
+            self.root.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.root.after(self.ATRASO_BUSCA_MS, self.aplicar_busca)
+
+    def aplicar_busca(self):
+        """Recarrega a lista com o filtro atual (se ele mudou)."""
+        if self._busca_agendada is not None:
+            self.root.after_cancel(self._busca_agendada)
+            self._busca_agendada = None
+
+        filtro = (self.entry_busca.get().strip(), self.cargos_busca.get(self.combo_cargo.get()))
+        if filtro == self.filtro_busca:
+            return
+        self.filtro_busca = filtro
+        # A recarga usa a mesma chave no executor das páginas anteriores, então
+        # uma busca ainda pendente é pulada e o resultado de uma em andamento,
+        # descartado.
+        self.lista.recarregar()
+
+    def formatar_linha(self, funcionario):
+        """Valores exibidos no Treeview para um funcionário (só das linhas visíveis)."""
+        data_adm_br = converter_para_br(funcionario.data_admissao) if funcionario.data_admissao else ""
+        data_term_br = converter_para_br(funcionario.data_termino) if funcionario.data_termino else ""
+
+        return (
+            funcionario.funcionario_id,
+            funcionario.cargo_nome or funcionario.cargo_id,
+            funcionario.nome,
+            funcionario.email,
+            funcionario.cpf,
+            funcionario.telefone,
+            data_adm_br,
+            data_term_br,
+            funcionario.salario,
+            sim_nao(funcionario.ativo)
+        )
 
 
     def limpar_campos(self):
@@ -524,21 +889,23 @@ class JanelaFuncionarios:
         self.entry_termino.delete(0, tk.END)
         self.entry_salario.delete(0, tk.END)
         self.entry_ativo.delete(0, tk.END)
+        self.label_nome_cargo.config(text="")
         
         
     def on_tree_select(self, event):
         """Preenche os campos quando um item da lista é selecionado."""
         try:
-            item_selecionado = self.tree.focus()
-            
-            if not item_selecionado:
+            valores = self.lista.valores_selecionados()
+
+            if not valores:
                 return
-            valores = self.tree.item(item_selecionado, 'values')
             
             self.limpar_campos()
             
             self.entry_id.insert(0, valores[0])
-            self.entry_idCargo.insert(0, valores[1])
+            # A coluna mostra o nome; o formulário continua usando o ID.
+            self.entry_idCargo.insert(0, self.lista.linha_selecionada().cargo_id)
+            self.mostrar_nome_cargo()
             self.entry_nome.insert(0, valores[2])
             self.entry_email.insert(0, valores[3])
             self.entry_cpf.insert(0, valores[4])
@@ -557,8 +924,39 @@ class JanelaFuncionarios:
         except Exception as e:
             self.status_label.config(text=f"Erro ao selecionar: {e}")
     
-    # def buscar_nome_por_id(self, id_cargo):
-    #     return self.nome_cargos.get(id_cargo, None)
+    def buscar_nome_por_id(self, id_cargo):
+        # Só consulta a memória: esta função roda na thread do Tk.
+        return cache_cargos.nome(id_cargo, bloquear=False)
+
+    def mostrar_nome_cargo(self):
+        """Mostra ao lado do campo 'ID Cargo' o nome do cargo correspondente."""
+        try:
+            nome = self.buscar_nome_por_id(int(self.entry_idCargo.get().strip()))
+        except ValueError:
+            nome = None
+        self.label_nome_cargo.config(text=nome or "")
+
+    def concluir_operacao(self, resultado, titulo_erro, id_alterado=None):
+        """
+        Mostra o resultado de uma operação do CRUD (já de volta à thread do Tk).
+        id_alterado: linha atualizada/deletada; None depois de um inserir.
+        """
+        sucesso, mensagem = resultado.ok, resultado.mensagem
+
+        if sucesso:
+            # 'messagebox.showinfo()': Exibe um pop-up de INFORMAÇÃO.
+            messagebox.showinfo("Sucesso", mensagem)
+            # ATUALIZA na tela só a linha que mudou
+            if id_alterado is None:
+                self.lista.carregar_novas()
+            else:
+                self.lista.atualizar_chave(id_alterado)
+            self.limpar_campos()      # Limpa o formulário
+        else:
+            messagebox.showerror(titulo_erro, mensagem)
+
+        # Atualiza a barra de status com o resultado.
+        self.status_label.config(text=mensagem)
 
     def adicionar_funcionario_gui(self):
         """Coleta dados dos campos e chama a função de inserir."""
@@ -589,21 +987,21 @@ class JanelaFuncionarios:
             messagebox.showwarning("Valor incorreto","'Ativo' só aceita os valores S/N ou Sim/Não")
             return
 
-        # Chama a função do CRUD (da Seção 2)
-        sucesso, mensagem = inserir_funcionario(id_cargo, nome, email, cpf, telefone, admissao, termino, salario, ativo)
-        
-        if sucesso:
-            # 'messagebox.showinfo()': Exibe um pop-up de INFORMAÇÃO.
-            messagebox.showinfo("Sucesso", mensagem)
-            self.atualizar_treeview() # ATUALIZA a lista na tela
-            self.limpar_campos()      # Limpa o formulário
-        else:
-            messagebox.showerror("Erro ao Adicionar", mensagem)
-        
-        # Atualiza a barra de status com o resultado.
-        self.status_label.config(text=mensagem)
+        # Chama a função do CRUD (da Seção 2) na thread de trabalho
+        self.executor.executar(
+            inserir_funcionario, id_cargo, nome, email, cpf, telefone, admissao, termino, salario, ativo,
+            ao_concluir=lambda resultado: self.concluir_operacao(resultado, "Erro ao Adicionar"),
+            mensagem="Salvando funcionário..."
+        )
         
         
+    def versao_do_formulario(self, id_registro):
+        """Versão da linha selecionada na lista, se o formulário ainda se refere a ela."""
+        linha = self.lista.linha_selecionada()
+        if linha and linha.funcionario_id == id_registro:
+            return linha.versao
+        return None
+
     def atualizar_funcionario_gui(self):
         try:
             funcionario_id = int(self.entry_id.get().strip())
@@ -691,7 +1089,8 @@ class JanelaFuncionarios:
             return
 
         # ---- Chama a função de atualização real ----
-        sucesso, mensagem = atualizar_funcionario(
+        self.executor.executar(
+            atualizar_funcionario,
             funcionario_id,
             novo_idCargo,
             novo_nome,
@@ -701,17 +1100,14 @@ class JanelaFuncionarios:
             novo_admissao,
             novo_termino,
             novo_salario,
-            novo_ativo
+            novo_ativo,
+            # Recusa a gravação se outro usuário alterou o funcionário depois que ele foi lido.
+            self.versao_do_formulario(funcionario_id),
+            # ---- Retorno para o usuário ----
+            ao_concluir=lambda resultado: self.concluir_operacao(resultado, "Erro", funcionario_id),
+            mensagem="Atualizando funcionário..."
         )
 
-        # ---- Retorno para o usuário ----
-        if sucesso:
-            messagebox.showinfo("Sucesso", mensagem)
-            self.atualizar_treeview()
-            self.limpar_campos()
-        else:
-            messagebox.showerror("Erro", mensagem)
-
 
     def deletar_funcionario_gui(self):
         """Coleta o ID do campo e pede confirmação para deletar."""
@@ -727,55 +1123,90 @@ class JanelaFuncionarios:
         except ValueError:
             messagebox.showerror("ID Inválido", "O ID deve ser um número.")
             return
-        # nome_cargo = self.buscar_nome_por_id(id)
-
         # 'messagebox.askyesno()': Exibe um pop-up de SIM/NÃO.
         # Retorna True se o usuário clicar em "Sim" e False se clicar em "Não".
         if messagebox.askyesno("Confirmar Exclusão", f"Tem CERTEZA que deseja deletar o Funcionário: {id}?"):
             
             # Só executa se o usuário confirmou
-            sucesso, mensagem = deletar_funcionario(id)
-            
-            if sucesso:
-                messagebox.showinfo("Sucesso", mensagem)
-                self.atualizar_treeview()
-                self.limpar_campos()
-            else:
-                messagebox.showerror("Erro ao Deletar", mensagem)
-            
-            self.status_label.config(text=mensagem)
+            self.executor.executar(
+                deletar_funcionario, id,
+                ao_concluir=lambda resultado: self.concluir_operacao(resultado, "Erro ao Deletar", id),
+                mensagem="Deletando funcionário..."
+            )
         else:
             # Se o usuário clicou em "Não"
             self.status_label.config(text="Operação de exclusão cancelada.")
+    def importar_funcionarios_gui(self):
+        """Escolhe um arquivo CSV/JSONL e importa os funcionários em lote."""
+        caminho = filedialog.askopenfilename(
+            parent=self.root,
+            title="Importar funcionários",
+            filetypes=[("CSV ou JSONL", "*.csv *.jsonl"), ("Todos os arquivos", "*.*")]
+        )
+        if not caminho:
+            return
+
+        self.executor.executar(
+            importar_funcionarios, caminho,
+            ao_concluir=self.concluir_importacao,
+            mensagem="Importando funcionários..."
+        )
+
+    def concluir_importacao(self, relatorio):
+        """Mostra o resumo da importação e recarrega a lista."""
+        rejeitados = relatorio["rejeitados"]
+
+        mensagem = (f"{relatorio['inseridos']} de {relatorio['lidos']} funcionários importados, "
+                    f"{len(rejeitados)} rejeitados.")
+        if rejeitados:
+            detalhes = "\n".join(f"Linha {numero}: {motivo}" for numero, motivo in rejeitados[:15])
+            if len(rejeitados) > 15:
+                detalhes += f"\n... e mais {len(rejeitados) - 15}."
+            messagebox.showwarning("Importação concluída com rejeições", f"{mensagem}\n\n{detalhes}")
+        else:
+            messagebox.showinfo("Importação concluída", mensagem)
+
+        self.atualizar_treeview()
+        self.status_label.config(text=mensagem)
+
     def janela_relatorio_funcionarios(self):
-        dados = relatorio_funcionarios_por_cargo()
+        self.executor.executar(
+            relatorio_funcionarios_por_cargo,
+            ao_concluir=self.mostrar_relatorio_funcionarios,
+            chave="relatorio",
+            mensagem="Gerando relatório..."
+        )
 
-        if not dados:
+    def mostrar_relatorio_funcionarios(self, dados):
+        if dados is None:
             messagebox.showerror("Erro", "Não foi possível gerar o relatório.")
             return
 
         janela = tk.Toplevel(self.root)
         janela.title("Relatório: Funcionários por Cargo")
-        janela.geometry("450x400")
+        janela.geometry("650x400")
 
         frame = ttk.LabelFrame(janela, text="Funcionários por Cargo")
         frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        colunas = ("Cargo", "Quantidade")
+        colunas = ("Cargo", "Quantidade", "Ativos", "Folha", "Salário Médio")
 
         tree = ttk.Treeview(frame, columns=colunas, show="headings")
-        tree.heading("Cargo", text="Cargo")
-        tree.heading("Quantidade", text="Quantidade")
-
-        tree.column("Cargo", width=250)
-        tree.column("Quantidade", width=120, anchor="center")
+        for col in colunas:
+            tree.heading(col, text=col)
+            if col == "Cargo":
+                tree.column(col, width=200)
+            else:
+                tree.column(col, width=100, anchor="center")
 
         tree.pack(fill="both", expand=True)
 
         for linha in dados:
-            tree.insert("", tk.END, values=(linha["cargo"], linha["quantidade"]))
-
-
-
-
- 
\ No newline at end of file
+            media = linha["media_salarios"]
+            tree.insert("", tk.END, values=(
+                linha["cargo"],
+                linha["quantidade"],
+                linha["quantidade_ativos"],
+                linha["soma_salarios"],
+                "" if media is None else media,
+            ))
@@ -0,0 +1,133 @@
+"""
+Exportação em streaming das tabelas de funcionários e cargos para CSV ou JSONL.
+
+As linhas vêm do banco em blocos de fetchmany por um cursor não-bufferizado e
+são escritas no arquivo à medida que chegam, então o consumo de memória não
+depende do tamanho da tabela.
+"""
+import csv
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config.config_bd import conectar_bd, Error
+from config.instrumentacao import operacao
+from index.crud_funcionarios import converter_para_br
+
+QUERY_EXPORTAR_FUNCIONARIOS = """
+    SELECT funcionario_id, cargo_id, nome, email, cpf, telefone, data_admissao, data_termino, salario,
+           CASE WHEN ativo = 1 THEN 'Sim' ELSE 'Não' END AS ativo
+    FROM funcionario
+    ORDER BY funcionario_id
+"""
+
+QUERY_EXPORTAR_CARGOS = """
+    SELECT cargo_id, cargo_nome,
+           CASE WHEN pode_gerenciar_estoque = 1 THEN 'Sim' ELSE 'Não' END AS pode_gerenciar_estoque,
+           CASE WHEN pode_fazer_vendas = 1 THEN 'Sim' ELSE 'Não' END AS pode_fazer_vendas
+    FROM cargo
+    ORDER BY cargo_id
+"""
+
+
+def iterar_consulta(query, params=(), tamanho_bloco=1000):
+    """
+    Gera as linhas (tuplas) da consulta em blocos de 'tamanho_bloco'.
+    A primeira coisa gerada é a tupla com os nomes das colunas.
+    """
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    cursor = conexao.cursor(buffered=False)
+    try:
+        cursor.execute(query, params)
+        yield tuple(cursor.column_names)
+
+        while True:
+            bloco = cursor.fetchmany(tamanho_bloco)
+            if not bloco:
+                break
+            yield from bloco
+    finally:
+        try:
+            cursor.close()
+        except Error:
+            # Um cursor não-bufferizado interrompido deixa linhas pendentes
+            # na conexão; é mais barato descartá-la do que ler o resto.
+            conexao.descartar()
+        else:
+            conexao.close()
+
+
+def _formatar_funcionario(linha):
+    linha = list(linha)
+    linha[6] = converter_para_br(linha[6]) if linha[6] else ""
+    linha[7] = converter_para_br(linha[7]) if linha[7] else ""
+    linha[8] = "" if linha[8] is None else str(linha[8])
+    return linha
+
+
+def _pico_rss_kb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes.
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def exportar(query, caminho, formato="csv", formatar=None, tamanho_bloco=1000):
+    """
+    Escreve o resultado da consulta em 'caminho' ('csv' ou 'jsonl') e devolve
+    as estatísticas: linhas, segundos, linhas_por_segundo e pico_rss_kb
+    (pico de memória do processo, quando o sistema informa).
+    """
+    if formato not in ("csv", "jsonl"):
+        raise ValueError("Formato deve ser 'csv' ou 'jsonl'.")
+
+    inicio = time.perf_counter()
+    linhas = iterar_consulta(query, tamanho_bloco=tamanho_bloco)
+    colunas = next(linhas)
+    total = 0
+
+    try:
+        with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+            if formato == "csv":
+                escritor = csv.writer(arquivo, delimiter=";")
+                escritor.writerow(colunas)
+                for linha in linhas:
+                    escritor.writerow(formatar(linha) if formatar else linha)
+                    total += 1
+            else:
+                for linha in linhas:
+                    registro = dict(zip(colunas, formatar(linha) if formatar else linha))
+                    arquivo.write(json.dumps(registro, ensure_ascii=False, default=str))
+                    arquivo.write("\n")
+                    total += 1
+    finally:
+        linhas.close()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "linhas": total,
+        "segundos": round(segundos, 3),
+        "linhas_por_segundo": round(total / segundos, 1) if segundos else None,
+        "pico_rss_kb": _pico_rss_kb(),
+    }
+
+
+@operacao
+def exportar_funcionarios(caminho, formato="csv", tamanho_bloco=1000):
+    """Exporta a tabela funcionario; as datas saem em DD/MM/AAAA, como na importação."""
+    return exportar(QUERY_EXPORTAR_FUNCIONARIOS, caminho, formato, _formatar_funcionario, tamanho_bloco)
+
+
+@operacao
+def exportar_cargos(caminho, formato="csv", tamanho_bloco=1000):
+    """Exporta a tabela cargo."""
+    return exportar(QUERY_EXPORTAR_CARGOS, caminho, formato, None, tamanho_bloco)
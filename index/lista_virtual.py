@@ -0,0 +1,455 @@
+"""
+Lista virtualizada para as janelas de CRUD.
+
+O ttk.Treeview cria um item Tk para cada linha inserida, o que fica lento e
+pesado com dezenas de milhares de registros. A ListaVirtual mantém apenas os
+itens que cabem na tela e troca o conteúdo deles conforme a rolagem; as linhas
+vêm do banco página a página (paginação por chave) só quando são necessárias.
+Em memória fica só um trecho de até 'limite_linhas' linhas em torno da tela:
+as páginas que se afastam dela são descartadas e, se a rolagem voltar até
+lá, buscadas de novo (para trás, com 'antes_id').
+
+Depois de um inserir/atualizar/deletar, a lista aplica só a linha alterada;
+numa recarga completa, compara o resultado novo com o antigo. Em ambos os
+casos só os itens Tk cujo conteúdo mudou são reescritos, e a rolagem e a
+seleção continuam na mesma linha.
+"""
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Treeview com rolagem virtual.
+
+    buscar_pagina(apos_id, tamanho, antes_id=None) deve devolver o dict de
+    index.paginacao.paginar (ou None em caso de erro); formatar(linha)
+    transforma uma linha do banco nos valores das colunas e só é chamada
+    para as linhas que aparecem na tela.
+    buscar_linha(chave), opcional, devolve uma única linha (ou None se ela não
+    existe mais) e permite as atualizações incrementais de atualizar_chave().
+    As linhas são registros (index.registros): 'chave' é o nome do atributo
+    que as ordena, ex.: 'funcionario_id'.
+
+    Com um 'executor' (index.tarefas_bd.ExecutorBD), as consultas rodam na
+    thread de trabalho e a lista é redesenhada quando os resultados chegam.
+    """
+
+    ALTURA_LINHA_PADRAO = 20
+    ALTURA_CABECALHO_PADRAO = 25
+
+    def __init__(self, master, colunas, buscar_pagina, formatar, chave,
+                 tamanho_pagina=200, folga=50, executor=None, buscar_linha=None, limite_linhas=2000):
+        super().__init__(master)
+        self.executor = executor
+        self.buscar_pagina = buscar_pagina
+        self.buscar_linha = buscar_linha
+        self.formatar = formatar
+        self.chave = chave
+        self.tamanho_pagina = tamanho_pagina
+        # Linhas carregadas além do fim da tela antes de pedir a próxima página.
+        self.folga = folga
+        # Linhas em memória a partir das quais as páginas longe da tela são descartadas.
+        self.limite_linhas = limite_linhas
+
+        self.tree = ttk.Treeview(self, columns=colunas, show='headings', selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill="both", expand=True)
+
+        self._linhas = []           # trecho de linhas em memória, na ordem da chave
+        self._chaves = []           # chave de cada linha (ordenada, para bisect)
+        self._tem_mais = True
+        self._descartadas = 0       # linhas antes do trecho, já descartadas (0: o trecho começa no início)
+        self._inicio = 0            # índice da primeira linha visível
+        self._inicio_desejado = 0   # para onde rolar quando a página pedida chegar
+        self._buscando = False
+        self._visiveis = 1
+        self._itens = []            # itens Tk reaproveitados entre as rolagens
+        self._exibidos = {}         # item Tk -> valores que ele mostra agora
+        self._altura_linha = self.ALTURA_LINHA_PADRAO
+        self._altura_cabecalho = self.ALTURA_CABECALHO_PADRAO
+
+        self._chave_selecionada = None
+        self._selecionada = None    # a linha selecionada, mesmo que já tenha sido descartada
+        self._ao_selecionar = None
+
+        self.tree.bind('<Configure>', self._on_redimensionar)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_roda)
+        self.tree.bind('<Button-4>', lambda e: self.rolar(-3))
+        self.tree.bind('<Button-5>', lambda e: self.rolar(3))
+        self.tree.bind('<Up>', lambda e: self._mover_selecao(-1))
+        self.tree.bind('<Down>', lambda e: self._mover_selecao(1))
+        self.tree.bind('<Prior>', lambda e: self._mover_selecao(-self._visiveis))
+        self.tree.bind('<Next>', lambda e: self._mover_selecao(self._visiveis))
+
+    # --- API usada pelas janelas ---
+
+    def ao_selecionar(self, callback):
+        """Registra callback(event) chamado quando o usuário escolhe outra linha."""
+        self._ao_selecionar = callback
+
+    def recarregar(self):
+        """Descarta as linhas em memória e volta para a primeira página."""
+        self._definir_linhas([], True)
+        self._descartadas = 0
+        self._inicio = 0
+        self._inicio_desejado = 0
+        self._chave_selecionada = None
+        self._selecionada = None
+        # Um pedido anterior ainda em andamento é descartado pelo executor,
+        # pois o novo usa a mesma chave.
+        self._buscando = False
+        self._garantir_carregadas(self._visiveis + self.folga)
+        self._renderizar()
+
+    def atualizar_tudo(self):
+        """
+        Busca de novo as linhas em torno da tela (da 'folga' acima dela até a
+        'folga' abaixo) e aplica só as diferenças, mantendo a mesma linha no
+        topo da tela e a mesma seleção. As demais saem da memória e voltam
+        do banco se a rolagem chegar até elas.
+        """
+        # Sem a chave da linha anterior ao trecho, a primeira linha dele serve de âncora.
+        primeira = max(0, self._inicio - self.folga, 1 if self._descartadas else 0)
+        apos_id = self._chaves[primeira - 1] if primeira and primeira <= len(self._chaves) else None
+        quantidade = max(0, self._inicio - primeira) + self._visiveis + self.folga
+        self._buscando = False
+        self._executar(self._buscar_ate, quantidade, apos_id,
+                       ao_concluir=lambda resultado: self._aplicar_recarga(resultado, apos_id),
+                       chave=(self, "pagina"), mensagem="Atualizando lista...")
+
+    def atualizar_chave(self, chave):
+        """Relê uma única linha (após inserir/atualizar/deletar) e a aplica na lista."""
+        if self.buscar_linha is None:
+            self.atualizar_tudo()
+            return
+        self._executar(self.buscar_linha, chave,
+                       ao_concluir=lambda linha: self._aplicar_linha(chave, linha),
+                       mensagem="Atualizando lista...")
+
+    def carregar_novas(self):
+        """
+        Traz as linhas criadas depois da última carregada (ex.: após um inserir).
+        Se a lista ainda não chegou ao fim, elas aparecem ao rolar até lá.
+        """
+        if self._tem_mais or self._buscando:
+            return
+        self._tem_mais = True
+        self._garantir_carregadas(len(self._linhas) + 1)
+
+    def linha_selecionada(self):
+        """A linha (como veio do banco) selecionada, ou None."""
+        indice = self._indice(self._chave_selecionada)
+        return self._selecionada if indice is None else self._linhas[indice]
+
+    def valores_selecionados(self):
+        """Os valores formatados da linha selecionada, ou None."""
+        linha = self.linha_selecionada()
+        return None if linha is None else tuple(self.formatar(linha))
+
+    def rolar(self, quantidade):
+        self._rolar_para(self._inicio + quantidade)
+        return "break"
+
+    # --- Carregamento sob demanda ---
+
+    def _executar(self, funcao, *args, ao_concluir, chave=None, mensagem=None):
+        if self.executor is None:
+            ao_concluir(funcao(*args))
+        else:
+            self.executor.executar(funcao, *args, ao_concluir=ao_concluir,
+                                   chave=chave, mensagem=mensagem)
+
+    def _garantir_carregadas(self, quantidade):
+        if self.executor is None:
+            while len(self._linhas) < quantidade and self._tem_mais:
+                descartadas = self._descartadas
+                self._anexar_pagina(self.buscar_pagina(self._ultima_chave(), self.tamanho_pagina))
+                self._descartar_distantes()
+                # As linhas descartadas do começo deslocam os índices.
+                quantidade -= self._descartadas - descartadas
+            return
+
+        if len(self._linhas) < quantidade and self._tem_mais and not self._buscando:
+            self._buscando = True
+            self.executor.executar(
+                self.buscar_pagina, self._ultima_chave(), self.tamanho_pagina,
+                ao_concluir=self._pagina_recebida,
+                chave=(self, "pagina"),
+                mensagem="Carregando..."
+            )
+
+    def _garantir_anteriores(self):
+        """Busca para trás as páginas descartadas quando a rolagem volta até elas."""
+        if self.executor is None:
+            while self._inicio_desejado < self.folga and self._descartadas and self._chaves:
+                if not self._prefixar_pagina(self.buscar_pagina(None, self.tamanho_pagina, self._chaves[0])):
+                    break
+                self._descartar_distantes()
+            return
+
+        if self._inicio_desejado < self.folga and self._descartadas and self._chaves and not self._buscando:
+            self._buscando = True
+            self.executor.executar(
+                self.buscar_pagina, None, self.tamanho_pagina, self._chaves[0],
+                ao_concluir=self._pagina_anterior_recebida,
+                chave=(self, "pagina"),
+                mensagem="Carregando..."
+            )
+
+    def _buscar_ate(self, quantidade, apos_id=None):
+        """Roda na thread de trabalho: junta páginas (depois de apos_id) até ter 'quantidade' linhas."""
+        linhas, tem_mais = [], True
+        while len(linhas) < quantidade and tem_mais:
+            pagina = self.buscar_pagina(apos_id, self.tamanho_pagina)
+            if not pagina:
+                return None
+            linhas.extend(pagina['linhas'])
+            apos_id, tem_mais = pagina['ultimo'], pagina['tem_proxima']
+        return linhas, tem_mais
+
+    def _ultima_chave(self):
+        return self._chaves[-1] if self._chaves else None
+
+    def _definir_linhas(self, linhas, tem_mais):
+        self._linhas = linhas
+        self._chaves = [getattr(linha, self.chave) for linha in linhas]
+        self._tem_mais = tem_mais
+
+    def _anexar_pagina(self, pagina):
+        if not pagina:
+            self._tem_mais = False
+            return
+        self._linhas.extend(pagina['linhas'])
+        self._chaves.extend(getattr(linha, self.chave) for linha in pagina['linhas'])
+        self._tem_mais = pagina['tem_proxima']
+
+    def _prefixar_pagina(self, pagina):
+        """Põe uma página buscada para trás antes do trecho. False se não veio nada."""
+        if not pagina:
+            # Como em _anexar_pagina: com erro, para de buscar nessa direção.
+            self._descartadas = 0
+            return False
+        linhas = pagina['linhas']
+        self._linhas[:0] = linhas
+        self._chaves[:0] = [getattr(linha, self.chave) for linha in linhas]
+        self._inicio += len(linhas)
+        self._inicio_desejado += len(linhas)
+        # A contagem é uma estimativa (linhas podem ter sido inseridas ou
+        # apagadas); quem manda é o banco dizer se ainda há anteriores.
+        self._descartadas = max(1, self._descartadas - len(linhas)) if pagina['tem_anterior'] else 0
+        return bool(linhas)
+
+    def _descartar_distantes(self):
+        """
+        Acima de 'limite_linhas', tira da memória as linhas a mais de uma
+        página de distância do destino da rolagem, primeiro as de cima. Não
+        mexe no trecho enquanto uma página está a caminho.
+        """
+        excesso = len(self._linhas) - self.limite_linhas
+        if excesso <= 0 or self._buscando:
+            return
+
+        de_cima = min(excesso, max(0, self._inicio_desejado - self.tamanho_pagina))
+        if de_cima:
+            del self._linhas[:de_cima]
+            del self._chaves[:de_cima]
+            self._inicio -= de_cima
+            self._inicio_desejado -= de_cima
+            self._descartadas += de_cima
+            excesso -= de_cima
+
+        ate = max(0, self._inicio_desejado) + self._visiveis + self.folga + self.tamanho_pagina
+        de_baixo = min(excesso, max(0, len(self._linhas) - ate))
+        if de_baixo:
+            del self._linhas[-de_baixo:]
+            del self._chaves[-de_baixo:]
+            self._tem_mais = True
+        # A tela vai para o destino da rolagem; até lá, fica dentro do trecho.
+        self._inicio = max(0, min(self._inicio, len(self._linhas) - self._visiveis))
+
+    def _pagina_recebida(self, pagina):
+        self._buscando = False
+        self._anexar_pagina(pagina)
+        self._descartar_distantes()
+        self._rolar_para(self._inicio_desejado)
+
+    def _pagina_anterior_recebida(self, pagina):
+        self._buscando = False
+        self._prefixar_pagina(pagina)
+        self._descartar_distantes()
+        self._rolar_para(self._inicio_desejado)
+
+    def _indice(self, chave):
+        if chave is None:
+            return None
+        indice = bisect.bisect_left(self._chaves, chave)
+        if indice < len(self._chaves) and self._chaves[indice] == chave:
+            return indice
+        return None
+
+    # --- Atualizações incrementais ---
+
+    def _aplicar_recarga(self, resultado, apos_id=None):
+        if resultado is None:
+            return
+        topo = self._chaves[self._inicio] if self._inicio < len(self._chaves) else None
+        # O trecho relido começa depois de apos_id; as linhas até ela saem da memória.
+        descartadas = 0 if apos_id is None else self._descartadas + bisect.bisect_right(self._chaves, apos_id)
+
+        self._definir_linhas(*resultado)
+        self._descartadas = descartadas
+
+        # A linha que estava no topo continua no topo (ou a seguinte, se sumiu).
+        if topo is not None:
+            self._inicio = bisect.bisect_left(self._chaves, topo)
+        self._rolar_para(self._inicio)
+
+    def _aplicar_linha(self, chave, linha):
+        if chave == self._chave_selecionada:
+            self._selecionada = linha
+        if self._descartadas and (not self._chaves or chave < self._chaves[0]):
+            # Antes do trecho em memória: chega com a página quando a rolagem voltar.
+            return
+        indice = bisect.bisect_left(self._chaves, chave)
+        existe = indice < len(self._chaves) and self._chaves[indice] == chave
+
+        if linha is None:
+            if not existe:
+                return
+            del self._linhas[indice]
+            del self._chaves[indice]
+            if indice < self._inicio:
+                self._inicio -= 1
+        elif existe:
+            self._linhas[indice] = linha
+        elif indice < len(self._chaves) or not self._tem_mais:
+            # Só insere se a posição cair dentro do trecho já carregado;
+            # caso contrário ela chega normalmente com a próxima página.
+            self._linhas.insert(indice, linha)
+            self._chaves.insert(indice, chave)
+            if indice < self._inicio:
+                self._inicio += 1
+        else:
+            return
+
+        self._rolar_para(self._inicio)
+
+    # --- Desenho ---
+
+    def _renderizar(self):
+        fim = min(self._inicio + self._visiveis, len(self._linhas))
+        necessarios = fim - self._inicio
+
+        while len(self._itens) < necessarios:
+            self._itens.append(self.tree.insert('', tk.END, values=()))
+        while len(self._itens) > necessarios:
+            item = self._itens.pop()
+            self._exibidos.pop(item, None)
+            self.tree.delete(item)
+
+        # Só os itens cujo conteúdo mudou passam pelo Tk.
+        for item, linha in zip(self._itens, self._linhas[self._inicio:fim]):
+            valores = tuple(self.formatar(linha))
+            if self._exibidos.get(item) != valores:
+                self.tree.item(item, values=valores)
+                self._exibidos[item] = valores
+
+        # A seleção acompanha a linha, não o item Tk.
+        indice = self._indice(self._chave_selecionada)
+        if indice is not None and self._inicio <= indice < fim:
+            item = self._itens[indice - self._inicio]
+            if self.tree.selection() != (item,):
+                self.tree.selection_set(item)
+            self.tree.focus(item)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        total = self._total_estimado()
+        if total:
+            self.scrollbar.set((self._descartadas + self._inicio) / total, (self._descartadas + fim) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+        self._medir_linhas()
+
+    def _total_estimado(self):
+        # Sem COUNT(*): enquanto houver mais páginas, a barra reserva espaço
+        # para mais uma, e cresce conforme elas chegam.
+        return self._descartadas + len(self._linhas) + (self.tamanho_pagina if self._tem_mais else 0)
+
+    def _rolar_para(self, inicio):
+        # 'inicio' é um índice do trecho em memória; descartar ou buscar
+        # páginas para trás desloca o trecho e ajusta _inicio_desejado.
+        self._inicio_desejado = inicio
+        self._descartar_distantes()
+        self._garantir_anteriores()
+        self._garantir_carregadas(self._inicio_desejado + self._visiveis + self.folga)
+        self._inicio = max(0, min(self._inicio_desejado, len(self._linhas) - self._visiveis))
+        self._renderizar()
+
+    def _medir_linhas(self):
+        if self._itens:
+            caixa = self.tree.bbox(self._itens[0])
+            if caixa:
+                self._altura_cabecalho, self._altura_linha = caixa[1], caixa[3]
+
+    # --- Eventos ---
+
+    def _on_redimensionar(self, event):
+        visiveis = max(1, (event.height - self._altura_cabecalho) // self._altura_linha)
+        if visiveis != self._visiveis:
+            self._visiveis = visiveis
+            self._rolar_para(self._inicio)
+
+    def _on_scrollbar(self, acao, quantidade, unidade=None):
+        if acao == "moveto":
+            self._rolar_para(int(float(quantidade) * self._total_estimado()) - self._descartadas)
+        elif unidade == "pages":
+            self.rolar(int(quantidade) * self._visiveis)
+        else:
+            self.rolar(int(quantidade))
+
+    def _on_roda(self, event):
+        return self.rolar(-3 if event.delta > 0 else 3)
+
+    def _on_select(self, event):
+        selecao = self.tree.selection()
+        if not selecao or selecao[0] not in self._itens:
+            return
+        indice = self._inicio + self._itens.index(selecao[0])
+        chave = self._chaves[indice]
+        # Reposicionar a seleção ao rolar também gera este evento; só avisa
+        # a janela quando a linha escolhida realmente mudou.
+        if chave == self._chave_selecionada:
+            return
+        self._chave_selecionada = chave
+        self._selecionada = self._linhas[indice]
+        if self._ao_selecionar:
+            self._ao_selecionar(event)
+
+    def _mover_selecao(self, passo):
+        if not self._linhas:
+            return "break"
+        atual = self._indice(self._chave_selecionada)
+        novo = 0 if atual is None else atual + passo
+        descartadas = self._descartadas
+        self._garantir_carregadas(novo + 1)
+        novo -= self._descartadas - descartadas
+        novo = max(0, min(novo, len(self._linhas) - 1))
+
+        if novo < self._inicio:
+            self._inicio = novo
+        elif novo >= self._inicio + self._visiveis:
+            self._inicio = novo - self._visiveis + 1
+
+        mudou = self._chaves[novo] != self._chave_selecionada
+        self._chave_selecionada = self._chaves[novo]
+        self._selecionada = self._linhas[novo]
+        self._rolar_para(self._inicio)
+        if mudou and self._ao_selecionar:
+            self._ao_selecionar(None)
+        return "break"
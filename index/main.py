@@ -1,60 +1,191 @@
-from config.config_bd import conectar_bd
-from mysql.connector import Error
-from datetime import datetime
-from index.crud_cargos import JanelaCargos
-from index.crud_funcionarios import JanelaFuncionarios
+import importlib
+import logging
+import sys
+import time
 
+INICIO = time.perf_counter()
+
+# Só o Tkinter é importado na partida. O driver do banco (via config.config_bd)
+# e os módulos das janelas de CRUD são carregados sob demanda.
 import tkinter as tk
-from tkinter import ttk  
+from tkinter import ttk
 from tkinter import messagebox
 
+from index.tarefas_bd import ExecutorBD
+
+# Tempos das fases da inicialização, em nível INFO: sem handler configurado
+# não aparecem. "python -m index.main --tempos" os mostra no terminal; a
+# janela "Estatísticas do Banco" sempre os mostra.
+log_inicializacao = logging.getLogger("gestorpro.inicializacao")
+
+
+def sondar_conexao():
+    """
+    Roda na thread de trabalho: carrega a configuração do banco e abre a
+    primeira conexão do pool. Retorna (ok, mensagem, tempos em segundos).
+    """
+    inicio = time.perf_counter()
+    from config.config_bd import obter_pool, Error
+    tempos = {"importar driver/config": time.perf_counter() - inicio}
+
+    inicio = time.perf_counter()
+    try:
+        conexao = obter_pool().emprestar()
+    except Error as e:
+        tempos["sonda de conexão"] = time.perf_counter() - inicio
+        return False, f"Sem conexão com o banco de dados: {e}", tempos
+
+    # A conexão fica aberta no pool e será reaproveitada pela primeira janela.
+    conexao.close()
+    tempos["sonda de conexão"] = time.perf_counter() - inicio
+
+    # Um banco criado por uma versão anterior ganha as colunas e tabelas novas.
+    inicio = time.perf_counter()
+    from index.migracao import migrar
+    try:
+        aplicadas = migrar()
+    except Error as e:
+        tempos["migração"] = time.perf_counter() - inicio
+        return False, f"Não foi possível atualizar o banco de dados: {e}", tempos
+    tempos["migração"] = time.perf_counter() - inicio
+    if aplicadas:
+        return True, f"Conectado ao banco de dados (atualizado: {', '.join(aplicadas)}).", tempos
+    return True, "Conectado ao banco de dados.", tempos
+
+
 class Main:
-    
-    def __init__(self, root):
-        
+
+    def __init__(self, root, tempos=None):
+
         # --- Configuração da Janela Principal ---
-        self.root = root 
+        self.root = root
         self.root.title("Gestorpro")
-        self.root.geometry("1000x600") 
-        
+        self.root.geometry("1000x600")
+
+        # Tempo de cada fase da inicialização, em segundos.
+        self.tempos = dict(tempos or {})
+        inicio = time.perf_counter()
+
         nav_header = tk.Frame(root, padx=20, pady=20)
         nav_header.pack()
-        
+
         tk.Button(nav_header, text="Gerenciar Cargos", width=25, command=self.abrir_cargos).pack(pady=10)
         tk.Button(nav_header, text="Gerenciar Funcionários",  width=25, command=self.abrir_funcionarios).pack(pady=10)
+        tk.Button(nav_header, text="Estatísticas do Banco", width=25, command=self.abrir_estatisticas).pack(pady=10)
+
+        # --- Barra de Status ---
+        self.status_label = ttk.Label(self.root, text="Conectando ao banco de dados...", relief=tk.SUNKEN, anchor=tk.W)
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.tempos["montar janela principal"] = time.perf_counter() - inicio
+
+        # O teste de conexão não segura mais a janela: roda em segundo plano
+        # e o resultado aparece na barra de status.
+        self.executor = ExecutorBD(self.root)
+        self.executor.executar(sondar_conexao, ao_concluir=self.concluir_sonda, ao_falhar=self.falha_sonda,
+                               mensagem=None)
+
+        self._id_map = self.root.bind("<Map>", self.janela_exibida, add="+")
+
+    def janela_exibida(self, event):
+        # O bind na janela principal também recebe o <Map> de cada widget filho.
+        if event.widget is not self.root:
+            return
+        self.root.unbind("<Map>", self._id_map)
+        self.tempos["até a janela aparecer"] = time.perf_counter() - INICIO
+        self.relatar_tempos()
+
+    def concluir_sonda(self, resultado):
+        ok, mensagem, tempos = resultado
+        self.tempos.update(tempos)
+        self.tempos["até a conexão responder"] = time.perf_counter() - INICIO
+        self.status_label.config(text=mensagem, foreground="" if ok else "red")
+        self.relatar_tempos()
+        if not ok:
+            messagebox.showerror("Erro de Conexão", mensagem, parent=self.root)
+
+    def falha_sonda(self, erro):
+        self.concluir_sonda((False, f"Sem conexão com o banco de dados: {erro}", {}))
+
+    def relatar_tempos(self):
+        """Registra (log_inicializacao) as fases já concluídas da inicialização."""
+        if log_inicializacao.isEnabledFor(logging.INFO):
+            log_inicializacao.info("Inicialização: " + ", ".join(f"{fase} {segundos * 1000:.0f} ms"
+                                                                for fase, segundos in self.tempos.items()))
+
+    def _importar_janela(self, modulo, classe):
+        """Importa a janela no primeiro clique (os seguintes reaproveitam o módulo)."""
+        inicio = time.perf_counter()
+        janela = getattr(importlib.import_module(modulo), classe)
+        fase = f"importar {classe}"
+        if fase not in self.tempos:
+            self.tempos[fase] = time.perf_counter() - inicio
+            self.relatar_tempos()
+        return janela
 
     def abrir_cargos(self):
-        JanelaCargos(self.root)
-        
+        self._importar_janela("index.crud_cargos", "JanelaCargos")(self.root)
+
     def abrir_funcionarios(self):
-        JanelaFuncionarios(self.root)
+        self._importar_janela("index.crud_funcionarios", "JanelaFuncionarios")(self.root)
+
+    def abrir_estatisticas(self):
+        """Latências por operação (conexão, execute, fetch) e uso do pool."""
+        from config.config_bd import estatisticas_pool
+        from config.instrumentacao import instrumentacao
+
+        janela = tk.Toplevel(self.root)
+        janela.title("Estatísticas do Banco")
+        janela.geometry("900x450")
+
+        texto = tk.Text(janela, font=("Courier", 9), wrap="none")
+        texto.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def mostrar():
+            pool = estatisticas_pool()
+            texto.delete("1.0", tk.END)
+            texto.insert(tk.END, instrumentacao.relatorio())
+            texto.insert(tk.END, "\n\nPool: " + ", ".join(f"{k}={v}" for k, v in pool.items()))
+            texto.insert(tk.END, "\n\nInicialização: " + ", ".join(
+                f"{fase} {segundos * 1000:.0f} ms" for fase, segundos in self.tempos.items()))
+
+        def zerar():
+            instrumentacao.limpar()
+            mostrar()
+
+        botoes = tk.Frame(janela)
+        botoes.pack(pady=5)
+        tk.Button(botoes, text="Atualizar", width=12, command=mostrar).pack(side=tk.LEFT, padx=5)
+        tk.Button(botoes, text="Zerar", width=12, command=zerar).pack(side=tk.LEFT, padx=5)
+        mostrar()
 
 
 
 # --- 4. Ponto de Entrada do Script ---
 if __name__ == "__main__":
-    # Testa a conexão com o BD antes de abrir a janela
-    conexao_teste = conectar_bd()
-    if conexao_teste:
-        # Fecha a conexão de teste
-        conexao_teste.close()
-        
-        # --- Inicialização do Tkinter ---
-        
-        # 1. Cria a janela principal da aplicação. É a "raiz" (root) de tudo.
-        root = tk.Tk()
-        
-        # 2. Cria uma instância da nossa classe AplicacaoCRUD.
-        #    Isso chama o método __init__ e passa a janela 'root' para ele.
-        #    Nesse momento, todos os widgets (botões, campos, etc.) são criados.
-        app = Main(root)
-        
-        # 3. Inicia o "loop principal" (event loop) do Tkinter.
-        #    O programa fica aqui, "escutando" por eventos (cliques,
-        #    teclas, etc.) até que a janela seja fechada pelo usuário.
-        root.mainloop()
-    else:
-        # Se a conexão inicial falhou, o programa nem abre a GUI
-        # (a função conectar_bd() já mostrou o pop-up de erro).
-        print("Erro fatal: Não foi possível conectar ao banco de dados.")
- 
\ No newline at end of file
+    tempos = {"importar módulos": time.perf_counter() - INICIO}
+
+    if "--tempos" in sys.argv[1:]:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log_inicializacao.addHandler(handler)
+        log_inicializacao.setLevel(logging.INFO)
+        log_inicializacao.propagate = False
+
+    # --- Inicialização do Tkinter ---
+
+    # 1. Cria a janela principal da aplicação. É a "raiz" (root) de tudo.
+    inicio = time.perf_counter()
+    root = tk.Tk()
+    tempos["criar Tk"] = time.perf_counter() - inicio
+
+    # 2. Cria uma instância da nossa classe Main.
+    #    Isso chama o método __init__ e passa a janela 'root' para ele.
+    #    Nesse momento, todos os widgets (botões, campos, etc.) são criados
+    #    e o teste de conexão com o BD começa em segundo plano.
+    app = Main(root, tempos)
+
+    # 3. Inicia o "loop principal" (event loop) do Tkinter.
+    #    O programa fica aqui, "escutando" por eventos (cliques,
+    #    teclas, etc.) até que a janela seja fechada pelo usuário.
+    root.mainloop()
@@ -0,0 +1,304 @@
+"""
+Migração do esquema de bancos criados antes das últimas mudanças.
+
+BD/gestorpro_bd.sql só cria o que ainda não existe (CREATE TABLE IF NOT
+EXISTS), e o backend SQLite só o executa num banco novo: um banco que já
+existia não ganha as colunas, índices e tabelas acrescentados depois.
+migrar() confere cada mudança e aplica apenas as que faltam, então pode
+rodar a cada inicialização (a janela principal e a linha de comando rodam)
+ou à mão:
+
+    python -m index.migracao
+"""
+import argparse
+import re
+
+from config.config_bd import conectar_bd, backend_atual, Error
+from config.sqlite_bd import (
+    CAMINHO_SCHEMA, INDICES_BUSCA_PREFIXO, indice_busca_prefixo, traduzir_schema, gatilho_atualizacao,
+)
+from index.resumo_cargos import refazer_resumo
+from index.saldo_estoque import refazer_saldos
+from index.texto import normalizar_busca
+
+# Linhas por bloco nos preenchimentos de colunas novas.
+LOTE = 1000
+
+# Default fixo das colunas de data acrescentadas no SQLite (ver _adicionar_atualizado_em).
+SEM_DATA = "1970-01-01 00:00:00"
+
+
+# -----------------------------
+# CONSULTAS AO ESQUEMA
+# -----------------------------
+
+def _colunas(cursor, tabela):
+    cursor.execute(f"SELECT * FROM {tabela} LIMIT 0")
+    cursor.fetchall()
+    return set(cursor.column_names)
+
+
+def _indice_existe(cursor, tabela, indice):
+    if backend_atual() == "sqlite":
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+                       (tabela, indice))
+    else:
+        cursor.execute("SELECT 1 FROM information_schema.STATISTICS "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+                       (tabela, indice))
+    return bool(cursor.fetchall())
+
+
+def _tabela_existe(cursor, tabela):
+    if backend_atual() == "sqlite":
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", (tabela,))
+    else:
+        cursor.execute("SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                       (tabela,))
+    return bool(cursor.fetchall())
+
+
+def _criar_tabela(cursor, tabela):
+    """
+    Cria 'tabela' como está em BD/gestorpro_bd.sql (traduzida no SQLite),
+    com seus índices, se ela não existir. True se criou.
+    """
+    if _tabela_existe(cursor, tabela):
+        return False
+
+    with open(CAMINHO_SCHEMA, encoding="utf-8") as arquivo:
+        sql = re.sub(r"(--|#)[^\n]*", "", arquivo.read())
+    for comando in sql.split(";"):
+        if re.match(rf"\s*CREATE\s+TABLE\s+IF\s+NOT\s+EXISTS\s+{tabela}\s*\(", comando, re.I):
+            break
+    else:
+        raise Error(f"A tabela {tabela} não está em {CAMINHO_SCHEMA}.")
+
+    for traduzido in traduzir_schema(comando) if backend_atual() == "sqlite" else [comando]:
+        cursor.execute(traduzido)
+    return True
+
+
+def _adicionar_coluna(cursor, tabela, coluna, definicao):
+    """ALTER TABLE ... ADD COLUMN se a coluna não existir. True se criou."""
+    if coluna in _colunas(cursor, tabela):
+        return False
+    cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+    return True
+
+
+def _criar_indice(cursor, tabela, indice, colunas, unico=False):
+    """CREATE [UNIQUE] INDEX se o índice não existir. True se criou."""
+    if _indice_existe(cursor, tabela, indice):
+        return False
+    cursor.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX {indice} ON {tabela} ({colunas})")
+    return True
+
+
+def _remover_indice(cursor, tabela, indice):
+    """DROP INDEX se o índice existir. True se removeu."""
+    if not _indice_existe(cursor, tabela, indice):
+        return False
+    if backend_atual() == "sqlite":
+        cursor.execute(f"DROP INDEX {indice}")
+    else:
+        cursor.execute(f"DROP INDEX {indice} ON {tabela}")
+    return True
+
+
+# -----------------------------
+# MIGRAÇÕES
+# -----------------------------
+# Cada uma recebe (conexao, cursor), aplica o que faltar e devolve True se
+# mudou alguma coisa.
+
+def _versao(conexao, cursor):
+    """Coluna 'versao' do controle de concorrência otimista (index.atualizacao)."""
+    mudou = False
+    for tabela in ("cargo", "funcionario"):
+        mudou |= _adicionar_coluna(cursor, tabela, "versao", "INT NOT NULL DEFAULT 0")
+    return mudou
+
+
+def _preencher_nome_busca(conexao, cursor):
+    """nome_busca das linhas gravadas antes da coluna existir, em blocos."""
+    total, ultimo_id = 0, 0
+    while True:
+        cursor.execute(
+            "SELECT funcionario_id, nome FROM funcionario "
+            "WHERE nome_busca = '' AND funcionario_id > %s ORDER BY funcionario_id LIMIT %s",
+            (ultimo_id, LOTE))
+        linhas = cursor.fetchall()
+        if not linhas:
+            return total
+        cursor.executemany("UPDATE funcionario SET nome_busca = %s WHERE funcionario_id = %s",
+                           [(normalizar_busca(nome), funcionario_id) for funcionario_id, nome in linhas])
+        conexao.commit()
+        total += len(linhas)
+        ultimo_id = linhas[-1][0]
+
+
+def _nome_busca(conexao, cursor):
+    """Coluna e índices da busca de funcionários por prefixo (condicoes_busca)."""
+    mudou = _adicionar_coluna(cursor, "funcionario", "nome_busca", "VARCHAR(100) NOT NULL DEFAULT ''")
+    mudou |= _criar_indice(cursor, "funcionario", "idx_funcionario_nome_busca", "nome_busca")
+    if backend_atual() == "sqlite":
+        for coluna in INDICES_BUSCA_PREFIXO["funcionario"]:
+            mudou |= _criar_indice(cursor, "funcionario", *indice_busca_prefixo("funcionario", coluna))
+    return _preencher_nome_busca(conexao, cursor) > 0 or mudou
+
+
+def _resumo_cargo(conexao, cursor):
+    """
+    Tabela resumo_cargo (index.resumo_cargos). Se algum cargo estiver sem
+    linha nela (tabela recém-criada ou vazia), refaz o resumo inteiro.
+    """
+    criou = _criar_tabela(cursor, "resumo_cargo")
+    cursor.execute("SELECT COUNT(*) FROM cargo c LEFT JOIN resumo_cargo r ON r.cargo_id = c.cargo_id "
+                   "WHERE r.cargo_id IS NULL")
+    (faltando,), = cursor.fetchall()
+    if faltando:
+        refazer_resumo(conexao)
+    return criou or faltando > 0
+
+
+def _adicionar_atualizado_em(cursor, tabela):
+    """
+    Coluna atualizado_em (DEFAULT/ON UPDATE CURRENT_TIMESTAMP). O SQLite não
+    aceita ADD COLUMN com default não constante: lá a coluna entra com um
+    default fixo e dois gatilhos fazem o papel do CURRENT_TIMESTAMP.
+    """
+    if backend_atual() != "sqlite":
+        return _adicionar_coluna(cursor, tabela, "atualizado_em",
+                                 "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+
+    if not _adicionar_coluna(cursor, tabela, "atualizado_em", f"DATETIME NOT NULL DEFAULT '{SEM_DATA}'"):
+        return False
+    cursor.execute(f"UPDATE {tabela} SET atualizado_em = CURRENT_TIMESTAMP")
+    cursor.execute(gatilho_atualizacao(tabela, "atualizado_em"))
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS tg_{tabela}_atualizado_em_insercao AFTER INSERT ON {tabela} "
+        f"FOR EACH ROW WHEN NEW.atualizado_em = '{SEM_DATA}' BEGIN "
+        f"UPDATE {tabela} SET atualizado_em = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+    )
+    return True
+
+
+def _atualizado_em(conexao, cursor):
+    """Colunas e índices das leituras incrementais do catálogo (index.catalogo)."""
+    mudou = False
+    for tabela, indice in (("produto", "idx_produto_atualizado"), ("especificacao", "idx_espec_atualizado")):
+        mudou |= _adicionar_atualizado_em(cursor, tabela)
+        mudou |= _criar_indice(cursor, tabela, indice, "atualizado_em")
+    return mudou
+
+
+def _historico_venda(conexao, cursor):
+    """
+    Chave única de historico_venda.venda_id, que impede o arquivamento
+    (index.arquivamento) de copiar a mesma venda duas vezes, e o índice dos
+    itens pela venda arquivada.
+    """
+    if not _indice_existe(cursor, "historico_venda", "uk_historico_venda_venda"):
+        cursor.execute("SELECT venda_id FROM historico_venda GROUP BY venda_id HAVING COUNT(*) > 1 LIMIT 1")
+        repetida = cursor.fetchall()
+        if repetida:
+            raise Error(f"A venda {repetida[0][0]} está mais de uma vez em historico_venda; "
+                        "apague as cópias antes de migrar.")
+    mudou = _criar_indice(cursor, "historico_venda", "uk_historico_venda_venda", "venda_id", unico=True)
+    mudou |= _criar_indice(cursor, "historico_venda_item", "idx_hist_item_hist_venda", "historico_venda_id")
+    return mudou
+
+
+def _indices_venda(conexao, cursor):
+    """
+    Índices da venda (index.vendas): lotes na ordem FIFO por produto, saldo
+    por estoque e produto, e itens pela venda. Os índices antigos de uma
+    coluna (estoque_id, produto_id) ficam cobertos pelos novos, que começam
+    por elas, e só são removidos depois de criados os novos (as chaves
+    estrangeiras do MySQL precisam de um índice na coluna).
+    """
+    mudou = _criar_indice(cursor, "lote", "idx_lote_produto_fifo", "produto_id, data_aquisicao, lote_id")
+    mudou |= _criar_indice(cursor, "lote", "idx_lote_estoque_produto", "estoque_id, produto_id")
+    mudou |= _criar_indice(cursor, "venda_item", "idx_venda_item_venda", "venda_id")
+    mudou |= _remover_indice(cursor, "lote", "idx_lote_produto")
+    mudou |= _remover_indice(cursor, "lote", "idx_lote_estoque")
+    return mudou
+
+
+def _indices_funcionario(conexao, cursor):
+    """Índices da listagem paginada de funcionários filtrada por ativo e por cargo (index.paginacao)."""
+    mudou = _criar_indice(cursor, "funcionario", "idx_funcionario_ativo", "ativo")
+    mudou |= _criar_indice(cursor, "funcionario", "idx_funcionario_cargo_ativo", "cargo_id, ativo")
+    return mudou
+
+
+def _saldo_estoque(conexao, cursor):
+    """
+    Tabelas da foto de saldos (index.saldo_estoque). Sem a linha da marca
+    (tabelas recém-criadas) e com lotes cadastrados, monta a foto a partir
+    deles; num banco vazio não há o que montar.
+    """
+    criou = _criar_tabela(cursor, "saldo_estoque")
+    criou |= _criar_tabela(cursor, "saldo_estoque_marca")
+    cursor.execute("SELECT COUNT(*) FROM saldo_estoque_marca")
+    (marcas,), = cursor.fetchall()
+    cursor.execute("SELECT 1 FROM lote LIMIT 1")
+    refazer = not marcas and bool(cursor.fetchall())
+    if refazer:
+        refazer_saldos(conexao)
+    return criou or refazer
+
+
+MIGRACOES = (
+    ("versao", _versao),
+    ("nome_busca", _nome_busca),
+    ("resumo_cargo", _resumo_cargo),
+    ("saldo_estoque", _saldo_estoque),
+    ("atualizado_em", _atualizado_em),
+    ("historico_venda", _historico_venda),
+    ("indices_venda", _indices_venda),
+    ("indices_funcionario", _indices_funcionario),
+)
+
+
+def migrar():
+    """
+    Aplica as migrações que faltam, na ordem, com um commit por migração.
+    Devolve os nomes das que mudaram o banco (vazia se já estava em dia).
+    Levanta Error em falhas; as migrações já concluídas ficam gravadas.
+    """
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    aplicadas = []
+    try:
+        cursor = conexao.cursor()
+        for nome, migracao in MIGRACOES:
+            try:
+                if migracao(conexao, cursor):
+                    aplicadas.append(nome)
+                conexao.commit()
+            except Error as e:
+                conexao.rollback()
+                raise Error(f"Migração '{nome}' falhou: {e}") from e
+        cursor.close()
+    finally:
+        conexao.close()
+    return aplicadas
+
+
+def main():
+    argparse.ArgumentParser(description="Atualiza o esquema de um banco existente.").parse_args()
+    try:
+        aplicadas = migrar()
+    except Error as e:
+        print(e)
+        return 1
+    print("Migrações aplicadas: " + ", ".join(aplicadas) if aplicadas else "Banco já está atualizado.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Paginação por chave (keyset) para as listagens.
+
+Em vez de OFFSET, cada página parte da última (ou primeira) chave da página
+anterior: "WHERE id > %s ORDER BY id LIMIT n". O banco desce direto pelo
+índice da chave, então a página 10.000 custa o mesmo que a primeira.
+
+Com 'registro' (ex.: Funcionario.da_linha), cada tupla do cursor vira
+registro(tupla); sem ele, as linhas vêm como dicts.
+"""
+from operator import attrgetter, itemgetter
+
+from config.config_bd import conectar_bd, Error
+
+TAMANHO_PAGINA_PADRAO = 50
+
+
+def _consultar(nome, query, params, registro=None):
+    """Executa a consulta preparada 'nome' e devolve as linhas (registros ou dicts)."""
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        cursor = conexao.preparada(nome, query).executar(params)
+        if registro is not None:
+            return list(map(registro, cursor.fetchall()))
+        colunas = cursor.column_names
+        return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+    finally:
+        conexao.close()
+
+
+def buscar_por_chave(nome, select, chave, valor, registro=None):
+    """
+    A linha de 'select' com chave = valor, ou None se não existir.
+    'nome' identifica o statement preparado, ex.: "funcionario.buscar".
+    Levanta Error em falhas.
+    """
+    linhas = _consultar(nome, f"{select} WHERE {chave} = %s", (valor,), registro)
+    return linhas[0] if linhas else None
+
+
+def paginar(select, chave, filtros=None, tamanho=TAMANHO_PAGINA_PADRAO, apos=None, antes=None,
+            condicoes=None, registro=None):
+    """
+    Busca uma página de 'select' (ex.: "SELECT ... FROM funcionario") ordenada por 'chave'.
+
+    apos:    devolve as linhas com chave > apos (próxima página).
+    antes:   devolve as linhas com chave < antes (página anterior).
+    filtros: dict coluna -> valor; valores None são ignorados.
+    condicoes: lista de (trecho_sql, params) para filtros além da igualdade,
+               ex.: ("nome_busca LIKE %s", ("jo%",)).
+    registro: monta cada linha a partir da tupla do cursor (padrão: dict).
+
+    Retorna um dict com 'linhas', 'primeiro' e 'ultimo' (as chaves a usar
+    como cursor) e 'tem_anterior'/'tem_proxima'. Levanta Error em falhas.
+    """
+    if apos is not None and antes is not None:
+        raise ValueError("Informe apenas 'apos' ou 'antes'.")
+
+    condicoes_sql, params = [], []
+    for coluna, valor in (filtros or {}).items():
+        if valor is not None:
+            condicoes_sql.append(f"{coluna} = %s")
+            params.append(valor)
+    for trecho, valores in condicoes or ():
+        condicoes_sql.append(f"({trecho})")
+        params.extend(valores)
+
+    para_tras = antes is not None
+    if para_tras:
+        condicoes_sql.append(f"{chave} < %s")
+        params.append(antes)
+    elif apos is not None:
+        condicoes_sql.append(f"{chave} > %s")
+        params.append(apos)
+
+    query = select
+    if condicoes_sql:
+        query += " WHERE " + " AND ".join(condicoes_sql)
+    # Uma linha a mais só para saber se existe outra página nessa direção.
+    query += f" ORDER BY {chave} {'DESC' if para_tras else 'ASC'} LIMIT %s"
+    params.append(tamanho + 1)
+
+    # O texto da consulta só depende dos filtros usados, não dos valores:
+    # cada variação vira um statement preparado na conexão.
+    linhas = _consultar(f"paginar:{query}", query, tuple(params), registro)
+
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+
+    if para_tras:
+        linhas.reverse()
+        tem_anterior, tem_proxima = tem_mais, True
+    else:
+        tem_anterior, tem_proxima = apos is not None, tem_mais
+
+    valor_chave = itemgetter(chave) if registro is None else attrgetter(chave)
+    return {
+        'linhas': linhas,
+        'primeiro': valor_chave(linhas[0]) if linhas else None,
+        'ultimo': valor_chave(linhas[-1]) if linhas else None,
+        'tem_anterior': tem_anterior,
+        'tem_proxima': tem_proxima,
+    }
@@ -0,0 +1,58 @@
+"""
+Registros de cargo e funcionário como vêm do banco.
+
+Cada linha é uma tupla nomeada (sem __dict__ por instância): os nomes dos
+campos ficam uma única vez na classe, e não repetidos como chaves em cada
+linha como num dict. Os registros são montados direto das tuplas do cursor,
+na ordem das colunas de SELECT_CARGOS e SELECT_FUNCIONARIOS; as permissões
+e 'ativo' chegam como bool, e as telas e a linha de comando os mostram como
+'Sim'/'Não' com sim_nao().
+"""
+from collections import namedtuple
+
+
+def sim_nao(valor):
+    """True -> 'Sim', False -> 'Não'."""
+    return "Sim" if valor else "Não"
+
+
+class Cargo(namedtuple("Cargo", "cargo_id cargo_nome pode_gerenciar_estoque pode_fazer_vendas versao")):
+    """
+    cargo_id: int; cargo_nome: str; pode_gerenciar_estoque, pode_fazer_vendas: bool;
+    versao: int (a que se passa como versao_esperada em atualizar_cargo).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def da_linha(cls, linha):
+        """Tupla do cursor, nas colunas de SELECT_CARGOS -> Cargo."""
+        cargo_id, cargo_nome, estoque, vendas, versao = linha
+        return cls(cargo_id, cargo_nome, bool(estoque), bool(vendas), versao)
+
+
+class Funcionario(namedtuple(
+        "Funcionario",
+        "funcionario_id cargo_id nome email cpf telefone data_admissao data_termino salario ativo versao "
+        "cargo_nome",
+        defaults=(None,))):
+    """
+    funcionario_id, cargo_id: int; nome, email, cpf, telefone: str;
+    data_admissao: date; data_termino: date ou None; salario: Decimal;
+    ativo: bool; versao: int. cargo_nome não vem do banco: a janela de
+    funcionários o preenche a partir do cache de cargos (com _replace).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def da_linha(cls, linha):
+        """Tupla do cursor, nas colunas de SELECT_FUNCIONARIOS -> Funcionario."""
+        (funcionario_id, cargo_id, nome, email, cpf, telefone,
+         data_admissao, data_termino, salario, ativo, versao) = linha
+        return cls(funcionario_id, cargo_id, nome, email, cpf, telefone,
+                   data_admissao, data_termino, salario, bool(ativo), versao)
+
+    def como_dict(self):
+        """Os campos do banco num dict (sem cargo_nome), para JSON/exportação."""
+        dados = self._asdict()
+        del dados["cargo_nome"]
+        return dados
@@ -0,0 +1,32 @@
+"""
+Resposta das funções de CRUD que gravam (inserir, atualizar, deletar...).
+
+Resposta(ok, mensagem, codigo, id): 'mensagem' é o texto para a tela; quem
+precisa decidir o que fazer (linha de comando, fachada assíncrona) usa o
+'codigo' e, nos inserir, o 'id' criado, sem interpretar o texto. Os
+códigos das atualizações (ATUALIZADO, INEXISTENTE, CONFLITO) são os de
+index.atualizacao, importados aqui para ficar tudo num lugar só.
+"""
+from collections import namedtuple
+
+from config.config_bd import ERRO_CHAVE_DUPLICADA, ERRO_LINHA_REFERENCIADA, ERRO_SEM_LINHA_PAI
+from index.atualizacao import ATUALIZADO, INEXISTENTE, CONFLITO
+
+CRIADO = "criado"
+DELETADO = "deletado"
+INVALIDO = "invalido"      # recusado antes de ir ao banco, ou referência a um cargo inexistente
+ERRO_BD = "erro_bd"        # falha de conexão ou do banco
+
+Resposta = namedtuple("Resposta", "ok mensagem codigo id", defaults=(None,))
+
+_CODIGOS_POR_ERRNO = {
+    ERRO_CHAVE_DUPLICADA: CONFLITO,       # CPF, e-mail ou nome de cargo já cadastrado
+    ERRO_LINHA_REFERENCIADA: CONFLITO,    # cargo que ainda tem funcionários
+    ERRO_SEM_LINHA_PAI: INVALIDO,
+}
+
+
+def codigo_do_erro(e):
+    """Código da Resposta para um Error do banco."""
+    return _CODIGOS_POR_ERRNO.get(getattr(e, "errno", None), ERRO_BD)
+
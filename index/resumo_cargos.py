@@ -0,0 +1,245 @@
+"""
+Resumo de funcionários por cargo mantido de forma incremental.
+
+A tabela resumo_cargo guarda, para cada cargo, quantos funcionários ele tem,
+quantos estão ativos e a soma dos salários. Ela é ajustada na mesma transação
+de cada inserir/atualizar/deletar de funcionário, então o relatório lê uma
+linha por cargo em vez de agregar a tabela funcionario inteira.
+
+Para conferir (e, se preciso, refazer) o resumo a partir dos dados reais:
+
+    python -m index.resumo_cargos            # só verifica
+    python -m index.resumo_cargos --corrigir # verifica e reconstrói
+"""
+import argparse
+from decimal import Decimal, ROUND_HALF_UP
+
+from config.config_bd import conectar_bd, Error
+from config.instrumentacao import operacao
+
+CENTAVOS = Decimal("0.01")
+
+CAMPOS_RESUMO = ("quantidade", "quantidade_ativos", "soma_salarios", "quantidade_com_salario")
+
+# Agregação completa: a referência para a verificação e a reconstrução.
+QUERY_AGREGAR = """
+    SELECT c.cargo_id,
+           COUNT(f.funcionario_id) AS quantidade,
+           COALESCE(SUM(f.ativo), 0) AS quantidade_ativos,
+           COALESCE(SUM(f.salario), 0) AS soma_salarios,
+           COUNT(f.salario) AS quantidade_com_salario
+    FROM cargo c
+    LEFT JOIN funcionario f ON f.cargo_id = c.cargo_id
+    GROUP BY c.cargo_id
+"""
+
+QUERY_SOMAR = """
+    UPDATE resumo_cargo
+    SET quantidade = quantidade + %s,
+        quantidade_ativos = quantidade_ativos + %s,
+        soma_salarios = soma_salarios + %s,
+        quantidade_com_salario = quantidade_com_salario + %s
+    WHERE cargo_id = %s
+"""
+
+# Soma (sinal 1) ou retira (sinal -1) a contribuição de um funcionário que
+# está no banco, lendo os valores dele no próprio UPDATE.
+QUERY_AJUSTAR_POR_FUNCIONARIO = """
+    UPDATE resumo_cargo
+    SET quantidade = quantidade + %s,
+        quantidade_ativos = quantidade_ativos + %s * (SELECT ativo FROM funcionario WHERE funcionario_id = %s),
+        soma_salarios = soma_salarios + %s * (SELECT COALESCE(salario, 0) FROM funcionario WHERE funcionario_id = %s),
+        quantidade_com_salario = quantidade_com_salario + %s * (SELECT COUNT(salario) FROM funcionario WHERE funcionario_id = %s)
+    WHERE cargo_id = (SELECT cargo_id FROM funcionario WHERE funcionario_id = %s)
+"""
+
+# LEFT JOIN: um cargo sem linha no resumo aparece com quantidade NULL.
+QUERY_RESUMO = """
+    SELECT c.cargo_id, c.cargo_nome AS cargo, r.quantidade, r.quantidade_ativos,
+           r.soma_salarios, r.quantidade_com_salario
+    FROM cargo c
+    LEFT JOIN resumo_cargo r ON r.cargo_id = c.cargo_id
+    ORDER BY r.quantidade DESC, c.cargo_nome
+"""
+
+# O mesmo relatório agregando funcionario: a alternativa (lenta) quando o
+# resumo está incompleto.
+QUERY_RESUMO_AGREGADO = f"""
+    SELECT c.cargo_id, c.cargo_nome AS cargo, a.quantidade, a.quantidade_ativos,
+           a.soma_salarios, a.quantidade_com_salario
+    FROM cargo c
+    JOIN ({QUERY_AGREGAR}) a ON a.cargo_id = c.cargo_id
+    ORDER BY a.quantidade DESC, c.cargo_nome
+"""
+
+
+# -----------------------------
+# AJUSTES (chamados dentro da transação do CRUD, sem commit)
+# -----------------------------
+# Rodam em toda alteração de funcionário: usam statements preparados.
+
+def criar_resumo(conexao, cargo_id):
+    """Cria a linha zerada de um cargo novo."""
+    conexao.preparada("resumo_cargo.criar", "INSERT INTO resumo_cargo (cargo_id) VALUES (%s)").executar((cargo_id,))
+
+
+def somar_funcionarios(conexao, funcionarios):
+    """
+    Soma ao resumo os funcionários recém-inseridos, dados como tuplas
+    (cargo_id, ativo, salario). Um único UPDATE por cargo envolvido.
+    """
+    deltas = {}
+    for cargo_id, ativo, salario in funcionarios:
+        delta = deltas.setdefault(cargo_id, [0, 0, Decimal(0), 0])
+        delta[0] += 1
+        delta[1] += 1 if ativo else 0
+        if salario is not None:
+            delta[2] += Decimal(str(salario))
+            delta[3] += 1
+
+    consulta = conexao.preparada("resumo_cargo.somar", QUERY_SOMAR)
+    for cargo_id, (quantidade, ativos, soma, com_salario) in deltas.items():
+        consulta.executar((quantidade, ativos, soma, com_salario, cargo_id))
+
+
+def ajustar_por_funcionario(conexao, funcionario_id, sinal):
+    """
+    sinal=-1 antes de alterar/deletar o funcionário retira a contribuição
+    atual dele; sinal=1 depois de alterá-lo soma a nova.
+    """
+    conexao.preparada("resumo_cargo.ajustar", QUERY_AJUSTAR_POR_FUNCIONARIO).executar(
+        (sinal,) + (sinal, funcionario_id) * 3 + (funcionario_id,))
+
+
+# -----------------------------
+# LEITURA
+# -----------------------------
+
+def resumo_por_cargo():
+    """
+    Uma linha por cargo (inclusive os sem funcionários) com cargo, quantidade,
+    quantidade_ativos, soma_salarios e media_salarios. Retorna None em caso de erro.
+
+    Se algum cargo não tiver linha em resumo_cargo (banco migrado sem o
+    resumo, cargo criado por fora da aplicação), avisa e agrega a tabela
+    funcionario no lugar do resumo.
+    """
+    conexao = conectar_bd()
+    if not conexao:
+        return None
+
+    try:
+        cursor = conexao.cursor(dictionary=True)
+        cursor.execute(QUERY_RESUMO)
+        linhas = cursor.fetchall()
+        if any(linha["quantidade"] is None for linha in linhas):
+            print("Aviso: resumo por cargo incompleto; agregando a tabela funcionario. "
+                  "Rode 'python -m index.resumo_cargos --corrigir'.")
+            cursor.execute(QUERY_RESUMO_AGREGADO)
+            linhas = cursor.fetchall()
+        cursor.close()
+    except Error as e:
+        print("Erro ao ler o resumo por cargo:", e)
+        return None
+    finally:
+        conexao.close()
+
+    for linha in linhas:
+        soma = Decimal(str(linha["soma_salarios"])).quantize(CENTAVOS)
+        com_salario = linha.pop("quantidade_com_salario")
+        linha["soma_salarios"] = soma
+        linha["media_salarios"] = (soma / com_salario).quantize(CENTAVOS, ROUND_HALF_UP) if com_salario else None
+    return linhas
+
+
+# -----------------------------
+# VERIFICAÇÃO E RECONSTRUÇÃO
+# -----------------------------
+
+def _normalizar(linha):
+    return (int(linha[0]), int(linha[1]), Decimal(str(linha[2])).quantize(CENTAVOS), int(linha[3]))
+
+
+@operacao
+def verificar_resumo():
+    """
+    Compara o resumo com a agregação completa de funcionario. Devolve a lista
+    de divergências (cargo_id, campo, esperado, encontrado); vazia se estiver ok.
+    Levanta Error se não conseguir consultar o banco.
+    """
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(QUERY_AGREGAR)
+        esperado = {linha[0]: _normalizar(linha[1:]) for linha in cursor.fetchall()}
+        cursor.execute(f"SELECT cargo_id, {', '.join(CAMPOS_RESUMO)} FROM resumo_cargo")
+        encontrado = {linha[0]: _normalizar(linha[1:]) for linha in cursor.fetchall()}
+        cursor.close()
+    finally:
+        conexao.close()
+
+    divergencias = []
+    for cargo_id in sorted(esperado.keys() | encontrado.keys()):
+        valores_esperados = esperado.get(cargo_id)
+        valores_encontrados = encontrado.get(cargo_id)
+        if valores_esperados is None or valores_encontrados is None:
+            divergencias.append((cargo_id, "linha", valores_esperados, valores_encontrados))
+            continue
+        for campo, a, b in zip(CAMPOS_RESUMO, valores_esperados, valores_encontrados):
+            if a != b:
+                divergencias.append((cargo_id, campo, a, b))
+    return divergencias
+
+
+def refazer_resumo(conexao):
+    """Recalcula o resumo inteiro a partir de funcionario, sem commit."""
+    cursor = conexao.cursor()
+    cursor.execute("DELETE FROM resumo_cargo")
+    cursor.execute(f"INSERT INTO resumo_cargo (cargo_id, {', '.join(CAMPOS_RESUMO)}) {QUERY_AGREGAR}")
+    cursor.close()
+
+
+@operacao
+def reconstruir_resumo():
+    """Refaz o resumo inteiro a partir de funcionario. Retorna (ok, mensagem)."""
+    conexao = conectar_bd()
+    if not conexao:
+        return False, "Falha ao conectar no banco de dados."
+
+    try:
+        refazer_resumo(conexao)
+        conexao.commit()
+        return True, "Resumo por cargo reconstruído."
+    except Error as e:
+        conexao.rollback()
+        return False, f"Erro ao reconstruir o resumo: {e}"
+    finally:
+        conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere o resumo de funcionários por cargo.")
+    parser.add_argument("--corrigir", action="store_true", help="reconstrói o resumo se houver divergências")
+    args = parser.parse_args()
+
+    divergencias = verificar_resumo()
+    if not divergencias:
+        print("Resumo por cargo consistente.")
+        return 0
+
+    for cargo_id, campo, esperado, encontrado in divergencias:
+        print(f"Cargo {cargo_id}: {campo} esperado {esperado}, encontrado {encontrado}")
+
+    if not args.corrigir:
+        return 1
+
+    ok, mensagem = reconstruir_resumo()
+    print(mensagem)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,551 @@
+"""
+Saldo de estoque por (estoque_id, produto_id): foto periódica + movimentações.
+
+Somar lote.quantidade_atual ou refazer movimentacao_estoque a cada consulta
+custa caro. Em vez disso:
+
+- saldo_estoque guarda uma foto do saldo de cada produto em cada estoque,
+  válida até a movimentação saldo_estoque_marca.ate_movimentacao_id (a marca);
+- consolidar_saldos() avança a foto somando só as movimentações posteriores à
+  marca (rodar periodicamente, por exemplo a cada poucos minutos);
+- SaldosEstoque carrega a foto em memória e aplica as movimentações novas a
+  cada atualizar(), respondendo "quanto há em mãos" com uma consulta a
+  dicionário;
+- receber_lote() grava o lote com a movimentação de 'entrada' e recusa o
+  recebimento que passaria da capacidade_maxima do estoque.
+
+Toda mudança de estoque tem de gerar a sua movimentação (entrada, saida,
+perda, devolucao ou ajuste, este com quantidade positiva ou negativa), como
+fazem registrar_venda e receber_lote.
+
+Os IDs de movimentação são gerados na inserção, mas as transações terminam
+fora de ordem: uma movimentação de ID menor pode aparecer depois de outra de
+ID maior. Por isso a marca só avança até movimentações com mais de
+MARGEM_SEGUNDOS, e a cópia em memória volta a procurar, por esse tempo, os
+IDs que faltaram na sequência (no máximo PENDENTES_MAX; uma movimentação que
+apareça depois de descartada só entra na cópia no próximo carregar()).
+
+    python -m index.saldo_estoque               # consolida a foto
+    python -m index.saldo_estoque --verificar   # compara com os lotes
+    python -m index.saldo_estoque --corrigir    # verifica e reconstrói
+"""
+import argparse
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from config.config_bd import conectar_bd, Error
+from config.instrumentacao import operacao
+
+# Nenhuma transação de estoque dura tanto (o innodb_lock_wait_timeout padrão
+# é 50 s): movimentações mais velhas que isso já estão todas confirmadas.
+MARGEM_SEGUNDOS = 300
+
+# Movimentações lidas por consulta ao atualizar a cópia em memória.
+LOTE_LEITURA = 5000
+
+# IDs ausentes que a cópia em memória procura ao mesmo tempo. Um salto grande
+# no auto-incremento (reinício do servidor, inserção em massa desfeita) não
+# vira milhões de pendentes: ficam só os mais recentes, que são os que podem
+# ser transações ainda abertas.
+PENDENTES_MAX = 1000
+
+QUANTIDADE_COM_SINAL = """
+    CASE m.tipo WHEN 'saida' THEN -m.quantidade WHEN 'perda' THEN -m.quantidade ELSE m.quantidade END
+"""
+
+QUERY_DELTAS = f"""
+    SELECT l.estoque_id, l.produto_id, SUM({QUANTIDADE_COM_SINAL})
+    FROM movimentacao_estoque m
+    JOIN lote l ON l.lote_id = m.lote_id
+    WHERE m.movimentacao_id > %s AND m.movimentacao_id <= %s
+    GROUP BY l.estoque_id, l.produto_id
+"""
+
+QUERY_MOVIMENTACOES = f"""
+    SELECT m.movimentacao_id, m.data_movimentacao, l.estoque_id, l.produto_id, {QUANTIDADE_COM_SINAL}
+    FROM movimentacao_estoque m
+    JOIN lote l ON l.lote_id = m.lote_id
+    WHERE m.movimentacao_id > %s
+    ORDER BY m.movimentacao_id
+    LIMIT %s
+"""
+
+QUERY_MOVIMENTACOES_PENDENTES = f"""
+    SELECT m.movimentacao_id, l.estoque_id, l.produto_id, {QUANTIDADE_COM_SINAL}
+    FROM movimentacao_estoque m
+    JOIN lote l ON l.lote_id = m.lote_id
+    WHERE m.movimentacao_id IN ({{}})
+"""
+
+QUERY_OCUPACAO_DELTA = f"""
+    SELECT COALESCE(SUM({QUANTIDADE_COM_SINAL}), 0)
+    FROM movimentacao_estoque m
+    JOIN lote l ON l.lote_id = m.lote_id
+    WHERE m.movimentacao_id > %s AND l.estoque_id = %s
+"""
+
+QUERY_SALDO_DOS_LOTES = """
+    SELECT estoque_id, produto_id, SUM(quantidade_atual)
+    FROM lote
+    GROUP BY estoque_id, produto_id
+"""
+
+QUERY_CRIAR_SALDOS = """
+    INSERT INTO saldo_estoque (estoque_id, produto_id, quantidade)
+    SELECT DISTINCT l.estoque_id, l.produto_id, 0
+    FROM movimentacao_estoque m
+    JOIN lote l ON l.lote_id = m.lote_id
+    WHERE m.movimentacao_id > %s AND m.movimentacao_id <= %s
+      AND NOT EXISTS (SELECT 1 FROM saldo_estoque s
+                      WHERE s.estoque_id = l.estoque_id AND s.produto_id = l.produto_id)
+"""
+
+QUERY_SOMAR_SALDO = """
+    UPDATE saldo_estoque SET quantidade = quantidade + %s
+    WHERE estoque_id = %s AND produto_id = %s
+"""
+
+QUERY_INSERIR_LOTE = """
+    INSERT INTO lote (estoque_id, produto_id, data_aquisicao, quantidade_inicial, quantidade_atual, observacoes)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+QUERY_INSERIR_ENTRADA = """
+    INSERT INTO movimentacao_estoque (lote_id, tipo, quantidade, motivo, data_movimentacao, funcionario_id)
+    VALUES (%s, 'entrada', %s, %s, %s, %s)
+"""
+
+
+class RecebimentoRecusado(Error):
+    """Lote com estoque, produto ou quantidade inválidos; nada foi gravado."""
+
+
+class CapacidadeExcedida(RecebimentoRecusado):
+    """O lote passaria da capacidade_maxima do estoque; nada foi gravado."""
+
+    def __init__(self, estoque_id, capacidade, ocupacao, quantidade):
+        self.estoque_id = estoque_id
+        self.capacidade = capacidade
+        self.ocupacao = ocupacao
+        self.quantidade = quantidade
+        super().__init__(
+            f"O estoque {estoque_id} comporta {capacidade} unidades e já tem {ocupacao}: "
+            f"não cabem mais {quantidade}."
+        )
+
+
+# -----------------------------
+# MARCA
+# -----------------------------
+
+def _travar_marca(cursor):
+    """
+    Trava a linha da marca (consolidações não correm em paralelo) e devolve o
+    ate_movimentacao_id. Cria a linha na primeira vez.
+    """
+    cursor.execute("SELECT ate_movimentacao_id FROM saldo_estoque_marca WHERE marca_id = 1 FOR UPDATE")
+    linha = cursor.fetchone()
+    if linha is None:
+        cursor.execute("INSERT INTO saldo_estoque_marca (marca_id, ate_movimentacao_id) VALUES (1, 0)")
+        return 0
+    return linha[0]
+
+
+def _gravar_marca(cursor, ate_id):
+    cursor.execute(
+        "UPDATE saldo_estoque_marca SET ate_movimentacao_id = %s, consolidado_em = %s WHERE marca_id = 1",
+        (ate_id, datetime.now().replace(microsecond=0)),
+    )
+
+
+def _corte(cursor, apos_id):
+    """Maior ID após 'apos_id' com mais de MARGEM_SEGUNDOS (ou o próprio apos_id)."""
+    limite = datetime.now() - timedelta(seconds=MARGEM_SEGUNDOS)
+    cursor.execute(
+        "SELECT MAX(movimentacao_id) FROM movimentacao_estoque WHERE movimentacao_id > %s AND data_movimentacao < %s",
+        (apos_id, limite),
+    )
+    corte = cursor.fetchone()[0]
+    return apos_id if corte is None else corte
+
+
+# -----------------------------
+# FOTO NO BANCO
+# -----------------------------
+
+@operacao
+def consolidar_saldos():
+    """
+    Soma à foto as movimentações entre a marca e o corte (as que já têm mais
+    de MARGEM_SEGUNDOS) e avança a marca, tudo numa transação. Devolve
+    {"de", "ate", "saldos"}: o intervalo de IDs aplicado e quantos saldos
+    mudaram. Levanta Error em falhas do banco.
+    """
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        cursor = conexao.cursor()
+        de = _travar_marca(cursor)
+        ate = _corte(cursor, de)
+        if ate == de:
+            conexao.rollback()
+            return {"de": de, "ate": ate, "saldos": 0}
+
+        cursor.execute(QUERY_DELTAS, (de, ate))
+        deltas = [(delta, estoque_id, produto_id) for estoque_id, produto_id, delta in cursor.fetchall() if delta]
+
+        cursor.execute(QUERY_CRIAR_SALDOS, (de, ate))
+        if deltas:
+            cursor.executemany(QUERY_SOMAR_SALDO, deltas)
+        _gravar_marca(cursor, ate)
+
+        conexao.commit()
+        cursor.close()
+        return {"de": de, "ate": ate, "saldos": len(deltas)}
+
+    except Error:
+        conexao.rollback()
+        raise
+
+    finally:
+        conexao.close()
+
+
+def refazer_saldos(conexao):
+    """
+    Refaz a foto a partir de lote.quantidade_atual (que inclui os lotes
+    anteriores às movimentações), descontando as movimentações posteriores
+    ao corte, que ficam para as próximas consolidações. Sem commit; devolve
+    o corte (a nova marca).
+    """
+    cursor = conexao.cursor()
+    _travar_marca(cursor)
+    corte = _corte(cursor, 0)
+
+    cursor.execute(QUERY_SALDO_DOS_LOTES)
+    saldos = {(estoque_id, produto_id): int(quantidade) for estoque_id, produto_id, quantidade in cursor.fetchall()}
+    cursor.execute("SELECT COALESCE(MAX(movimentacao_id), 0) FROM movimentacao_estoque")
+    cursor.execute(QUERY_DELTAS, (corte, cursor.fetchone()[0]))
+    for estoque_id, produto_id, delta in cursor.fetchall():
+        chave = (estoque_id, produto_id)
+        saldos[chave] = saldos.get(chave, 0) - int(delta)
+
+    cursor.execute("DELETE FROM saldo_estoque")
+    cursor.executemany(
+        "INSERT INTO saldo_estoque (estoque_id, produto_id, quantidade) VALUES (%s, %s, %s)",
+        [(estoque_id, produto_id, quantidade) for (estoque_id, produto_id), quantidade in saldos.items()],
+    )
+    _gravar_marca(cursor, corte)
+    cursor.close()
+    return corte
+
+
+@operacao
+def reconstruir_saldos():
+    """Refaz a foto inteira (refazer_saldos) numa transação. Retorna (ok, mensagem)."""
+    conexao = conectar_bd()
+    if not conexao:
+        return False, "Falha ao conectar no banco de dados."
+
+    try:
+        corte = refazer_saldos(conexao)
+        conexao.commit()
+        return True, f"Saldos de estoque reconstruídos até a movimentação {corte}."
+    except Error as e:
+        conexao.rollback()
+        return False, f"Erro ao reconstruir os saldos de estoque: {e}"
+    finally:
+        conexao.close()
+
+
+@operacao
+def verificar_saldos():
+    """
+    Compara foto + movimentações posteriores à marca com a soma de
+    lote.quantidade_atual. Devolve as divergências (estoque_id, produto_id,
+    esperado, encontrado); vazia se estiver ok. Levanta Error se não conseguir
+    consultar o banco.
+    """
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        cursor = conexao.cursor()
+        _travar_marca(cursor)
+        cursor.execute(QUERY_SALDO_DOS_LOTES)
+        esperado = {(e, p): int(q) for e, p, q in cursor.fetchall()}
+        saldos = SaldosEstoque()
+        saldos.carregar(conexao)
+        conexao.rollback()
+        cursor.close()
+    finally:
+        conexao.close()
+
+    encontrado = saldos.todos()
+    divergencias = []
+    for estoque_id, produto_id in sorted(esperado.keys() | encontrado.keys()):
+        a = esperado.get((estoque_id, produto_id), 0)
+        b = encontrado.get((estoque_id, produto_id), 0)
+        if a != b:
+            divergencias.append((estoque_id, produto_id, a, b))
+    return divergencias
+
+
+# -----------------------------
+# RECEBIMENTO DE LOTES
+# -----------------------------
+
+def ocupacao_estoque(conexao, estoque_id):
+    """Unidades no estoque agora: a foto mais as movimentações posteriores à marca."""
+    cursor = conexao.cursor()
+    cursor.execute("SELECT ate_movimentacao_id FROM saldo_estoque_marca WHERE marca_id = 1")
+    linha = cursor.fetchone()
+    marca = linha[0] if linha else 0
+    cursor.execute("SELECT COALESCE(SUM(quantidade), 0) FROM saldo_estoque WHERE estoque_id = %s", (estoque_id,))
+    na_foto = int(cursor.fetchone()[0])
+    cursor.execute(QUERY_OCUPACAO_DELTA, (marca, estoque_id))
+    depois = int(cursor.fetchone()[0])
+    cursor.close()
+    return na_foto + depois
+
+
+@operacao
+def receber_lote(estoque_id, produto_id, quantidade, data_aquisicao=None, funcionario_id=None, observacoes=None):
+    """
+    Grava um lote novo e a movimentação de 'entrada' correspondente, numa
+    transação. Se o estoque tiver capacidade_maxima, o lote só entra se couber.
+
+    Devolve o lote_id. Levanta CapacidadeExcedida se não couber,
+    RecebimentoRecusado para estoque ou quantidade inválidos e Error em falhas
+    do banco; nesses casos nada é gravado.
+    """
+    try:
+        quantidade = int(quantidade)
+    except (TypeError, ValueError):
+        raise RecebimentoRecusado(f"Quantidade inválida: {quantidade!r}.") from None
+    if quantidade <= 0:
+        raise RecebimentoRecusado(f"Quantidade inválida: {quantidade}.")
+
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    try:
+        cursor = conexao.cursor()
+
+        # A trava na linha do estoque enfileira os recebimentos do mesmo
+        # estoque: dois lotes não passam juntos pela conferência da capacidade.
+        cursor.execute("SELECT capacidade_maxima FROM estoque WHERE estoque_id = %s FOR UPDATE", (estoque_id,))
+        linha = cursor.fetchone()
+        if linha is None:
+            raise RecebimentoRecusado(f"Estoque inexistente: {estoque_id}.")
+        capacidade = linha[0]
+
+        if capacidade is not None:
+            ocupacao = ocupacao_estoque(conexao, estoque_id)
+            if ocupacao + quantidade > capacidade:
+                raise CapacidadeExcedida(estoque_id, capacidade, ocupacao, quantidade)
+
+        agora = datetime.now().replace(microsecond=0)
+        cursor.execute(QUERY_INSERIR_LOTE, (estoque_id, produto_id, data_aquisicao or date.today(),
+                                            quantidade, quantidade, observacoes))
+        lote_id = cursor.lastrowid
+        cursor.execute(QUERY_INSERIR_ENTRADA, (lote_id, quantidade, f"Recebimento do lote {lote_id}",
+                                               agora, funcionario_id))
+
+        conexao.commit()
+        cursor.close()
+        return lote_id
+
+    except Error:
+        conexao.rollback()
+        raise
+
+    finally:
+        conexao.close()
+
+
+# -----------------------------
+# CÓPIA EM MEMÓRIA
+# -----------------------------
+
+class SaldosEstoque:
+    """
+    Saldos em memória: a foto do banco mais as movimentações lidas depois
+    dela. em_maos() e ocupacao() são consultas a dicionário; atualizar() lê
+    só as movimentações novas (e as que faltaram na sequência de IDs).
+    """
+
+    def __init__(self):
+        self._por_chave = {}        # (estoque_id, produto_id) -> quantidade
+        self._por_produto = {}      # produto_id -> quantidade em todos os estoques
+        self._por_estoque = {}      # estoque_id -> unidades no estoque
+        self._ultimo_id = 0
+        self._pendentes = {}        # movimentacao_id ausente -> prazo (monotonic) para aparecer
+        self.descartados = 0        # IDs ausentes que deixaram de ser procurados por causa de PENDENTES_MAX
+        self._lock = threading.Lock()
+
+    def _aplicar(self, estoque_id, produto_id, delta):
+        chave = (estoque_id, produto_id)
+        self._por_chave[chave] = self._por_chave.get(chave, 0) + delta
+        self._por_produto[produto_id] = self._por_produto.get(produto_id, 0) + delta
+        self._por_estoque[estoque_id] = self._por_estoque.get(estoque_id, 0) + delta
+
+    @operacao(nome="carregar_saldos")
+    def carregar(self, conexao=None):
+        """Lê a foto inteira e a marca (numa transação) e aplica o que veio depois."""
+        propria = conexao is None
+        if propria:
+            conexao = conectar_bd()
+            if not conexao:
+                raise Error("Falha ao conectar no banco de dados.")
+
+        try:
+            cursor = conexao.cursor()
+            marca = _travar_marca(cursor)
+            cursor.execute("SELECT estoque_id, produto_id, quantidade FROM saldo_estoque")
+            linhas = cursor.fetchall()
+            if propria:
+                conexao.rollback()
+            cursor.close()
+        finally:
+            if propria:
+                conexao.close()
+
+        with self._lock:
+            self._por_chave, self._por_produto, self._por_estoque = {}, {}, {}
+            for estoque_id, produto_id, quantidade in linhas:
+                self._aplicar(estoque_id, produto_id, quantidade)
+            self._ultimo_id = marca
+            self._pendentes = {}
+        self.atualizar(None if propria else conexao)
+
+    @operacao(nome="atualizar_saldos")
+    def atualizar(self, conexao=None):
+        """Aplica as movimentações novas. Devolve quantas foram aplicadas."""
+        propria = conexao is None
+        if propria:
+            conexao = conectar_bd()
+            if not conexao:
+                raise Error("Falha ao conectar no banco de dados.")
+
+        aplicadas = 0
+        try:
+            with self._lock:
+                cursor = conexao.cursor()
+                agora = time.monotonic()
+
+                if self._pendentes:
+                    ids = list(self._pendentes)
+                    cursor.execute(QUERY_MOVIMENTACOES_PENDENTES.format(", ".join(["%s"] * len(ids))), ids)
+                    for movimentacao_id, estoque_id, produto_id, delta in cursor.fetchall():
+                        del self._pendentes[movimentacao_id]
+                        self._aplicar(estoque_id, produto_id, delta)
+                        aplicadas += 1
+                    # Não apareceram a tempo: a transação foi desfeita e o ID ficou sem uso.
+                    self._pendentes = {i: prazo for i, prazo in self._pendentes.items() if prazo > agora}
+
+                recente = datetime.now() - timedelta(seconds=MARGEM_SEGUNDOS)
+                while True:
+                    cursor.execute(QUERY_MOVIMENTACOES, (self._ultimo_id, LOTE_LEITURA))
+                    linhas = cursor.fetchall()
+                    for movimentacao_id, data, estoque_id, produto_id, delta in linhas:
+                        # Um buraco antes de uma movimentação recente pode ser
+                        # uma transação ainda aberta; antes de uma antiga, não.
+                        if data >= recente:
+                            inicio = max(self._ultimo_id + 1, movimentacao_id - PENDENTES_MAX)
+                            self.descartados += inicio - (self._ultimo_id + 1)
+                            for ausente in range(inicio, movimentacao_id):
+                                self._pendentes[ausente] = agora + MARGEM_SEGUNDOS
+                        self._ultimo_id = movimentacao_id
+                        self._aplicar(estoque_id, produto_id, delta)
+                    aplicadas += len(linhas)
+                    if len(linhas) < LOTE_LEITURA:
+                        break
+
+                # Os pendentes entram em ordem crescente de ID: sobram os mais recentes.
+                excesso = len(self._pendentes) - PENDENTES_MAX
+                if excesso > 0:
+                    self.descartados += excesso
+                    self._pendentes = dict(list(self._pendentes.items())[excesso:])
+                cursor.close()
+        finally:
+            if propria:
+                conexao.close()
+        return aplicadas
+
+    def acompanhar(self, intervalo=2.0, parar=None):
+        """
+        Roda atualizar() a cada 'intervalo' segundos numa thread daemon até
+        parar.set(). Devolve (thread, parar).
+        """
+        parar = parar or threading.Event()
+
+        def laco():
+            while not parar.wait(intervalo):
+                try:
+                    self.atualizar()
+                except Error as e:
+                    print("Erro ao atualizar os saldos de estoque:", e)
+
+        thread = threading.Thread(target=laco, name="saldos-estoque", daemon=True)
+        thread.start()
+        return thread, parar
+
+    def em_maos(self, produto_id, estoque_id=None):
+        """Quantidade do produto em um estoque ou, sem estoque_id, em todos."""
+        if estoque_id is None:
+            return self._por_produto.get(produto_id, 0)
+        return self._por_chave.get((estoque_id, produto_id), 0)
+
+    def ocupacao(self, estoque_id):
+        """Unidades guardadas no estoque."""
+        return self._por_estoque.get(estoque_id, 0)
+
+    def todos(self):
+        """Cópia de {(estoque_id, produto_id): quantidade}, sem os saldos zerados."""
+        with self._lock:
+            return {chave: quantidade for chave, quantidade in self._por_chave.items() if quantidade}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consolida e confere o saldo de estoque por produto.")
+    parser.add_argument("--verificar", action="store_true", help="compara os saldos com os lotes")
+    parser.add_argument("--corrigir", action="store_true", help="verifica e reconstrói se houver divergências")
+    args = parser.parse_args()
+
+    if not (args.verificar or args.corrigir):
+        try:
+            resultado = consolidar_saldos()
+        except Error as e:
+            print(f"Erro ao consolidar os saldos de estoque: {e}")
+            return 1
+        if resultado["ate"] == resultado["de"]:
+            print(f"Nada a consolidar: a foto já está na movimentação {resultado['ate']}.")
+            return 0
+        print(f"Movimentações {resultado['de'] + 1} a {resultado['ate']} consolidadas "
+              f"({resultado['saldos']} saldo(s) alterado(s)).")
+        return 0
+
+    divergencias = verificar_saldos()
+    if not divergencias:
+        print("Saldos de estoque consistentes.")
+        return 0
+
+    for estoque_id, produto_id, esperado, encontrado in divergencias:
+        print(f"Estoque {estoque_id}, produto {produto_id}: esperado {esperado}, encontrado {encontrado}")
+
+    if not args.corrigir:
+        return 1
+
+    ok, mensagem = reconstruir_saldos()
+    print(mensagem)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
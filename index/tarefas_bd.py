@@ -0,0 +1,157 @@
+"""
+Executa as operações de banco fora da thread do Tkinter.
+
+A janela entrega a função (inserir_cargo, listar_funcionarios_pagina...) ao
+ExecutorBD, que a roda numa thread de trabalho. O resultado volta por uma fila
+lida com root.after, e o callback roda de novo na thread do Tk, onde é seguro
+mexer nos widgets. Enquanto houver tarefas pendentes, a barra de status mostra
+o que está em andamento e o cursor fica de espera; as enviadas com
+mensagem=None rodam em silêncio, sem mexer em nenhum dos dois.
+"""
+import queue
+import threading
+from tkinter import messagebox
+
+
+class ExecutorBD:
+    """
+    Uma thread de trabalho por janela. As tarefas rodam na ordem em que foram
+    enviadas, então um "inserir" seguido de "recarregar" nunca se inverte.
+
+    Tarefas enviadas com a mesma 'chave' se substituem: se uma ainda não começou,
+    é pulada; se já está rodando, o resultado dela é descartado. Assim, vários
+    pedidos de recarga seguidos viram uma única consulta útil.
+    """
+
+    def __init__(self, root, status_label=None, intervalo_ms=50):
+        self.root = root
+        self.status_label = status_label
+        self.intervalo_ms = intervalo_ms
+
+        self._tarefas = queue.Queue()
+        self._resultados = queue.Queue()
+        self._geracoes = {}
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._pendentes_visiveis = 0    # as que têm mensagem (cursor de espera)
+        self._agendado = None
+        self._mensagem_ocupado = None
+        self._cursor_espera = False
+        self._encerrado = False
+
+        self._thread = threading.Thread(target=self._trabalhar, daemon=True)
+        self._thread.start()
+        root.bind("<Destroy>", self._on_destroy, add="+")
+
+    # --- Thread do Tk ---
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, chave=None,
+                 mensagem="Processando..."):
+        """Agenda funcao(*args) na thread de trabalho; ao_concluir(resultado) roda no Tk."""
+        if self._encerrado:
+            return
+
+        geracao = None
+        if chave is not None:
+            with self._lock:
+                geracao = self._geracoes.get(chave, 0) + 1
+                self._geracoes[chave] = geracao
+
+        visivel = mensagem is not None
+        self._pendentes += 1
+        self._tarefas.put((funcao, args, ao_concluir, ao_falhar, chave, geracao, visivel))
+        if visivel:
+            self._pendentes_visiveis += 1
+            self._mostrar_ocupado(mensagem)
+
+        if self._agendado is None:
+            self._agendado = self.root.after(self.intervalo_ms, self._processar_resultados)
+
+    def cancelar(self, chave):
+        """Descarta as tarefas pendentes com essa chave."""
+        with self._lock:
+            self._geracoes[chave] = self._geracoes.get(chave, 0) + 1
+
+    def ocupado(self):
+        return self._pendentes > 0
+
+    def _processar_resultados(self):
+        self._agendado = None
+        if self._encerrado:
+            return
+
+        try:
+            while True:
+                try:
+                    tarefa, resultado, erro = self._resultados.get_nowait()
+                except queue.Empty:
+                    break
+
+                self._pendentes -= 1
+                _, _, ao_concluir, ao_falhar, chave, geracao, visivel = tarefa
+                if visivel:
+                    self._pendentes_visiveis -= 1
+                if self._obsoleta(chave, geracao):
+                    continue
+
+                if erro is not None:
+                    (ao_falhar or self._falha_padrao)(erro)
+                elif ao_concluir is not None:
+                    ao_concluir(resultado)
+        finally:
+            if self._encerrado:
+                return
+            if self._pendentes:
+                self._agendado = self.root.after(self.intervalo_ms, self._processar_resultados)
+            if not self._pendentes_visiveis and self._cursor_espera:
+                self._mostrar_livre()
+
+    def _mostrar_ocupado(self, mensagem):
+        if mensagem and self.status_label is not None:
+            self._mensagem_ocupado = mensagem
+            self.status_label.config(text=mensagem)
+        self.root.config(cursor="watch")
+        self._cursor_espera = True
+
+    def _mostrar_livre(self):
+        self.root.config(cursor="")
+        self._cursor_espera = False
+        # Só limpa a barra se nenhum callback escreveu o resultado nela.
+        if self.status_label is not None and self.status_label.cget("text") == self._mensagem_ocupado:
+            self.status_label.config(text="Pronto.")
+        self._mensagem_ocupado = None
+
+    def _falha_padrao(self, erro):
+        messagebox.showerror("Erro", f"Erro inesperado: {erro}", parent=self.root)
+        if self.status_label is not None:
+            self.status_label.config(text=f"Erro: {erro}")
+
+    def _on_destroy(self, event):
+        # O bind na Toplevel também dispara para cada widget filho destruído.
+        if event.widget is not self.root:
+            return
+        self._encerrado = True
+        self._tarefas.put(None)
+
+    # --- Thread de trabalho ---
+
+    def _obsoleta(self, chave, geracao):
+        if chave is None:
+            return False
+        with self._lock:
+            return self._geracoes.get(chave) != geracao
+
+    def _trabalhar(self):
+        while True:
+            tarefa = self._tarefas.get()
+            if tarefa is None:
+                break
+
+            funcao, args, _, _, chave, geracao, _ = tarefa
+            resultado = erro = None
+            if not self._obsoleta(chave, geracao):
+                try:
+                    resultado = funcao(*args)
+                except Exception as e:
+                    erro = e
+            self._resultados.put((tarefa, resultado, erro))
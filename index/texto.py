@@ -0,0 +1,11 @@
+"""
+Normalização de texto para as buscas (nome de funcionário, catálogo de produtos).
+"""
+import unicodedata
+
+
+def normalizar_busca(texto):
+    """Minúsculas, sem acentos e com espaços simples: 'José  Antônio' -> 'jose antonio'."""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.lower().split())
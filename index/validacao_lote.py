@@ -0,0 +1,191 @@
+"""
+Validação em lote dos registros de funcionário (cargas em massa e varreduras
+de qualidade dos dados).
+
+Recebe colunas inteiras (lista de CPFs, lista de e-mails...) e devolve uma
+máscara de erros por linha. Os dígitos verificadores do CPF, as faixas de
+telefone e salário e o calendário das datas são calculados com aritmética de
+arrays do NumPy; os padrões de texto são compilados uma única vez.
+
+O resultado é o mesmo dos validadores de crud_funcionarios: uma linha é válida
+aqui se e só se validar_funcionario() aceitaria o registro, e mensagens_erro()
+devolve a mesma mensagem que ele devolveria.
+"""
+import re
+
+import numpy as np
+
+from index.crud_funcionarios import validar_cpf, validar_nome, PADRAO_EMAIL
+
+# Ordem igual à de validar_funcionario: o primeiro erro da linha decide a mensagem.
+VALIDACOES = (
+    ("cpf", "CPF inválido! Verifique e tente novamente."),
+    ("telefone", "Telefone inválido! Deve ter 10 ou 11 dígitos."),
+    ("nome", "Nome inválido! Digite apenas letras e espaços."),
+    ("email", "E-mail inválido! Exemplo válido: nome@dominio.com"),
+    ("salario", "Salário inválido! Informe um valor numérico maior que zero."),
+    ("data_admissao", "Data de admissão inválida! Use o formato DD/MM/AAAA."),
+    ("data_termino", "Data de término inválida! Use o formato DD/MM/AAAA."),
+    ("ordem_datas", "A data de término não pode ser anterior à data de admissão."),
+)
+
+# Pesos dos dois dígitos verificadores do CPF (10..2 e 11..2).
+PESOS_DV1 = np.arange(10, 1, -1)
+PESOS_DV2 = np.arange(11, 1, -1)
+
+# Mesmo padrão que o strptime usa para "%d/%m/%Y" (aceita "1/2/2020" e " 1/02/2020").
+PADRAO_DATA_BR = re.compile(r"(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])/(1[0-2]|0[1-9]|[1-9])/(\d\d\d\d)",
+                            re.IGNORECASE)
+
+DIAS_POR_MES = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _mascara(valores):
+    return np.fromiter(valores, dtype=bool)
+
+
+# -----------------------------
+# CPF
+# -----------------------------
+
+def validar_cpfs(cpfs):
+    """Array bool com o resultado de validar_cpf para cada CPF."""
+    validos = np.zeros(len(cpfs), dtype=bool)
+    digitos = [''.join(filter(str.isdigit, cpf)) for cpf in cpfs]
+
+    indices = []
+    for i, d in enumerate(digitos):
+        if len(d) != 11:
+            continue
+        if d.isascii():
+            indices.append(i)
+        else:
+            # Dígitos de outros alfabetos são raros: ficam com o validador escalar.
+            try:
+                validos[i] = validar_cpf(cpfs[i])
+            except ValueError:
+                validos[i] = False
+
+    if indices:
+        texto = ''.join(digitos[i] for i in indices).encode("ascii")
+        matriz = (np.frombuffer(texto, dtype=np.uint8).reshape(-1, 11) - ord("0")).astype(np.int64)
+
+        repetidos = (matriz == matriz[:, :1]).all(axis=1)
+        dv1 = ((matriz[:, :9] @ PESOS_DV1) * 10 % 11) % 10
+        dv2 = ((matriz[:, :10] @ PESOS_DV2) * 10 % 11) % 10
+        validos[indices] = ~repetidos & (dv1 == matriz[:, 9]) & (dv2 == matriz[:, 10])
+
+    return validos
+
+
+# -----------------------------
+# TELEFONE, NOME E E-MAIL
+# -----------------------------
+
+def validar_telefones(telefones):
+    """Array bool: o telefone tem 10 ou 11 dígitos."""
+    qtd_digitos = np.fromiter((sum(map(str.isdigit, t)) for t in telefones), dtype=np.int64,
+                              count=len(telefones))
+    return (qtd_digitos >= 10) & (qtd_digitos <= 11)
+
+
+def validar_nomes(nomes):
+    return _mascara(validar_nome(nome) for nome in nomes)
+
+
+def validar_emails(emails):
+    return _mascara(PADRAO_EMAIL.match(email) is not None for email in emails)
+
+
+# -----------------------------
+# SALÁRIO
+# -----------------------------
+
+def _ler_salario(salario):
+    if isinstance(salario, str):
+        salario = salario.replace(",", ".")
+    try:
+        return float(salario)
+    except ValueError:
+        return None
+
+
+def validar_salarios(salarios):
+    """Array bool: o salário é numérico e maior que zero."""
+    lidos = [_ler_salario(s) for s in salarios]
+    numericos = _mascara(v is not None for v in lidos)
+    valores = np.array([0.0 if v is None else v for v in lidos], dtype=float)
+    # "~(<= 0)" e não "> 0": NaN passa, como em validar_salario.
+    return numericos & ~(valores <= 0)
+
+
+# -----------------------------
+# DATAS
+# -----------------------------
+
+def ler_datas_br(datas):
+    """
+    Lê as datas 'DD/MM/AAAA' uma única vez e devolve (validas, chaves): a máscara
+    das datas que existem no calendário e a data como inteiro AAAAMMDD, que
+    pode ser comparado diretamente.
+    """
+    n = len(datas)
+    dia = np.zeros(n, dtype=np.int64)
+    mes = np.zeros(n, dtype=np.int64)
+    ano = np.zeros(n, dtype=np.int64)
+    casou = np.zeros(n, dtype=bool)
+
+    for i, data in enumerate(datas):
+        encontrado = PADRAO_DATA_BR.fullmatch(data) if data else None
+        if encontrado:
+            casou[i] = True
+            dia[i], mes[i], ano[i] = (int(parte) for parte in encontrado.groups())
+
+    bissexto = (ano % 4 == 0) & ((ano % 100 != 0) | (ano % 400 == 0))
+    dias_no_mes = DIAS_POR_MES[mes] + (bissexto & (mes == 2))
+    validas = casou & (ano >= 1) & (dia <= dias_no_mes)
+
+    return validas, ano * 10000 + mes * 100 + dia
+
+
+# -----------------------------
+# REGISTRO COMPLETO
+# -----------------------------
+
+def validar_lote(nomes, emails, cpfs, telefones, datas_admissao, datas_termino, salarios):
+    """
+    Valida as colunas (todas do mesmo tamanho) e devolve um dict com:
+      'erros':   matriz bool (linhas x VALIDACOES), True onde a validação falhou;
+      'validos': array bool com as linhas que passaram em tudo.
+    Datas de término vazias (ou None) são aceitas, como no cadastro.
+    """
+    n = len(cpfs)
+    colunas = (nomes, emails, telefones, datas_admissao, datas_termino, salarios)
+    if any(len(coluna) != n for coluna in colunas):
+        raise ValueError("Todas as colunas devem ter o mesmo número de linhas.")
+
+    adm_validas, adm = ler_datas_br(datas_admissao)
+    term_validas, term = ler_datas_br(datas_termino)
+    tem_termino = _mascara(bool(data) for data in datas_termino)
+
+    erros = np.empty((n, len(VALIDACOES)), dtype=bool)
+    erros[:, 0] = ~validar_cpfs(cpfs)
+    erros[:, 1] = ~validar_telefones(telefones)
+    erros[:, 2] = ~validar_nomes(nomes)
+    erros[:, 3] = ~validar_emails(emails)
+    erros[:, 4] = ~validar_salarios(salarios)
+    erros[:, 5] = ~adm_validas
+    erros[:, 6] = tem_termino & ~term_validas
+    erros[:, 7] = tem_termino & adm_validas & term_validas & (term < adm)
+
+    return {"erros": erros, "validos": ~erros.any(axis=1)}
+
+
+def mensagens_erro(erros):
+    """
+    Para cada linha, a mensagem que validar_funcionario devolveria
+    ("" para as linhas válidas).
+    """
+    primeiro = erros.argmax(axis=1)
+    tem_erro = erros.any(axis=1)
+    return [VALIDACOES[k][1] if falhou else "" for k, falhou in zip(primeiro, tem_erro)]
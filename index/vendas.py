@@ -0,0 +1,216 @@
+"""
+Registro de vendas no caixa (checkout).
+
+Cada venda é gravada numa única transação curta:
+
+1. confere os produtos e lê o preço de venda atual (sem travas);
+2. trava os lotes com estoque desses produtos (SELECT ... FOR UPDATE), sempre
+   na ordem (produto_id, data_aquisicao, lote_id) do índice
+   idx_lote_produto_fifo. Como todas as vendas travam as linhas na mesma
+   ordem, vendas concorrentes dos mesmos produtos esperam umas pelas outras,
+   mas não formam ciclos de espera (deadlock);
+3. escolhe os lotes de cada produto por ordem de aquisição (FIFO);
+4. grava a venda, os itens (um INSERT de várias linhas), a baixa dos lotes
+   (um único UPDATE) e as movimentações de 'saida' (outro INSERT em lote).
+
+Se faltar estoque de algum produto nada é gravado, e EstoqueInsuficiente
+informa o pedido e o disponível de cada produto em falta.
+"""
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from config.config_bd import conectar_bd, em_transacao, Error
+from config.instrumentacao import operacao
+
+METODOS_PAGAMENTO = ("DINHEIRO", "CARTAO", "PIX", "OUTRO")
+
+CENTAVOS = Decimal("0.01")
+
+# Deadlock (1213) e tempo de espera por trava esgotado (1205) no MySQL: a
+# transação foi desfeita pelo servidor e pode ser repetida inteira.
+ERROS_REPETIVEIS = (1205, 1213)
+TENTATIVAS = 3
+
+QUERY_PRODUTOS = "SELECT produto_id, preco_venda, ativo FROM produto WHERE produto_id IN ({})"
+
+QUERY_LOTES = """
+    SELECT lote_id, produto_id, quantidade_atual
+    FROM lote
+    WHERE produto_id IN ({}) AND quantidade_atual > 0{}
+    ORDER BY produto_id, data_aquisicao, lote_id
+    FOR UPDATE
+"""
+
+QUERY_INSERIR_VENDA = """
+    INSERT INTO venda (funcionario_id, metodo_pagamento, total_venda, data_venda, status)
+    VALUES (%s, %s, %s, %s, 'CONCLUIDA')
+"""
+
+QUERY_INSERIR_ITEM = "INSERT INTO venda_item (venda_id, produto_id, quantidade, preco_unitario) VALUES (%s, %s, %s, %s)"
+
+QUERY_INSERIR_SAIDA = """
+    INSERT INTO movimentacao_estoque (lote_id, tipo, quantidade, motivo, data_movimentacao, funcionario_id)
+    VALUES (%s, 'saida', %s, %s, %s, %s)
+"""
+
+
+class VendaRecusada(Error):
+    """Venda com itens, produtos ou forma de pagamento inválidos; nada foi gravado."""
+
+
+class EstoqueInsuficiente(VendaRecusada):
+    """Algum produto não tem estoque para a quantidade pedida; nada foi gravado."""
+
+    def __init__(self, faltas):
+        # produto_id -> (quantidade pedida, quantidade disponível)
+        self.faltas = faltas
+        super().__init__("Estoque insuficiente: " + "; ".join(
+            f"produto {produto_id} (pedido {pedido}, disponível {disponivel})"
+            for produto_id, (pedido, disponivel) in sorted(faltas.items())
+        ))
+
+
+def _marcadores(quantidade):
+    return ", ".join(["%s"] * quantidade)
+
+
+# -----------------------------
+# ITENS E ALOCAÇÃO FIFO
+# -----------------------------
+
+def juntar_itens(itens):
+    """
+    [(produto_id, quantidade), ...] -> {produto_id: quantidade} em ordem de
+    produto_id, somando as linhas repetidas do mesmo produto.
+    """
+    quantidades = {}
+    for produto_id, quantidade in itens:
+        try:
+            produto_id, quantidade = int(produto_id), int(quantidade)
+        except (TypeError, ValueError):
+            raise VendaRecusada(f"Item inválido: {produto_id!r} x {quantidade!r}.") from None
+        if quantidade <= 0:
+            raise VendaRecusada(f"Quantidade inválida para o produto {produto_id}: {quantidade}.")
+        quantidades[produto_id] = quantidades.get(produto_id, 0) + quantidade
+
+    if not quantidades:
+        raise VendaRecusada("A venda não tem itens.")
+    return dict(sorted(quantidades.items()))
+
+
+def alocar_fifo(quantidades, lotes):
+    """
+    Distribui as quantidades pelos lotes, dados como (lote_id, produto_id,
+    quantidade_atual) já em ordem de aquisição. Devolve [(lote_id, produto_id,
+    quantidade_retirada)] ou levanta EstoqueInsuficiente.
+    """
+    restante = dict(quantidades)
+    baixas = []
+    for lote_id, produto_id, disponivel in lotes:
+        falta = restante.get(produto_id, 0)
+        if falta <= 0:
+            continue
+        retirar = min(falta, disponivel)
+        baixas.append((lote_id, produto_id, retirar))
+        restante[produto_id] = falta - retirar
+
+    faltas = {
+        produto_id: (quantidades[produto_id], quantidades[produto_id] - falta)
+        for produto_id, falta in restante.items() if falta > 0
+    }
+    if faltas:
+        raise EstoqueInsuficiente(faltas)
+    return baixas
+
+
+# -----------------------------
+# GRAVAÇÃO
+# -----------------------------
+
+def _gravar_venda(funcionario_id, quantidades, metodo_pagamento, estoque_id):
+    conexao = conectar_bd()
+    if not conexao:
+        raise Error("Falha ao conectar no banco de dados.")
+
+    produtos = list(quantidades)
+    try:
+        cursor = conexao.cursor()
+        try:
+            cursor.execute(QUERY_PRODUTOS.format(_marcadores(len(produtos))), produtos)
+            precos = {produto_id: Decimal(str(preco)) for produto_id, preco, ativo in cursor.fetchall() if ativo}
+            invalidos = [produto_id for produto_id in produtos if produto_id not in precos]
+            if invalidos:
+                raise VendaRecusada(f"Produto(s) inexistente(s) ou inativo(s): {', '.join(map(str, invalidos))}.")
+
+            filtro_estoque = "" if estoque_id is None else " AND estoque_id = %s"
+            cursor.execute(QUERY_LOTES.format(_marcadores(len(produtos)), filtro_estoque),
+                           produtos + ([] if estoque_id is None else [estoque_id]))
+            baixas = alocar_fifo(quantidades, cursor.fetchall())
+
+            total = sum(precos[produto_id] * quantidade for produto_id, quantidade in quantidades.items())
+            total = total.quantize(CENTAVOS, ROUND_HALF_UP)
+            agora = datetime.now().replace(microsecond=0)
+
+            venda_id = conexao.preparada("venda.inserir", QUERY_INSERIR_VENDA).executar(
+                (funcionario_id, metodo_pagamento, total, agora)).lastrowid
+
+            cursor.executemany(QUERY_INSERIR_ITEM, [
+                (venda_id, produto_id, quantidade, precos[produto_id])
+                for produto_id, quantidade in quantidades.items()
+            ])
+
+            # Baixa de todos os lotes num único UPDATE.
+            casos = " ".join(["WHEN %s THEN %s"] * len(baixas))
+            params = [valor for lote_id, _, quantidade in baixas for valor in (lote_id, quantidade)]
+            params += [lote_id for lote_id, _, _ in baixas]
+            cursor.execute(
+                f"UPDATE lote SET quantidade_atual = quantidade_atual - CASE lote_id {casos} END "
+                f"WHERE lote_id IN ({_marcadores(len(baixas))})",
+                params,
+            )
+            if cursor.rowcount != len(baixas):
+                raise Error("A baixa não encontrou todos os lotes travados.")
+
+            motivo = f"Venda {venda_id}"
+            cursor.executemany(QUERY_INSERIR_SAIDA, [
+                (lote_id, quantidade, motivo, agora, funcionario_id) for lote_id, _, quantidade in baixas
+            ])
+
+            conexao.commit()
+            return venda_id
+        finally:
+            cursor.close()
+
+    except Error:
+        conexao.rollback()
+        raise
+
+    finally:
+        conexao.close()
+
+
+@operacao
+def registrar_venda(funcionario_id, itens, metodo_pagamento="DINHEIRO", estoque_id=None):
+    """
+    Grava uma venda concluída com os itens [(produto_id, quantidade), ...], ao
+    preço de venda atual de cada produto, e dá baixa no estoque por FIFO.
+    Com estoque_id, só os lotes daquele estoque são usados.
+
+    Devolve o venda_id. Levanta VendaRecusada (ou EstoqueInsuficiente) se a
+    venda não puder ser feita, e Error em falhas do banco; nos dois casos
+    nada é gravado.
+    """
+    if metodo_pagamento not in METODOS_PAGAMENTO:
+        raise VendaRecusada(f"Forma de pagamento inválida: {metodo_pagamento}.")
+    quantidades = juntar_itens(itens)
+
+    # Dentro de uma transacao() maior, repetir só a venda não desfaria o resto.
+    tentativas = 1 if em_transacao() else TENTATIVAS
+    for tentativa in range(1, tentativas + 1):
+        try:
+            return _gravar_venda(funcionario_id, quantidades, metodo_pagamento, estoque_id)
+        except Error as e:
+            if getattr(e, "errno", None) not in ERROS_REPETIVEIS or tentativa == tentativas:
+                raise
+            time.sleep(0.01 * tentativa)
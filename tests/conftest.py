@@ -0,0 +1,40 @@
+"""
+Os testes rodam no backend SQLite (config.sqlite_bd), cada um num banco novo
+criado a partir de BD/gestorpro_bd.sql: não precisam de um servidor MySQL.
+
+    python -m pytest -q
+"""
+import pytest
+
+from config.config_bd import CONFIG, backend_atual, usar_backend, conectar_bd
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Banco SQLite vazio (só o esquema) para um teste."""
+    from index.crud_cargos import cache_cargos
+
+    backend, caminho = backend_atual(), CONFIG['sqlite']['caminho']
+    usar_backend("sqlite", caminho=str(tmp_path / "gestorpro.db"))
+    cache_cargos.invalidar()
+    yield
+    CONFIG['sqlite']['caminho'] = caminho
+    usar_backend(backend)
+    cache_cargos.invalidar()
+
+
+@pytest.fixture
+def sql(banco):
+    """sql(query, params) executa com commit e devolve as linhas (tuplas)."""
+    def executar(query, params=()):
+        conexao = conectar_bd()
+        try:
+            cursor = conexao.cursor()
+            cursor.execute(query, params)
+            linhas = cursor.fetchall()
+            conexao.commit()
+            cursor.close()
+            return linhas
+        finally:
+            conexao.close()
+    return executar
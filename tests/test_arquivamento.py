@@ -0,0 +1,88 @@
+"""Arquivamento de vendas encerradas em lotes (index.arquivamento)."""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import index.arquivamento as arquivamento
+from config.config_bd import Error
+from index.crud_cargos import inserir_cargo
+from index.crud_funcionarios import inserir_funcionario
+from index.arquivamento import arquivar_vendas, arquivar_lote
+
+CORTE = datetime(2024, 6, 1)
+
+
+@pytest.fixture
+def vendas(sql):
+    """
+    venda_id 1..12, alternando status e datas; as elegíveis (encerradas antes
+    do corte) são as de ID ímpar menor que 10.
+    """
+    funcionario_id = inserir_funcionario(inserir_cargo("Caixa", 0, 1).id, "Ana Souza", "ana@empresa.com",
+                                         "52998224725", "11987654321", "01/02/2020", "", "2500", 1).id
+    sql("INSERT INTO produto (produto_id, nome, preco_venda) VALUES (1, 'Café', 10)")
+    for venda_id in range(1, 13):
+        status = "ABERTA" if venda_id % 2 == 0 else ("CANCELADA" if venda_id % 3 == 0 else "CONCLUIDA")
+        data = "2024-01-10 10:00:00" if venda_id < 10 else "2024-07-10 10:00:00"
+        sql("INSERT INTO venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, status) "
+            "VALUES (%s, %s, 'PIX', 25, %s, %s)", (venda_id, funcionario_id, data, status))
+        sql("INSERT INTO venda_item (venda_id, produto_id, quantidade, preco_unitario) VALUES "
+            "(%s, 1, 2, 10), (%s, 1, 1, 5)", (venda_id, venda_id))
+    return [1, 3, 5, 7, 9]
+
+
+def test_arquiva_so_as_elegiveis(vendas, sql):
+    relatorio = arquivar_vendas(CORTE, tamanho_lote=2, pausa=0)
+
+    assert (relatorio["vendas"], relatorio["itens"], relatorio["lotes"]) == (5, 10, 3)
+    assert [linha[0] for linha in sql("SELECT venda_id FROM historico_venda ORDER BY venda_id")] == vendas
+    restantes = [linha[0] for linha in sql("SELECT venda_id FROM venda ORDER BY venda_id")]
+    assert restantes == [i for i in range(1, 13) if i not in vendas]
+    assert sql("SELECT COUNT(*) FROM venda_item WHERE venda_id IN (1, 3, 5, 7, 9)") == [(0,)]
+    subtotais = sorted(Decimal(str(s)) for s, in sql("SELECT subtotal FROM historico_venda_item"))
+    assert subtotais == [Decimal("5.00")] * 5 + [Decimal("20.00")] * 5
+
+
+def test_rodar_de_novo_nao_muda_nada(vendas, sql):
+    arquivar_vendas(CORTE, tamanho_lote=2, pausa=0)
+    antes = sql("SELECT venda_id, total_venda, status FROM historico_venda ORDER BY venda_id")
+
+    relatorio = arquivar_vendas(CORTE, tamanho_lote=2, pausa=0)
+
+    assert (relatorio["vendas"], relatorio["lotes"]) == (0, 0)
+    assert sql("SELECT venda_id, total_venda, status FROM historico_venda ORDER BY venda_id") == antes
+    assert sql("SELECT COUNT(*) FROM historico_venda_item") == [(10,)]
+
+
+def test_continua_de_onde_parou(vendas, sql):
+    # Um lote isolado (como se o processo tivesse parado depois dele).
+    assert arquivar_lote(CORTE, 0, 2)["vendas"] == 2
+    assert arquivar_vendas(CORTE, tamanho_lote=2, pausa=0)["vendas"] == 3
+    assert sql("SELECT COUNT(*) FROM historico_venda") == [(5,)]
+
+
+def test_vendas_novas_ficam_para_a_proxima_vez(vendas, sql):
+    # Criada depois do início: acima do maior venda_id lido, não entra.
+    def nova_venda(parcial):
+        if parcial["lotes"] == 1:
+            sql("INSERT INTO venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, status) "
+                "SELECT 13, funcionario_id, 'PIX', 1, '2024-01-01 00:00:00', 'CONCLUIDA' FROM venda WHERE venda_id = 2")
+
+    assert arquivar_vendas(CORTE, tamanho_lote=2, pausa=0, ao_concluir_lote=nova_venda)["vendas"] == 5
+    assert arquivar_vendas(CORTE, tamanho_lote=2, pausa=0)["vendas"] == 1
+
+
+def test_desiste_depois_de_repeticoes_max(vendas, sql, monkeypatch):
+    def deadlock(*args):
+        erro = Error("Deadlock found when trying to get lock")
+        erro.errno = 1213
+        raise erro
+    monkeypatch.setattr(arquivamento, "arquivar_lote", deadlock)
+    monkeypatch.setattr(arquivamento.time, "sleep", lambda segundos: None)
+
+    relatorio = arquivar_vendas(CORTE, pausa=0, repeticoes_max=3)
+
+    assert relatorio["desistiu"] and relatorio["repeticoes"] == 3
+    assert "Deadlock" in relatorio["erro"]
+    assert sql("SELECT COUNT(*) FROM historico_venda") == [(0,)]
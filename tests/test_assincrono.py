@@ -0,0 +1,74 @@
+"""Fachada asyncio sobre o CRUD (index.assincrono)."""
+import asyncio
+
+from index.assincrono import (
+    CrudAssincrono, converter_resposta, Resultado, OK, NAO_ENCONTRADO, SOBRECARGA,
+)
+from index.resposta import Resposta, CRIADO, ATUALIZADO, INEXISTENTE, CONFLITO, INVALIDO, ERRO_BD
+
+
+def _rodar(corrotina):
+    return asyncio.run(corrotina)
+
+
+def test_converter_resposta():
+    assert converter_resposta(Resposta(True, "\n-> Cargo 'Caixa' criado com sucesso (ID: 4).", CRIADO, 4)) == \
+        Resultado(True, OK, {"id": 4}, "Cargo 'Caixa' criado com sucesso (ID: 4).")
+    assert converter_resposta(Resposta(True, "Cargo atualizado com sucesso.", ATUALIZADO)) == \
+        Resultado(True, OK, None, "Cargo atualizado com sucesso.")
+    assert converter_resposta(Resposta(False, "Nenhum cargo", INEXISTENTE)).codigo == NAO_ENCONTRADO
+    for codigo in (CONFLITO, INVALIDO, ERRO_BD):
+        assert converter_resposta(Resposta(False, "x", codigo)).codigo == codigo
+
+
+def test_crud_pela_fachada(banco):
+    async def cenario():
+        async with CrudAssincrono() as crud:
+            criado = await crud.inserir_cargo("Caixa", False, True)
+            repetido = await crud.inserir_cargo("Caixa", False, True)
+            cargo_id = criado.dados["id"]
+            lido = await crud.buscar_cargo(cargo_id)
+            atualizado = await crud.atualizar_cargo(cargo_id, nome="Caixa 1", versao=lido.dados.versao)
+            atrasado = await crud.atualizar_cargo(cargo_id, nome="Caixa 2", versao=lido.dados.versao)
+            ausente = await crud.buscar_cargo(cargo_id + 1)
+            lote = await crud.em_lote(crud.buscar_cargo(i) for i in (cargo_id, cargo_id + 1))
+            return criado, repetido, atualizado, atrasado, ausente, lote
+
+    criado, repetido, atualizado, atrasado, ausente, lote = _rodar(cenario())
+
+    assert criado.ok and criado.codigo == OK
+    # Nome repetido (chave única) é conflito, não erro do banco.
+    assert (repetido.ok, repetido.codigo) == (False, CONFLITO)
+    assert atualizado.ok
+    assert atrasado.codigo == CONFLITO
+    assert ausente.codigo == NAO_ENCONTRADO
+    assert [r.ok for r in lote] == [True, False] and lote[0].dados.cargo_nome == "Caixa 1"
+
+
+def test_cargo_com_funcionarios_nao_e_deletado(banco):
+    async def cenario():
+        async with CrudAssincrono() as crud:
+            cargo_id = (await crud.inserir_cargo("Caixa", False, True)).dados["id"]
+            invalido = await crud.inserir_funcionario(cargo_id + 1, "Ana Souza", "ana@empresa.com", "52998224725",
+                                                      "11987654321", "01/02/2020", "2500")
+            await crud.inserir_funcionario(cargo_id, "Ana Souza", "ana@empresa.com", "52998224725",
+                                           "11987654321", "01/02/2020", "2500")
+            return invalido, await crud.deletar_cargo(cargo_id)
+
+    invalido, deletado = _rodar(cenario())
+
+    assert invalido.codigo == INVALIDO
+    assert deletado.codigo == CONFLITO
+
+
+def test_sobrecarga(banco):
+    async def cenario():
+        async with CrudAssincrono(trabalhadores=1, pendentes_max=1, espera_max=0.01) as crud:
+            # Ocupa a única vaga enquanto a segunda chamada espera.
+            await crud._vagas.acquire()
+            try:
+                return await crud.buscar_cargo(1)
+            finally:
+                crud._vagas.release()
+
+    assert _rodar(cenario()).codigo == SOBRECARGA
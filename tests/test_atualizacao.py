@@ -0,0 +1,99 @@
+"""UPDATE parcial e controle de concorrência otimista (index.atualizacao)."""
+from config.config_bd import conectar_bd
+from index.atualizacao import montar_update, atualizar_parcial, ATUALIZADO, INEXISTENTE, CONFLITO
+from index.crud_cargos import inserir_cargo, atualizar_cargo, buscar_cargo
+from index.crud_funcionarios import inserir_funcionario, atualizar_funcionario, buscar_funcionario
+from index.resposta import INVALIDO
+
+
+def _cargo(nome="Caixa"):
+    return inserir_cargo(nome, 0, 1).id
+
+
+def _funcionario(cargo_id, cpf="52998224725", email="ana@empresa.com"):
+    return inserir_funcionario(cargo_id, "Ana Souza", email, cpf, "11987654321", "01/02/2020", "", "2500", 1).id
+
+
+# -----------------------------
+# montar_update
+# -----------------------------
+
+def test_montar_update_so_com_os_campos_informados():
+    query, params = montar_update("cargo", "cargo_id", 7, {"cargo_nome": "Gerente", "pode_fazer_vendas": None})
+    assert query == "UPDATE cargo SET cargo_nome = %s, versao = versao + 1 WHERE cargo_id = %s"
+    assert params == ("Gerente", 7)
+
+
+def test_montar_update_com_versao_esperada():
+    query, params = montar_update("cargo", "cargo_id", 7, {"pode_fazer_vendas": 0}, versao_esperada=3)
+    assert query.endswith("WHERE cargo_id = %s AND versao = %s")
+    assert params == (0, 7, 3)
+
+
+def test_montar_update_sem_campos():
+    assert montar_update("cargo", "cargo_id", 7, {"cargo_nome": None}) == (None, None)
+
+
+# -----------------------------
+# atualizar_parcial
+# -----------------------------
+
+def test_atualizar_parcial_situacoes(banco):
+    cargo_id = _cargo()
+    conexao = conectar_bd()
+    try:
+        assert atualizar_parcial(conexao, "cargo", "cargo_id", cargo_id, {"cargo_nome": "Caixa 1"}, 0) == ATUALIZADO
+        # A versão lida (0) já não é a do banco (1).
+        assert atualizar_parcial(conexao, "cargo", "cargo_id", cargo_id, {"cargo_nome": "Caixa 2"}, 0) == CONFLITO
+        assert atualizar_parcial(conexao, "cargo", "cargo_id", cargo_id + 1, {"cargo_nome": "X"}, 0) == INEXISTENTE
+        assert atualizar_parcial(conexao, "cargo", "cargo_id", cargo_id + 1, {"cargo_nome": "X"}) == INEXISTENTE
+        assert atualizar_parcial(conexao, "cargo", "cargo_id", cargo_id, {"cargo_nome": None}) is None
+        conexao.commit()
+    finally:
+        conexao.close()
+
+    assert buscar_cargo(cargo_id).cargo_nome == "Caixa 1"
+
+
+# -----------------------------
+# CRUD
+# -----------------------------
+
+def test_cargo_alterado_por_outro_usuario(banco):
+    cargo_id = _cargo()
+    lido = buscar_cargo(cargo_id)
+
+    assert atualizar_cargo(cargo_id, None, 1, None, versao_esperada=lido.versao).ok
+    resposta = atualizar_cargo(cargo_id, "Gerente", None, None, versao_esperada=lido.versao)
+
+    assert not resposta.ok and resposta.codigo == CONFLITO
+    cargo = buscar_cargo(cargo_id)
+    assert (cargo.cargo_nome, cargo.pode_gerenciar_estoque, cargo.versao) == ("Caixa", True, lido.versao + 1)
+
+
+def test_atualizar_sem_versao_ignora_o_controle(banco):
+    cargo_id = _cargo()
+    assert atualizar_cargo(cargo_id, "Gerente", None, None).ok
+    assert atualizar_cargo(cargo_id, "Supervisor", None, None).codigo == ATUALIZADO
+    assert buscar_cargo(cargo_id).versao == 2
+
+
+def test_atualizar_cargo_inexistente_e_sem_campos(banco):
+    assert atualizar_cargo(999, "Gerente", None, None, versao_esperada=0).codigo == INEXISTENTE
+    assert atualizar_cargo(999, None, None, None).codigo == INVALIDO
+
+
+def test_funcionario_alterado_por_outro_usuario(banco):
+    funcionario_id = _funcionario(_cargo())
+    lido = buscar_funcionario(funcionario_id)
+
+    assert atualizar_funcionario(funcionario_id, None, None, None, None, None, None, None, "3000", None,
+                                 versao_esperada=lido.versao).codigo == ATUALIZADO
+    resposta = atualizar_funcionario(funcionario_id, None, "Ana Lima", None, None, None, None, None, None, None,
+                                     versao_esperada=lido.versao)
+
+    assert resposta.codigo == CONFLITO
+    atual = buscar_funcionario(funcionario_id)
+    assert atual.nome == "Ana Souza"
+    assert float(atual.salario) == 3000
+    assert atual.versao == lido.versao + 1
@@ -0,0 +1,60 @@
+"""Busca de funcionários por prefixo (condicoes_busca / buscar_funcionarios)."""
+import pytest
+
+from index.crud_cargos import inserir_cargo
+from index.crud_funcionarios import condicoes_busca, buscar_funcionarios, inserir_funcionario, atualizar_funcionario
+from index.texto import normalizar_busca
+
+
+@pytest.fixture
+def pessoas(banco):
+    cargo_id = inserir_cargo("Caixa", 0, 1).id
+    dados = [
+        ("José  Álvares", "jose@empresa.com", "529.982.247-25"),
+        ("Joana Prado", "joana_p@empresa.com", "11144477735"),
+        ("Maria Joséfa", "maria@outra.com", "39053344705"),
+    ]
+    return {nome: inserir_funcionario(cargo_id, nome, email, cpf, "11987654321", "01/02/2020", "", "2000", 1).id
+            for nome, email, cpf in dados}
+
+
+def _nomes(termo):
+    return [f.nome for f in buscar_funcionarios(termo)["linhas"]]
+
+
+def test_normalizar_busca():
+    assert normalizar_busca("  JOSÉ   Álvares ") == "jose alvares"
+
+
+def test_condicoes_por_tipo_de_termo():
+    assert condicoes_busca("  ") == []
+    assert condicoes_busca("Jo%é") == [("nome_busca LIKE %s ESCAPE '!'", ("jo!%e%",))]
+    assert condicoes_busca("ana_p@") == [("email LIKE %s ESCAPE '!'", ("ana!_p@%",))]
+    (condicao, params), = condicoes_busca("5299822")
+    assert condicao.startswith("cpf LIKE") and params == ("5299822%", "529.982.2%")
+
+
+def test_nome_sem_diferenciar_maiusculas_nem_acentos(pessoas):
+    assert _nomes("jose") == ["José  Álvares"]
+    assert _nomes("JOSÉ Á") == ["José  Álvares"]
+    assert sorted(_nomes("jo")) == ["Joana Prado", "José  Álvares"]
+    # Só o início do nome.
+    assert _nomes("josefa") == []
+
+
+def test_nome_alterado_entra_na_busca(pessoas):
+    assert atualizar_funcionario(pessoas["Joana Prado"], None, "Ângela Prado", None, None, None, None, None, None,
+                                 None).ok
+    assert _nomes("angela") == ["Ângela Prado"]
+    assert _nomes("joana") == []
+
+
+def test_cpf_com_ou_sem_mascara(pessoas):
+    assert _nomes("529982") == ["José  Álvares"]
+    assert _nomes("111.444") == ["Joana Prado"]
+
+
+def test_email_com_curinga_literal(pessoas):
+    assert _nomes("joana_p@") == ["Joana Prado"]
+    assert _nomes("JOANA_P@EMP") == ["Joana Prado"]
+    assert _nomes("joanaxp@") == []
@@ -0,0 +1,34 @@
+"""Cache de cargos (index.crud_cargos.CacheCargos)."""
+from index.crud_cargos import CacheCargos, inserir_cargo, atualizar_cargo
+
+
+def test_invalidar_durante_a_leitura(banco, monkeypatch):
+    cargo_id = inserir_cargo("Caixa", 0, 1).id
+    cache = CacheCargos(ttl=60)
+    carregar = cache._carregar
+
+    def carregar_e_mudar():
+        # A leitura termina antes da alteração, que invalida o cache no meio dela.
+        por_id = carregar()
+        atualizar_cargo(cargo_id, "Operador de Caixa", None, None)
+        cache.invalidar()
+        return por_id
+
+    monkeypatch.setattr(cache, "_carregar", carregar_e_mudar)
+    assert cache.nome(cargo_id) == "Caixa"
+
+    monkeypatch.setattr(cache, "_carregar", carregar)
+    assert cache.nome(cargo_id) == "Operador de Caixa"
+
+
+def test_invalidar_com_relogio_recem_iniciado(banco, monkeypatch):
+    # time.monotonic() pode começar perto de zero (máquina recém-ligada).
+    monkeypatch.setattr("index.crud_cargos.time.monotonic", lambda: 1.0)
+    cargo_id = inserir_cargo("Caixa", 0, 1).id
+    cache = CacheCargos(ttl=60)
+    assert cache.nome(cargo_id) == "Caixa"
+
+    atualizar_cargo(cargo_id, "Operador de Caixa", None, None)
+    cache.invalidar()
+    assert cache.nome(cargo_id, bloquear=False) == "Caixa"
+    assert cache.nome(cargo_id) == "Operador de Caixa"
@@ -0,0 +1,84 @@
+"""Catálogo de produtos em memória e sua atualização incremental (index.catalogo)."""
+import pytest
+
+from index.catalogo import CatalogoProdutos
+
+
+@pytest.fixture
+def produtos(sql):
+    sql("INSERT INTO produto (produto_id, sku, nome, preco_venda) VALUES "
+        "(1, 'PAR-6', 'Parafuso Sextavado 6mm', 0.35), (2, 'TIN-18', 'Tinta Acrílica Branca', 189.90), "
+        "(3, 'TIN-3', 'Tinta Acrílica Cinza', 49.90)")
+    sql("INSERT INTO especificacao (produto_id, nome_atributo, valor_atributo, unidade_medida) VALUES "
+        "(2, 'Cor', 'Branco', NULL), (2, 'Volume', '18', 'L'), (3, 'Cor', 'Cinza', NULL), (3, 'Volume', '3.6', 'L')")
+    catalogo = CatalogoProdutos()
+    assert catalogo.carregar() == 3
+    return catalogo
+
+
+def _skus(resultado):
+    return [produto.sku for produto in resultado]
+
+
+def test_busca_por_sku_nome_e_especificacao(produtos):
+    assert produtos.por_sku(" par-6 ").nome == "Parafuso Sextavado 6mm"
+    assert _skus(produtos.buscar("parafu 6m")) == ["PAR-6"]
+    assert _skus(produtos.buscar("tinta acrilica")) == ["TIN-18", "TIN-3"]
+    assert _skus(produtos.buscar("tinta", ["Cor=branco"])) == ["TIN-18"]
+    assert _skus(produtos.buscar(atributos=[("Volume", "3.6")])) == ["TIN-3"]
+    # Termo curto só como início de palavra.
+    assert _skus(produtos.buscar("ta")) == []
+
+
+def test_atualizar_reindexa_so_os_alterados(produtos, sql):
+    sql("UPDATE produto SET nome = 'Parafuso Allen 6mm' WHERE produto_id = 1")
+    sql("INSERT INTO produto (produto_id, sku, nome, preco_venda) VALUES (4, 'BRO-8', 'Broca de Aço 8mm', 12)")
+
+    assert produtos.atualizar() == 2
+    assert _skus(produtos.buscar("allen")) == ["PAR-6"]
+    assert _skus(produtos.buscar("sextavado")) == []
+    assert produtos.por_sku("BRO-8").nome == "Broca de Aço 8mm"
+    assert len(produtos) == 4
+    # Sem alterações novas, nada muda (a sobreposição relê, mas não reindexa).
+    assert produtos.atualizar() == 0
+
+
+def test_produto_desativado_sai_do_catalogo(produtos, sql):
+    sql("UPDATE produto SET ativo = 0 WHERE produto_id = 2")
+
+    assert produtos.atualizar() == 1
+    assert produtos.por_sku("TIN-18") is None
+    assert _skus(produtos.buscar("tinta")) == ["TIN-3"]
+    assert _skus(produtos.buscar(atributos=["Cor=Branco"])) == []
+
+    sql("UPDATE produto SET ativo = 1 WHERE produto_id = 2")
+    produtos.atualizar()
+    assert produtos.por_sku("TIN-18") is not None
+
+
+def test_especificacao_alterada(produtos, sql):
+    sql("UPDATE especificacao SET valor_atributo = 'Gelo' WHERE produto_id = 3 AND nome_atributo = 'Cor'")
+    sql("INSERT INTO especificacao (produto_id, nome_atributo, valor_atributo) VALUES (1, 'Material', 'Aço')")
+
+    assert produtos.atualizar() == 2
+    assert _skus(produtos.buscar(atributos=["Cor=Gelo"])) == ["TIN-3"]
+    assert _skus(produtos.buscar(atributos=["Cor=Cinza"])) == []
+    assert _skus(produtos.buscar("parafuso", ["material=aco"])) == ["PAR-6"]
+    # O produto relido traz todas as especificações, não só a alterada.
+    assert dict((a, v) for a, v, _ in produtos.por_id(3).especificacoes) == {"Cor": "Gelo", "Volume": "3.6"}
+
+
+def test_produto_apagado_sai_na_conferencia(produtos, sql):
+    from index.catalogo import CONFERIR_EXCLUSOES_A_CADA
+
+    sql("DELETE FROM produto WHERE produto_id = 2")
+
+    # Apagar não muda atualizado_em de nada: só a conferência periódica vê.
+    for _ in range(CONFERIR_EXCLUSOES_A_CADA - 1):
+        assert produtos.atualizar() == 0
+    assert produtos.por_sku("TIN-18") is not None
+
+    assert produtos.atualizar() == 1
+    assert produtos.por_sku("TIN-18") is None
+    assert _skus(produtos.buscar("tinta")) == ["TIN-3"]
+    assert _skus(produtos.buscar(atributos=["Cor=Branco"])) == []
@@ -0,0 +1,79 @@
+"""Linha de comando (index.cli): códigos de saída e saída JSON."""
+import io
+import json
+
+import pytest
+
+from index import cli
+from index.resposta import CRIADO, CONFLITO, INVALIDO
+
+
+def _rodar(capsys, *argv, entrada=None, monkeypatch=None):
+    if entrada is not None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(entrada))
+    codigo = cli.main(list(argv))
+    return codigo, [json.loads(linha) for linha in capsys.readouterr().out.splitlines()]
+
+
+def _jsonl(*registros):
+    return "".join(json.dumps(registro) + "\n" for registro in registros)
+
+
+def test_inserir_e_listar(banco, capsys, monkeypatch):
+    codigo, (resultado,) = _rodar(capsys, "cargos", "inserir", "-", monkeypatch=monkeypatch, entrada=_jsonl(
+        {"cargo_nome": "Caixa", "pode_gerenciar_estoque": "N", "pode_fazer_vendas": "S"},
+        {"cargo_nome": "Gerente", "pode_gerenciar_estoque": True, "pode_fazer_vendas": True},
+    ))
+    assert codigo == 0
+    assert resultado["ok"] and resultado["confirmado"] and resultado["processados"] == 2
+    assert [item["codigo"] for item in resultado["resultados"]] == [CRIADO, CRIADO]
+    ids = [item["id"] for item in resultado["resultados"]]
+
+    codigo, linhas = _rodar(capsys, "cargos", "listar", "--tamanho", "1")
+    assert codigo == 0
+    assert [(linha["cargo_id"], linha["cargo_nome"], linha["pode_fazer_vendas"]) for linha in linhas] == \
+        [(ids[0], "Caixa", "Sim"), (ids[1], "Gerente", "Sim")]
+
+    codigo, linhas = _rodar(capsys, "cargos", "listar", "--apos", str(ids[0]), "--limite", "1")
+    assert codigo == 0 and [linha["cargo_nome"] for linha in linhas] == ["Gerente"]
+
+
+def test_recusa_desfaz_a_chamada_inteira(banco, capsys, monkeypatch):
+    codigo, (resultado,) = _rodar(capsys, "cargos", "inserir", "-", monkeypatch=monkeypatch, entrada=_jsonl(
+        {"cargo_nome": "Caixa", "pode_gerenciar_estoque": "N", "pode_fazer_vendas": "S"},
+        {"cargo_nome": "Caixa", "pode_gerenciar_estoque": "N", "pode_fazer_vendas": "S"},
+    ))
+    assert codigo == 1
+    assert not resultado["ok"] and not resultado["confirmado"]
+    assert resultado["resultados"][1]["codigo"] == CONFLITO
+
+    _, linhas = _rodar(capsys, "cargos", "listar")
+    assert linhas == []
+
+
+def test_registro_invalido_e_linha_ilegivel(banco, capsys, monkeypatch):
+    codigo, (resultado,) = _rodar(capsys, "cargos", "inserir", "-", monkeypatch=monkeypatch,
+                                  entrada=_jsonl({"cargo_nome": "Caixa", "pode_fazer_vendas": "talvez"}))
+    assert codigo == 1 and resultado["resultados"][0]["codigo"] == INVALIDO
+
+    codigo, (resultado,) = _rodar(capsys, "cargos", "inserir", "-", monkeypatch=monkeypatch, entrada="{nada\n")
+    assert codigo == 1 and resultado["resultados"][0]["mensagem"].startswith("Linha ilegível")
+
+
+def test_simular_nao_grava(banco, capsys, monkeypatch):
+    codigo, (resultado,) = _rodar(capsys, "cargos", "inserir", "-", "--simular", monkeypatch=monkeypatch,
+                                  entrada=_jsonl({"cargo_nome": "Caixa", "pode_gerenciar_estoque": "N",
+                                                  "pode_fazer_vendas": "S"}))
+    assert codigo == 0 and resultado["ok"] and not resultado["confirmado"]
+    assert _rodar(capsys, "cargos", "listar")[1] == []
+
+
+def test_deletar_inexistente(banco, capsys):
+    codigo, (resultado,) = _rodar(capsys, "funcionarios", "deletar", "999")
+    assert codigo == 1 and not resultado["ok"]
+
+
+def test_argumentos_invalidos(banco, capsys):
+    with pytest.raises(SystemExit) as saida:
+        cli.main(["cargos", "deletar", "abc"])
+    assert saida.value.code == 2
@@ -0,0 +1,122 @@
+"""Migração de bancos criados com o esquema anterior (index.migracao)."""
+import os
+
+import pytest
+
+from config.config_bd import CONFIG, backend_atual, usar_backend, Error
+from config.sqlite_bd import conectar_sqlite
+from index.migracao import migrar, MIGRACOES
+
+# BD/gestorpro_bd.sql como era antes das colunas, índices e tabelas novas.
+ESQUEMA_ANTIGO = os.path.join(os.path.dirname(__file__), "dados", "gestorpro_bd_antigo.sql")
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """
+    No lugar do banco novo do conftest: o esquema antigo com alguns dados,
+    ainda sem migrar.
+    """
+    from index.crud_cargos import cache_cargos
+
+    caminho = str(tmp_path / "antigo.db")
+    conexao = conectar_sqlite(caminho, ESQUEMA_ANTIGO)
+    cursor = conexao.cursor()
+    for comando in (
+        "INSERT INTO cargo (cargo_id, cargo_nome, pode_gerenciar_estoque, pode_fazer_vendas) VALUES (1, 'Caixa', 0, 1)",
+        "INSERT INTO funcionario (funcionario_id, cargo_id, nome, email, cpf, telefone, data_admissao, salario, ativo) "
+        "VALUES (1, 1, 'José Álvares', 'jose@empresa.com', '52998224725', '11987654321', '2020-02-01', 2500, 1)",
+        "INSERT INTO estoque (estoque_id, descricao) VALUES (1, 'Loja')",
+        "INSERT INTO produto (produto_id, sku, nome, preco_venda) VALUES (10, 'CAF', 'Café', 12.50)",
+        "INSERT INTO lote (lote_id, estoque_id, produto_id, data_aquisicao, quantidade_inicial, quantidade_atual) "
+        "VALUES (1, 1, 10, '2024-01-01', 10, 7)",
+    ):
+        cursor.execute(comando)
+    conexao.commit()
+    conexao.close()
+
+    backend, anterior = backend_atual(), CONFIG['sqlite']['caminho']
+    usar_backend("sqlite", caminho=caminho)
+    cache_cargos.invalidar()
+    yield caminho
+    CONFIG['sqlite']['caminho'] = anterior
+    usar_backend(backend)
+    cache_cargos.invalidar()
+
+
+def test_migra_uma_vez(banco):
+    assert migrar() == [nome for nome, _ in MIGRACOES]
+    assert migrar() == []
+
+
+def test_saldo_estoque_montado_dos_lotes(sql):
+    from index.saldo_estoque import SaldosEstoque, verificar_saldos
+
+    migrar()
+
+    assert sql("SELECT estoque_id, produto_id, quantidade FROM saldo_estoque") == [(1, 10, 7)]
+    saldos = SaldosEstoque()
+    saldos.carregar()
+    assert saldos.em_maos(10) == 7
+    assert verificar_saldos() == []
+
+
+def test_catalogo_incremental_depois_de_migrar(banco, sql):
+    from index.catalogo import CatalogoProdutos
+
+    migrar()
+    catalogo = CatalogoProdutos()
+    catalogo.carregar()
+    sql("UPDATE produto SET nome = 'Café Torrado' WHERE produto_id = 10")
+    sql("INSERT INTO produto (produto_id, sku, nome, preco_venda) VALUES (11, 'ACU', 'Açúcar', 4.99)")
+
+    assert catalogo.atualizar() == 2
+    assert catalogo.por_sku("CAF").nome == "Café Torrado"
+    assert catalogo.por_sku("ACU") is not None
+    assert sql("SELECT COUNT(*) FROM produto WHERE atualizado_em = '1970-01-01 00:00:00'") == [(0,)]
+
+
+def test_banco_novo_nao_precisa_de_migracao(tmp_path):
+    backend, anterior = backend_atual(), CONFIG['sqlite']['caminho']
+    usar_backend("sqlite", caminho=str(tmp_path / "novo.db"))
+    try:
+        assert migrar() == []
+    finally:
+        CONFIG['sqlite']['caminho'] = anterior
+        usar_backend(backend)
+
+
+def test_historico_venda_sem_copias_repetidas(banco, sql):
+    migrar()
+    sql("INSERT INTO venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, status) "
+        "VALUES (1, 1, 'PIX', 10, '2024-01-01 10:00:00', 'CONCLUIDA')")
+    sql("INSERT INTO historico_venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, status) "
+        "VALUES (1, 1, 'PIX', 10, '2024-01-01 10:00:00', 'CONCLUIDA')")
+    with pytest.raises(Error, match="UNIQUE"):
+        sql("INSERT INTO historico_venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, "
+            "status) VALUES (1, 1, 'PIX', 10, '2024-01-01 10:00:00', 'CONCLUIDA')")
+
+
+def test_copias_repetidas_impedem_a_migracao(banco, sql):
+    for _ in range(2):
+        sql("INSERT INTO historico_venda (venda_id, funcionario_id, metodo_pagamento, total_venda, data_venda, "
+            "status) VALUES (7, 1, 'PIX', 10, '2024-01-01 10:00:00', 'CONCLUIDA')")
+    with pytest.raises(Error, match="venda 7"):
+        migrar()
+
+
+def test_indices_da_venda(banco, sql):
+    migrar()
+
+    indices = {nome for nome, in sql("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'lote'")}
+    assert {"idx_lote_produto_fifo", "idx_lote_estoque_produto"} <= indices
+    assert not {"idx_lote_produto", "idx_lote_estoque"} & indices
+    assert sql("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_venda_item_venda'") == [(1,)]
+
+
+def test_indices_da_listagem_de_funcionarios(banco, sql):
+    migrar()
+
+    indices = {nome for nome, in sql("SELECT name FROM sqlite_master "
+                                     "WHERE type = 'index' AND tbl_name = 'funcionario'")}
+    assert {"idx_funcionario_ativo", "idx_funcionario_cargo_ativo"} <= indices
@@ -0,0 +1,79 @@
+"""Paginação por chave das listagens (index.paginacao)."""
+import pytest
+
+from index.paginacao import paginar, buscar_por_chave
+from index.crud_cargos import listar_cargos_pagina, SELECT_CARGOS
+from index.crud_funcionarios import listar_funcionarios_pagina
+
+
+@pytest.fixture
+def cargos(sql):
+    sql("INSERT INTO cargo (cargo_id, cargo_nome, pode_gerenciar_estoque, pode_fazer_vendas) VALUES "
+        + ", ".join(f"({i}, 'Cargo {i}', 0, 1)" for i in (2, 3, 5, 7, 11, 13, 17)))
+
+
+@pytest.fixture
+def funcionarios(cargos, sql):
+    # (funcionario_id, cargo_id, ativo)
+    linhas = [(1, 2, 1), (2, 3, 1), (3, 2, 0), (4, 2, 1), (5, 3, 0), (6, 2, 1), (7, 2, 1)]
+    for funcionario_id, cargo_id, ativo in linhas:
+        sql("INSERT INTO funcionario (funcionario_id, cargo_id, nome, email, cpf, telefone, data_admissao, "
+            "salario, ativo) VALUES (%s, %s, %s, %s, %s, '11987654321', '2020-02-01', 2500, %s)",
+            (funcionario_id, cargo_id, f"Pessoa {funcionario_id}", f"p{funcionario_id}@empresa.com",
+             f"{funcionario_id:011d}", ativo))
+
+
+def _ids(pagina):
+    return [cargo.cargo_id for cargo in pagina['linhas']]
+
+
+def test_avanca_e_volta(cargos):
+    paginas, apos_id = [], None
+    while True:
+        pagina = listar_cargos_pagina(3, apos_id=apos_id)
+        paginas.append(_ids(pagina))
+        if not pagina['tem_proxima']:
+            break
+        apos_id = pagina['ultimo']
+    assert paginas == [[2, 3, 5], [7, 11, 13], [17]]
+
+    # Voltando a partir do 'primeiro' da última página: em ordem crescente.
+    anterior = listar_cargos_pagina(3, antes_id=17)
+    assert _ids(anterior) == [7, 11, 13]
+    assert anterior['tem_anterior'] and anterior['tem_proxima']
+    primeira = listar_cargos_pagina(3, antes_id=anterior['primeiro'])
+    assert _ids(primeira) == [2, 3, 5] and not primeira['tem_anterior']
+
+
+def test_pagina_exata_e_vazia(cargos):
+    pagina = listar_cargos_pagina(7)
+    assert len(pagina['linhas']) == 7 and not pagina['tem_proxima']
+    vazia = listar_cargos_pagina(3, apos_id=17)
+    assert vazia['linhas'] == [] and vazia['primeiro'] is None and not vazia['tem_proxima']
+
+
+def test_filtros_por_cargo_e_ativo(funcionarios):
+    def ids(**filtros):
+        return [f.funcionario_id for f in listar_funcionarios_pagina(10, **filtros)['linhas']]
+
+    assert ids(cargo_id=2) == [1, 3, 4, 6, 7]
+    assert ids(ativo=False) == [3, 5]
+    assert ids(cargo_id=2, ativo=True) == [1, 4, 6, 7]
+
+    pagina = listar_funcionarios_pagina(2, apos_id=1, cargo_id=2, ativo=1)
+    assert [f.funcionario_id for f in pagina['linhas']] == [4, 6] and pagina['tem_proxima']
+
+
+def test_linhas_como_dicts_e_busca_por_chave(cargos):
+    pagina = paginar(SELECT_CARGOS, "cargo_id", {"pode_fazer_vendas": 1, "pode_gerenciar_estoque": None},
+                     tamanho=2, condicoes=[("cargo_nome LIKE %s", ("Cargo 1%",))])
+    assert [linha["cargo_id"] for linha in pagina['linhas']] == [11, 13]
+    assert pagina['ultimo'] == 13
+
+    assert buscar_por_chave("teste.cargo", SELECT_CARGOS, "cargo_id", 5)["cargo_nome"] == "Cargo 5"
+    assert buscar_por_chave("teste.cargo", SELECT_CARGOS, "cargo_id", 4) is None
+
+
+def test_apos_e_antes_juntos():
+    with pytest.raises(ValueError):
+        paginar(SELECT_CARGOS, "cargo_id", apos=1, antes=5)
@@ -0,0 +1,142 @@
+"""Pool de conexões (config.config_bd.PoolConexoes), com conexões falsas."""
+import threading
+
+import pytest
+
+from config.config_bd import PoolConexoes, PoolEsgotado
+
+
+class ConexaoFalsa:
+    def __init__(self, numero):
+        self.numero = numero
+        self.viva = True
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.fechada = False
+
+    def is_connected(self):
+        return self.viva
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.fechada = True
+
+
+class Fabrica:
+    def __init__(self):
+        self.criadas = []
+
+    def __call__(self):
+        conexao = ConexaoFalsa(len(self.criadas) + 1)
+        self.criadas.append(conexao)
+        return conexao
+
+
+def _fisica(emprestada):
+    return emprestada._conexao
+
+
+def test_reaproveita_a_ultima_devolvida():
+    fabrica = Fabrica()
+    pool = PoolConexoes(fabrica, tamanho=3)
+
+    a, b = pool.emprestar(), pool.emprestar()
+    fisica_a, fisica_b = _fisica(a), _fisica(b)
+    a.close()
+    b.close()
+    # LIFO: a usada mais recentemente sai primeiro.
+    assert _fisica(pool.emprestar()) is fisica_b
+    assert _fisica(pool.emprestar()) is fisica_a
+    assert len(fabrica.criadas) == 2
+
+    estatisticas = pool.estatisticas()
+    assert (estatisticas['emprestimos'], estatisticas['devolucoes'], estatisticas['criadas']) == (4, 2, 2)
+    assert estatisticas['em_uso'] == 2 and estatisticas['pico_em_uso'] == 2
+
+
+def test_esgotado_depois_do_timeout():
+    pool = PoolConexoes(Fabrica(), tamanho=1, timeout_checkout=0.05)
+    emprestada = pool.emprestar()
+
+    with pytest.raises(PoolEsgotado):
+        pool.emprestar()
+    assert pool.estatisticas()['esgotamentos'] == 1
+
+    emprestada.close()
+    pool.emprestar()
+
+
+def test_espera_uma_devolucao():
+    pool = PoolConexoes(Fabrica(), tamanho=1, timeout_checkout=5)
+    emprestada = pool.emprestar()
+    threading.Timer(0.05, emprestada.close).start()
+
+    pool.emprestar()
+    estatisticas = pool.estatisticas()
+    assert estatisticas['esperas'] == 1 and estatisticas['tempo_espera_max'] > 0
+
+
+def test_devolucao_desfaz_transacao_pendente():
+    pool = PoolConexoes(Fabrica(), tamanho=1)
+    emprestada = pool.emprestar()
+    fisica = _fisica(emprestada)
+    fisica.in_transaction = True
+
+    emprestada.close()
+    emprestada.close()      # a segunda vez não devolve de novo
+    assert fisica.rollbacks == 1
+    assert pool.estatisticas()['devolucoes'] == 1
+
+
+def test_ociosa_morta_e_trocada():
+    fabrica = Fabrica()
+    pool = PoolConexoes(fabrica, tamanho=1, verificar_apos=0)
+    emprestada = pool.emprestar()
+    morta = _fisica(emprestada)
+    emprestada.close()
+    morta.viva = False
+
+    nova = _fisica(pool.emprestar())
+    assert nova is not morta and morta.fechada
+    assert pool.estatisticas()['descartadas'] == 1 and len(fabrica.criadas) == 2
+
+
+def test_ociosa_recente_nao_e_testada():
+    pool = PoolConexoes(Fabrica(), tamanho=1, verificar_apos=60)
+    emprestada = pool.emprestar()
+    fisica = _fisica(emprestada)
+    emprestada.close()
+    fisica.viva = False     # só o ping descobriria
+
+    assert _fisica(pool.emprestar()) is fisica
+
+
+def test_falha_da_fabrica_libera_a_vaga():
+    falhas = [RuntimeError("servidor fora do ar")]
+
+    def fabrica():
+        if falhas:
+            raise falhas.pop()
+        return ConexaoFalsa(1)
+
+    pool = PoolConexoes(fabrica, tamanho=1, timeout_checkout=0.05)
+    with pytest.raises(RuntimeError):
+        pool.emprestar()
+    assert pool.estatisticas()['abertas'] == 0
+    pool.emprestar()
+
+
+def test_descartar_e_fechar():
+    fabrica = Fabrica()
+    pool = PoolConexoes(fabrica, tamanho=2)
+    a, b = pool.emprestar(), pool.emprestar()
+    a.descartar()
+    b.close()
+
+    pool.fechar()
+    assert all(conexao.fechada for conexao in fabrica.criadas)
+    estatisticas = pool.estatisticas()
+    assert (estatisticas['abertas'], estatisticas['livres'], estatisticas['em_uso']) == (0, 0, 0)
@@ -0,0 +1,91 @@
+"""Statements preparados guardados por conexão (PoolConexoes.preparada), em LRU."""
+from config import config_bd
+from config.config_bd import PoolConexoes, ConsultaTexto, estatisticas_pool
+
+
+class CursorFalso:
+    def __init__(self, prepared=False):
+        self.prepared = prepared
+        self.fechado = False
+        self.executados = []
+
+    def execute(self, sql, params=()):
+        self.executados.append((sql, params))
+
+    def close(self):
+        self.fechado = True
+
+
+class ConexaoFalsa:
+    in_transaction = False
+
+    def __init__(self):
+        self.cursores = []
+
+    def cursor(self, prepared=False):
+        cursor = CursorFalso(prepared)
+        self.cursores.append(cursor)
+        return cursor
+
+    def close(self):
+        pass
+
+
+def test_reaproveita_por_nome_e_sql():
+    pool = PoolConexoes(ConexaoFalsa)
+    conexao = pool.emprestar()
+
+    consulta = conexao.preparada("cargo.buscar", "SELECT 1 WHERE id = %s")
+    assert conexao.preparada("cargo.buscar", "SELECT 1 WHERE id = %s") is consulta
+    assert consulta.executar((5,)).executados == [("SELECT 1 WHERE id = %s", (5,))]
+    assert consulta._cursor.prepared
+    assert pool.estatisticas()['preparadas'] == 1
+
+    # Mesmo nome com outro SQL: fecha o antigo e prepara de novo.
+    nova = conexao.preparada("cargo.buscar", "SELECT 2 WHERE id = %s")
+    assert nova is not consulta and consulta._cursor.fechado
+    assert pool.estatisticas()['preparadas'] == 2
+
+
+def test_descarta_a_menos_usada(monkeypatch):
+    monkeypatch.setattr(config_bd, "LIMITE_PREPARADAS", 2)
+    pool = PoolConexoes(ConexaoFalsa)
+    conexao = pool.emprestar()
+
+    a = conexao.preparada("a", "SELECT 'a'")
+    b = conexao.preparada("b", "SELECT 'b'")
+    conexao.preparada("a", "SELECT 'a'")        # 'a' passa a ser a mais recente
+    conexao.preparada("c", "SELECT 'c'")
+
+    assert b._cursor.fechado and not a._cursor.fechado
+    assert conexao.preparada("a", "SELECT 'a'") is a
+    assert conexao.preparada("b", "SELECT 'b'") is not b
+
+
+def test_cada_conexao_tem_as_suas():
+    pool = PoolConexoes(ConexaoFalsa, tamanho=2)
+    primeira, segunda = pool.emprestar(), pool.emprestar()
+
+    assert primeira.preparada("x", "SELECT 1") is not segunda.preparada("x", "SELECT 1")
+
+    # Descartada a conexão física, as consultas dela vão junto.
+    fisica = primeira._conexao
+    primeira.descartar()
+    assert id(fisica) not in pool._preparadas
+
+
+def test_sem_preparar_usa_texto():
+    pool = PoolConexoes(ConexaoFalsa, preparar=False)
+    consulta = pool.emprestar().preparada("x", "SELECT 1")
+    assert isinstance(consulta, ConsultaTexto)
+    assert pool.estatisticas()['preparadas'] == 0
+
+
+def test_crud_prepara_uma_vez_por_conexao(banco):
+    from index.crud_cargos import inserir_cargo, buscar_cargo
+
+    cargo_id = inserir_cargo("Caixa", 0, 1).id
+    antes = estatisticas_pool()['preparadas']
+    for _ in range(3):
+        assert buscar_cargo(cargo_id).cargo_nome == "Caixa"
+    assert estatisticas_pool()['preparadas'] == antes + 1
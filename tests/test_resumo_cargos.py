@@ -0,0 +1,137 @@
+"""Resumo por cargo mantido a cada alteração de funcionário (index.resumo_cargos)."""
+from decimal import Decimal
+
+import pytest
+
+from config.config_bd import transacao, exigir, TransacaoDesfeita
+from index.crud_cargos import inserir_cargo, deletar_cargo
+from index.crud_funcionarios import (
+    inserir_funcionario, atualizar_funcionario, deletar_funcionario, transferir_funcionarios, importar_funcionarios,
+)
+from index.resumo_cargos import verificar_resumo, resumo_por_cargo, reconstruir_resumo
+
+
+@pytest.fixture
+def cargos(banco):
+    return inserir_cargo("Caixa", 0, 1).id, inserir_cargo("Gerente", 1, 1).id
+
+
+def _inserir(cargo_id, numero, salario="2000", ativo=1):
+    cpf = ("52998224725", "11144477735", "39053344705", "15350946056")[numero]
+    return inserir_funcionario(cargo_id, "Pessoa Teste", f"p{numero}@empresa.com", cpf, "11987654321",
+                               "01/02/2020", "", salario, ativo).id
+
+
+def _por_cargo():
+    return {linha["cargo"]: (linha["quantidade"], linha["quantidade_ativos"], linha["soma_salarios"],
+                             linha["media_salarios"]) for linha in resumo_por_cargo()}
+
+
+def test_resumo_acompanha_o_crud(cargos):
+    caixa, gerente = cargos
+    a = _inserir(caixa, 0, "2000")
+    b = _inserir(caixa, 1, "3000.50", ativo=0)
+    c = _inserir(gerente, 2, "8000")
+    assert verificar_resumo() == []
+
+    assert atualizar_funcionario(b, None, None, None, None, None, None, None, "3500", 1).ok
+    assert atualizar_funcionario(a, gerente, None, None, None, None, None, None, None, None).ok
+    assert deletar_funcionario(c).ok
+    assert verificar_resumo() == []
+
+    assert _por_cargo() == {
+        "Caixa": (1, 1, Decimal("3500.00"), Decimal("3500.00")),
+        "Gerente": (1, 1, Decimal("2000.00"), Decimal("2000.00")),
+    }
+
+
+def test_resumo_apos_transferencia_e_transacao_desfeita(cargos):
+    caixa, gerente = cargos
+    ids = [_inserir(caixa, 0), _inserir(caixa, 1)]
+
+    assert transferir_funcionarios(ids, gerente).ok
+    assert not transferir_funcionarios(ids + [999], caixa).ok
+    with pytest.raises(TransacaoDesfeita):
+        with transacao():
+            exigir(deletar_funcionario(ids[0]))
+            exigir(deletar_funcionario(999))
+
+    assert verificar_resumo() == []
+    assert _por_cargo()["Gerente"][0] == 2
+
+
+def test_resumo_apos_importacao(cargos, tmp_path):
+    caixa, gerente = cargos
+    arquivo = tmp_path / "funcionarios.csv"
+    arquivo.write_text(
+        "cargo_id,nome,email,cpf,telefone,data_admissao,data_termino,salario,ativo\n"
+        f"{caixa},Ana Souza,ana@empresa.com,52998224725,11987654321,01/02/2020,,2500,Sim\n"
+        f"{gerente},Bruno Lima,bruno@empresa.com,11144477735,11987654321,01/02/2020,,7000,Não\n"
+        f"{caixa},Carla Dias,carla@empresa.com,00000000000,11987654321,01/02/2020,,2500,Sim\n",
+        encoding="utf-8")
+
+    relatorio = importar_funcionarios(str(arquivo))
+
+    assert relatorio["inseridos"] == 2 and len(relatorio["rejeitados"]) == 1
+    assert verificar_resumo() == []
+
+
+def test_importacao_nao_conta_lote_que_falhou_no_commit(monkeypatch):
+    from config.config_bd import Error
+    from index import crud_funcionarios
+
+    class Cursor:
+        def executemany(self, query, linhas):
+            raise Error("CPF repetido")
+
+        def execute(self, query, params):
+            pass
+
+        def close(self):
+            pass
+
+    class Conexao:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            raise Error("conexão perdida")
+
+        def rollback(self):
+            pass
+
+    monkeypatch.setattr(crud_funcionarios, "somar_funcionarios", lambda conexao, linhas: None)
+    params = (1, "Ana Souza", "ana@empresa.com", "52998224725", "11987654321", "2020-02-01", None, 2500.0, 1,
+              "ana souza")
+    relatorio = {"inseridos": 0, "rejeitados": []}
+    with pytest.raises(Error):
+        crud_funcionarios._gravar_lote(Conexao(), [(2, params)], relatorio)
+    assert relatorio["inseridos"] == 0
+
+
+def test_cargo_novo_aparece_zerado(cargos):
+    assert _por_cargo()["Caixa"] == (0, 0, Decimal("0.00"), None)
+    assert deletar_cargo(cargos[0]).ok
+    assert verificar_resumo() == []
+
+
+def test_divergencia_detectada_e_corrigida(cargos, sql):
+    caixa, _ = cargos
+    _inserir(caixa, 0, "2000")
+    sql("UPDATE resumo_cargo SET soma_salarios = 1 WHERE cargo_id = %s", (caixa,))
+
+    assert [(cargo_id, campo) for cargo_id, campo, _, _ in verificar_resumo()] == [(caixa, "soma_salarios")]
+    assert reconstruir_resumo()[0]
+    assert verificar_resumo() == []
+
+
+def test_resumo_incompleto_usa_a_agregacao(cargos, sql, capsys):
+    caixa, gerente = cargos
+    _inserir(gerente, 0, "5000")
+    sql("DELETE FROM resumo_cargo")
+
+    assert _por_cargo() == {
+        "Gerente": (1, 1, Decimal("5000.00"), Decimal("5000.00")),
+        "Caixa": (0, 0, Decimal("0.00"), None),
+    }
+    assert "incompleto" in capsys.readouterr().out
@@ -0,0 +1,92 @@
+"""Cópia em memória dos saldos e IDs de movimentação fora de ordem (index.saldo_estoque)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import index.saldo_estoque as saldo_estoque
+from index.saldo_estoque import SaldosEstoque, consolidar_saldos, verificar_saldos
+
+
+@pytest.fixture
+def movimentar(sql):
+    """movimentar(id, quantidade, idade_s=0): grava uma movimentação de 'ajuste' no lote 1 com esse ID."""
+    sql("INSERT INTO estoque (estoque_id, descricao) VALUES (1, 'Loja')")
+    sql("INSERT INTO produto (produto_id, nome, preco_venda) VALUES (10, 'Café', 12.50)")
+    sql("INSERT INTO lote (lote_id, estoque_id, produto_id, data_aquisicao, quantidade_inicial, quantidade_atual) "
+        "VALUES (1, 1, 10, '2024-01-01', 0, 0)")
+
+    def gravar(movimentacao_id, quantidade, idade_s=0):
+        data = (datetime.now() - timedelta(seconds=idade_s)).strftime("%Y-%m-%d %H:%M:%S")
+        sql("INSERT INTO movimentacao_estoque (movimentacao_id, lote_id, tipo, quantidade, data_movimentacao) "
+            "VALUES (%s, 1, 'ajuste', %s, %s)", (movimentacao_id, quantidade, data))
+        sql("UPDATE lote SET quantidade_atual = quantidade_atual + %s WHERE lote_id = 1", (quantidade,))
+    return gravar
+
+
+def test_movimentacao_atrasada_entra_na_copia(movimentar):
+    saldos = SaldosEstoque()
+    saldos.carregar()
+    movimentar(1, 5)
+    movimentar(3, 7)    # o 2 é uma transação ainda aberta
+
+    assert saldos.atualizar() == 2
+    assert saldos.em_maos(10) == 12 and list(saldos._pendentes) == [2]
+
+    movimentar(2, 1)
+    assert saldos.atualizar() == 1
+    assert saldos.em_maos(10, 1) == 13 and saldos.ocupacao(1) == 13
+    assert saldos._pendentes == {}
+
+
+def test_buraco_antes_de_movimentacao_antiga_nao_e_procurado(movimentar):
+    saldos = SaldosEstoque()
+    saldos.carregar()
+    movimentar(5, 4, idade_s=2 * saldo_estoque.MARGEM_SEGUNDOS)
+
+    saldos.atualizar()
+    assert saldos.em_maos(10) == 4 and saldos._pendentes == {}
+
+
+def test_pendente_expira(movimentar, monkeypatch):
+    saldos = SaldosEstoque()
+    saldos.carregar()
+    movimentar(2, 1)
+    saldos.atualizar()
+    assert list(saldos._pendentes) == [1]
+
+    agora = saldo_estoque.time.monotonic() + saldo_estoque.MARGEM_SEGUNDOS + 1
+    monkeypatch.setattr(saldo_estoque.time, "monotonic", lambda: agora)
+    saldos.atualizar()
+    assert saldos._pendentes == {}
+
+
+def test_pendentes_limitados(movimentar, monkeypatch):
+    monkeypatch.setattr(saldo_estoque, "PENDENTES_MAX", 10)
+    saldos = SaldosEstoque()
+    saldos.carregar()
+    movimentar(1000, 1)             # salto no auto-incremento: 999 IDs ausentes
+    saldos.atualizar()
+    assert list(saldos._pendentes) == list(range(990, 1000))
+    assert saldos.descartados == 989
+
+    movimentar(1005, 1)             # mais 4: saem os 4 mais antigos
+    saldos.atualizar()
+    assert list(saldos._pendentes) == list(range(994, 1000)) + list(range(1001, 1005))
+    assert saldos.descartados == 993
+
+    movimentar(995, 2)
+    saldos.atualizar()
+    assert saldos.em_maos(10) == 4
+
+
+def test_consolidacao_confere_com_os_lotes(movimentar):
+    movimentar(1, 5, idade_s=2 * saldo_estoque.MARGEM_SEGUNDOS)
+    movimentar(2, -2, idade_s=2 * saldo_estoque.MARGEM_SEGUNDOS)
+    movimentar(3, 4)                # recente: fica depois da marca
+
+    consolidar_saldos()
+    saldos = SaldosEstoque()
+    saldos.carregar()
+
+    assert saldos.todos() == {(1, 10): 7}
+    assert verificar_saldos() == []
@@ -0,0 +1,86 @@
+"""Transação compartilhada entre as funções de CRUD (config.config_bd.transacao)."""
+import pytest
+
+from config.config_bd import transacao, exigir, apos_transacao, em_transacao, TransacaoDesfeita
+from index.crud_cargos import inserir_cargo, listar_cargos_pagina
+from index.resposta import CONFLITO
+
+
+def _cargos():
+    return [cargo.cargo_nome for cargo in listar_cargos_pagina()['linhas']]
+
+
+def test_confirma_no_fim_do_bloco(banco):
+    with transacao():
+        assert em_transacao()
+        exigir(inserir_cargo("Caixa", 0, 1))
+        exigir(inserir_cargo("Gerente", 1, 1))
+    assert not em_transacao()
+    assert _cargos() == ["Caixa", "Gerente"]
+
+
+def test_excecao_desfaz_tudo(banco):
+    with pytest.raises(RuntimeError):
+        with transacao():
+            exigir(inserir_cargo("Caixa", 0, 1))
+            raise RuntimeError("falhou no meio")
+    assert _cargos() == []
+
+
+def test_exigir_desfaz_e_leva_o_codigo(banco):
+    with pytest.raises(TransacaoDesfeita) as erro:
+        with transacao():
+            exigir(inserir_cargo("Caixa", 0, 1))
+            exigir(inserir_cargo("Caixa", 1, 1))
+    assert erro.value.codigo == CONFLITO
+    assert _cargos() == []
+
+
+def test_rollback_de_uma_operacao_desfaz_o_bloco(banco):
+    # Mesmo sem exigir(): a operação que falhou no banco marca a transação.
+    with pytest.raises(TransacaoDesfeita):
+        with transacao():
+            inserir_cargo("Caixa", 0, 1)
+            assert not inserir_cargo("Caixa", 1, 1).ok
+    assert _cargos() == []
+
+
+def test_transacao_aninhada_participa_da_externa(banco):
+    with pytest.raises(RuntimeError):
+        with transacao() as externa:
+            with transacao() as interna:
+                assert interna is externa
+                exigir(inserir_cargo("Caixa", 0, 1))
+            # O fim do bloco interno não confirma nada.
+            raise RuntimeError("falhou depois do bloco interno")
+    assert _cargos() == []
+
+
+def test_apos_transacao_so_no_fim(banco):
+    chamadas = []
+
+    def avisar():
+        chamadas.append(em_transacao())
+
+    apos_transacao(avisar)
+    assert chamadas == [False]      # fora de uma transação, na hora
+
+    chamadas.clear()
+    with transacao():
+        apos_transacao(avisar)
+        with transacao():
+            apos_transacao(avisar)      # a mesma função, uma vez só
+        exigir(inserir_cargo("Caixa", 0, 1))
+        assert chamadas == []
+    assert chamadas == [False]
+
+
+def test_apos_transacao_tambem_quando_desfeita(banco):
+    # Dentro do bloco um cache pode ter lido dados que foram desfeitos.
+    chamadas = []
+    with pytest.raises(TransacaoDesfeita):
+        with transacao():
+            apos_transacao(lambda: chamadas.append(_cargos()))
+            exigir(inserir_cargo("Caixa", 0, 1))
+            exigir(inserir_cargo("Caixa", 1, 1))
+    assert chamadas == [[]]
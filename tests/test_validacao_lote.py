@@ -0,0 +1,78 @@
+"""Validação em lote com NumPy contra os validadores de um registro (index.validacao_lote)."""
+import random
+
+import pytest
+
+from index.crud_funcionarios import validar_funcionario, validar_cpf
+
+pytest.importorskip("numpy")
+from index.validacao_lote import validar_lote, validar_cpfs, ler_datas_br, mensagens_erro  # noqa: E402
+
+VALIDO = ("Ana Souza", "ana@empresa.com", "529.982.247-25", "(11) 98765-4321", "01/02/2020", "", "2500")
+
+# Cada caso muda um campo do registro válido: (índice do campo, valor).
+CASOS = [
+    (None, None),
+    (2, "52998224724"), (2, "111.111.111-11"), (2, "5299822472"), (2, "529982247250"),
+    (3, "119876543"), (3, "1198765432"), (3, "119876543210"),
+    (0, "Ana 2"), (0, ""), (0, "José da Silva"),
+    (1, "ana@empresa"), (1, "ana.souza@empresa.com.br"),
+    (6, "0"), (6, "-1"), (6, "abc"), (6, "1,5"), (6, "nan"),
+    (4, "29/02/2023"), (4, "29/02/2024"), (4, "31/04/2020"), (4, "1/2/2020"), (4, "2020-02-01"), (4, ""),
+    (5, "31/01/2020"), (5, "01/02/2020"), (5, "30/02/2021"), (5, "10/10/2025"),
+]
+
+
+def _registro(indice, valor):
+    registro = list(VALIDO)
+    if indice is not None:
+        registro[indice] = valor
+    return registro
+
+
+def _comparar(registros):
+    colunas = list(zip(*registros))
+    resultado = validar_lote(*colunas)
+    mensagens = mensagens_erro(resultado["erros"])
+    for registro, valido, mensagem in zip(registros, resultado["validos"], mensagens):
+        ok, erro = validar_funcionario(*registro)
+        assert (bool(valido), mensagem) == (ok, erro or ""), registro
+
+
+def test_mesmo_resultado_que_validar_funcionario():
+    _comparar([_registro(indice, valor) for indice, valor in CASOS])
+
+
+def test_combinacoes_aleatorias():
+    rnd = random.Random(7)
+    registros = []
+    for _ in range(500):
+        registro = list(VALIDO)
+        for indice, valor in rnd.sample(CASOS[1:], rnd.randint(1, 3)):
+            registro[indice] = valor
+        registros.append(registro)
+    _comparar(registros)
+
+
+def test_cpfs_gerados():
+    rnd = random.Random(3)
+    cpfs = ["".join(rnd.choice("0123456789") for _ in range(11)) for _ in range(2000)]
+    cpfs += ["52998224725", "11144477735", "00000000000", "٥٢٩٩٨٢٢٤٧٢٥"]
+    esperado = []
+    for cpf in cpfs:
+        try:
+            esperado.append(validar_cpf(cpf))
+        except ValueError:
+            esperado.append(False)
+    assert validar_cpfs(cpfs).tolist() == esperado
+
+
+def test_ler_datas_br():
+    validas, chaves = ler_datas_br(["29/02/2024", "29/02/2023", "5/3/2021", "", "32/01/2020"])
+    assert validas.tolist() == [True, False, True, False, False]
+    assert chaves[0] == 20240229 and chaves[2] == 20210305
+
+
+def test_colunas_de_tamanhos_diferentes():
+    with pytest.raises(ValueError):
+        validar_lote(["Ana"], [], ["52998224725"], [""], [""], [""], ["1"])
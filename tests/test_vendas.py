@@ -0,0 +1,93 @@
+"""Registro de vendas com baixa de estoque por FIFO (index.vendas)."""
+from decimal import Decimal
+
+import pytest
+
+from index.crud_cargos import inserir_cargo
+from index.crud_funcionarios import inserir_funcionario
+from index.vendas import alocar_fifo, juntar_itens, registrar_venda, VendaRecusada, EstoqueInsuficiente
+
+
+@pytest.fixture
+def loja(sql):
+    """Um funcionário, dois estoques e dois produtos com lotes de datas diferentes."""
+    cargo_id = inserir_cargo("Caixa", 0, 1).id
+    funcionario_id = inserir_funcionario(cargo_id, "Ana Souza", "ana@empresa.com", "52998224725", "11987654321",
+                                         "01/02/2020", "", "2500", 1).id
+    sql("INSERT INTO estoque (estoque_id, descricao) VALUES (1, 'Loja'), (2, 'Depósito')")
+    sql("INSERT INTO produto (produto_id, sku, nome, preco_venda) VALUES "
+        "(10, 'CAF', 'Café', 12.50), (20, 'ACU', 'Açúcar', 4.99)")
+    # Os IDs não seguem a data de aquisição: a ordem FIFO vem da data.
+    sql("INSERT INTO lote (lote_id, estoque_id, produto_id, data_aquisicao, quantidade_inicial, quantidade_atual) "
+        "VALUES (1, 1, 10, '2024-03-01', 5, 5), (2, 1, 10, '2024-01-01', 3, 3), (3, 2, 10, '2024-02-01', 4, 4), "
+        "(4, 1, 20, '2024-01-15', 10, 10)")
+    return funcionario_id
+
+
+def _saldos(sql):
+    return dict(sql("SELECT lote_id, quantidade_atual FROM lote ORDER BY lote_id"))
+
+
+# -----------------------------
+# SEM BANCO
+# -----------------------------
+
+def test_juntar_itens_soma_e_ordena():
+    assert list(juntar_itens([(20, 1), ("10", "2"), (20, 3)]).items()) == [(10, 2), (20, 4)]
+
+
+@pytest.mark.parametrize("itens", [[], [(10, 0)], [(10, -1)], [("x", 1)]])
+def test_juntar_itens_recusa(itens):
+    with pytest.raises(VendaRecusada):
+        juntar_itens(itens)
+
+
+def test_alocar_fifo_na_ordem_dos_lotes():
+    lotes = [(2, 10, 3), (3, 10, 4), (1, 10, 5), (4, 20, 10)]
+    assert alocar_fifo({10: 8, 20: 1}, lotes) == [(2, 10, 3), (3, 10, 4), (1, 10, 1), (4, 20, 1)]
+
+
+def test_alocar_fifo_informa_as_faltas():
+    with pytest.raises(EstoqueInsuficiente) as erro:
+        alocar_fifo({10: 8, 20: 1}, [(2, 10, 3), (4, 20, 10)])
+    assert erro.value.faltas == {10: (8, 3)}
+
+
+# -----------------------------
+# registrar_venda
+# -----------------------------
+
+def test_venda_consome_os_lotes_mais_antigos(loja, sql):
+    venda_id = registrar_venda(loja, [(10, 5), (20, 2)], "PIX")
+
+    assert _saldos(sql) == {1: 5, 2: 0, 3: 2, 4: 8}
+    (total, status), = sql("SELECT total_venda, status FROM venda WHERE venda_id = %s", (venda_id,))
+    assert Decimal(str(total)) == Decimal("72.48") and status == "CONCLUIDA"
+    assert sorted(sql("SELECT produto_id, quantidade FROM venda_item WHERE venda_id = %s", (venda_id,))) == \
+        [(10, 5), (20, 2)]
+    assert sorted(sql("SELECT lote_id, quantidade FROM movimentacao_estoque WHERE tipo = 'saida'")) == \
+        [(2, 3), (3, 2), (4, 2)]
+
+
+def test_venda_de_um_estoque_so(loja, sql):
+    registrar_venda(loja, [(10, 4)], estoque_id=1)
+    assert _saldos(sql) == {1: 4, 2: 0, 3: 4, 4: 10}
+
+
+def test_estoque_insuficiente_nao_grava_nada(loja, sql):
+    with pytest.raises(EstoqueInsuficiente) as erro:
+        registrar_venda(loja, [(20, 1), (10, 13)])
+
+    assert erro.value.faltas == {10: (13, 12)}
+    assert _saldos(sql) == {1: 5, 2: 3, 3: 4, 4: 10}
+    assert sql("SELECT COUNT(*) FROM venda") == [(0,)]
+    assert sql("SELECT COUNT(*) FROM movimentacao_estoque") == [(0,)]
+
+
+def test_produto_inativo_e_pagamento_invalido(loja, sql):
+    sql("UPDATE produto SET ativo = 0 WHERE produto_id = 20")
+    with pytest.raises(VendaRecusada, match="20"):
+        registrar_venda(loja, [(20, 1)])
+    with pytest.raises(VendaRecusada):
+        registrar_venda(loja, [(10, 1)], "CHEQUE")
+    assert sql("SELECT COUNT(*) FROM venda") == [(0,)]